@@ -0,0 +1,178 @@
+"""Streaming text chunker shared by the indexing and seeding scripts."""
+
+from __future__ import annotations
+
+import functools
+import logging
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Iterable, Iterator, List, Optional, Tuple
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+
+LengthFn = Callable[[str], int]
+
+
+def chunk_lines(
+    lines: Iterable[str],
+    size: int = 400,
+    overlap: int = 0,
+    length_fn: Optional[LengthFn] = None,
+) -> Iterator[str]:
+    """Group streamed lines into chunks of at most `size` units.
+
+    Lengths are tracked incrementally, so the cost is linear in the input. A unit is a
+    character by default or whatever `length_fn` counts (e.g. tokenizer tokens). Up to
+    `overlap` units of trailing lines are repeated at the start of the next chunk, and
+    lines longer than `size` are split on whitespace (or hard-split as a last resort).
+    """
+
+    if size <= 0:
+        raise ValueError("size must be positive")
+    overlap = max(0, min(overlap, size - 1))
+    measure = length_fn or len
+    sep = measure("\n")
+    buffer: Deque[Tuple[str, int]] = deque()
+    buffer_len = 0
+    fresh = 0
+
+    for line in lines:
+        for piece, piece_len in _split_long_line(line, size, measure):
+            # WHY: Separators are measured too so chunks never exceed `size`.
+            added = piece_len + (sep if buffer else 0)
+            if buffer and buffer_len + added > size:
+                if fresh:
+                    yield "\n".join(text for text, _ in buffer)
+                buffer, buffer_len = _carry_overlap(buffer, overlap, sep)
+                fresh = 0
+                while buffer and buffer_len + piece_len + sep > size:
+                    _, dropped = buffer.popleft()
+                    buffer_len -= dropped + (sep if buffer else 0)
+                added = piece_len + (sep if buffer else 0)
+            buffer.append((piece, piece_len))
+            buffer_len += added
+            fresh += 1
+    if fresh:
+        yield "\n".join(text for text, _ in buffer)
+
+
+def chunk_text(
+    text: str,
+    size: int = 400,
+    overlap: int = 0,
+    length_fn: Optional[LengthFn] = None,
+) -> Iterator[str]:
+    """Chunk an in-memory string; see `chunk_lines`."""
+
+    return chunk_lines(text.splitlines(), size, overlap, length_fn)
+
+
+def configured_chunker(lines: Iterable[str]) -> Iterator[str]:
+    """Chunk lines using the `CHUNK_*` settings from `.env`."""
+
+    settings = get_settings()
+    return chunk_lines(
+        lines,
+        size=settings.chunk_size,
+        overlap=settings.chunk_overlap,
+        length_fn=length_function(settings.chunk_unit),
+    )
+
+
+def length_function(unit: str) -> Optional[LengthFn]:
+    """Return the length function for `chars` (None) or `tokens`."""
+
+    if unit != "tokens":
+        return None
+    tokenizer = _load_tokenizer(get_settings().embed_model_name)
+    if tokenizer is None:
+        # WHY: Whitespace words approximate tokens when no tokenizer is installed.
+        return lambda text: len(text.split())
+    return lambda text: len(tokenizer.tokenize(text))
+
+
+@functools.lru_cache()
+def _load_tokenizer(model_name: str) -> Any:
+    """Load just the embedding model's tokenizer, once per process.
+
+    Reader workers only count tokens; loading the full SentenceTransformer in every
+    worker would cost its weights in RAM and seconds of start-up per process.
+    """
+
+    try:
+        # Imported lazily so character mode never touches the transformers stack.
+        from transformers import AutoTokenizer
+    except ImportError:
+        return None
+    # sentence-transformers resolves bare hub names under its own organisation.
+    if "/" not in model_name and not Path(model_name).exists():
+        model_name = f"sentence-transformers/{model_name}"
+    try:
+        return AutoTokenizer.from_pretrained(model_name)
+    except Exception:
+        logger.warning("Could not load the %s tokenizer; counting words", model_name)
+        return None
+
+
+def _carry_overlap(
+    buffer: Deque[Tuple[str, int]], overlap: int, sep: int
+) -> Tuple[Deque[Tuple[str, int]], int]:
+    """Keep the trailing lines that fit in `overlap` units."""
+
+    carried: Deque[Tuple[str, int]] = deque()
+    carried_len = 0
+    for text, length in reversed(buffer):
+        extra = length + (sep if carried else 0)
+        if carried_len + extra > overlap:
+            break
+        carried.appendleft((text, length))
+        carried_len += extra
+    return carried, carried_len
+
+
+def _split_long_line(line: str, size: int, measure: LengthFn) -> List[Tuple[str, int]]:
+    """Split a line that alone exceeds `size` into word-aligned pieces."""
+
+    line_len = measure(line)
+    if line_len <= size:
+        return [(line, line_len)]
+    pieces: List[Tuple[str, int]] = []
+    words: List[str] = []
+    words_len = 0
+    sep = measure(" ")
+    for word in line.split(" "):
+        word_len = measure(word)
+        if word_len > size:
+            if words:
+                pieces.append((" ".join(words), words_len))
+                words, words_len = [], 0
+            pieces.extend(_hard_split(word, size, measure))
+            continue
+        added = word_len + (sep if words else 0)
+        if words and words_len + added > size:
+            pieces.append((" ".join(words), words_len))
+            words, words_len = [], 0
+            added = word_len
+        words.append(word)
+        words_len += added
+    if words:
+        pieces.append((" ".join(words), words_len))
+    return pieces
+
+
+def _hard_split(word: str, size: int, measure: LengthFn) -> List[Tuple[str, int]]:
+    """Slice an unbreakable run of text into pieces of at most `size` units."""
+
+    pieces: List[Tuple[str, int]] = []
+    start = 0
+    while start < len(word):
+        end = min(len(word), start + size)
+        # WHY: Token counts can exceed character counts; shrink until it fits.
+        while end - start > 1 and measure(word[start:end]) > size:
+            end = start + max(1, (end - start) // 2)
+        piece = word[start:end]
+        pieces.append((piece, measure(piece)))
+        start = end
+    return pieces
@@ -22,8 +22,67 @@ class Settings:
         self.model_name = os.getenv("MODEL_NAME", "llama3.2:3b")
         self.ollama_host = os.getenv("OLLAMA_HOST", "http://127.0.0.1:11434")
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
+        # WHY: Ollama unloads idle models after 5 minutes; keep them for longer.
+        self.ollama_keep_alive = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+        self.ollama_warmup = os.getenv("OLLAMA_WARMUP", "true").lower() == "true"
+        self.ollama_heartbeat_seconds = int(
+            os.getenv("OLLAMA_HEARTBEAT_SECONDS", "600")
+        )
+        self.ollama_active_hours = os.getenv("OLLAMA_ACTIVE_HOURS", "07-23")
+        self.llm_timeout_seconds = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+        self.llm_connect_timeout_seconds = float(
+            os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5")
+        )
+        self.llm_max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "10"))
+        self.llm_keepalive_seconds = float(os.getenv("LLM_KEEPALIVE_SECONDS", "300"))
+        self.llm_max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+        self.llm_max_queue = int(os.getenv("LLM_MAX_QUEUE", "32"))
+        self.llm_breaker_failures = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+        self.llm_breaker_backoff_seconds = float(
+            os.getenv("LLM_BREAKER_BACKOFF_SECONDS", "5")
+        )
+        self.llm_breaker_max_backoff_seconds = float(
+            os.getenv("LLM_BREAKER_MAX_BACKOFF_SECONDS", "300")
+        )
+        temperature = os.getenv("LLM_TEMPERATURE", "")
+        self.llm_temperature = float(temperature) if temperature else None
+        self.llm_response_cache = (
+            os.getenv("LLM_RESPONSE_CACHE", "false").lower() == "true"
+        )
+        self.llm_response_cache_size = int(os.getenv("LLM_RESPONSE_CACHE_SIZE", "256"))
+        self.llm_response_cache_ttl_seconds = float(
+            os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", "300")
+        )
         self.db_path = Path(os.getenv("DB_PATH", "./data/atlas.db"))
+        self.sqlite_profile = os.getenv("SQLITE_PROFILE", "tuned").lower()
+        self.sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+        self.sqlite_synchronous = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+        self.sqlite_mmap_size = int(os.getenv("SQLITE_MMAP_SIZE", "268435456"))
+        # WHY: Negative values are KiB, so -65536 is a 64 MiB page cache per connection.
+        self.sqlite_cache_size = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))
+        self.sqlite_busy_timeout_ms = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+        self.sqlite_pool_size = int(os.getenv("SQLITE_POOL_SIZE", "5"))
+        self.sqlite_max_overflow = int(os.getenv("SQLITE_MAX_OVERFLOW", "10"))
+        # WHY: With "false" the API refuses to start until `scripts/migrate.py` ran.
+        self.auto_migrate = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
         self.embed_model_name = os.getenv("EMBED_MODEL_NAME", "all-MiniLM-L6-v2")
+        self.embed_warmup = os.getenv("EMBED_WARMUP", "true").lower() == "true"
+        self.embed_cache_enabled = os.getenv("EMBED_CACHE", "true").lower() == "true"
+        self.embed_cache_size = int(os.getenv("EMBED_CACHE_SIZE", "4096"))
+        self.embed_cache_path = Path(
+            os.getenv("EMBED_CACHE_PATH", "./data/indices/embedding_cache.db")
+        )
+        self.embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+        self.ingest_commit_every = int(os.getenv("INGEST_COMMIT_EVERY", "1024"))
+        self.chunk_size = int(os.getenv("CHUNK_SIZE", "400"))
+        self.chunk_overlap = int(os.getenv("CHUNK_OVERLAP", "50"))
+        self.chunk_unit = os.getenv("CHUNK_UNIT", "chars").lower()
+        # WHY: "auto" switches to approximate IVF search once the corpus is large.
+        self.vector_index_mode = os.getenv("VECTOR_INDEX_MODE", "auto").lower()
+        self.vector_index_ivf_threshold = int(
+            os.getenv("VECTOR_INDEX_IVF_THRESHOLD", "50000")
+        )
+        self.vector_index_nprobe = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
         self.voice_wakeword = os.getenv("VOICE_WAKEWORD", "atlas")
         self.voice_vad = os.getenv("VOICE_VAD", "True").lower() == "true"
         self.voice_lang = os.getenv("VOICE_LANG", "en")
@@ -31,6 +90,15 @@ class Settings:
         self.max_tool_steps = int(os.getenv("MAX_TOOL_STEPS", "8"))
         self.default_permission_tier = os.getenv("DEFAULT_PERMISSION_TIER", "free")
         self.rate_limit_per_minute = int(os.getenv("RATE_LIMIT_PER_MINUTE", "45"))
+        # WHY: Loaded turns are trimmed to CONTEXT_TOKEN_BUDGET by the context builder.
+        self.chat_history_messages = int(os.getenv("CHAT_HISTORY_MESSAGES", "40"))
+        self.context_token_budget = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2048"))
+        self.context_memory_top_k = int(os.getenv("CONTEXT_MEMORY_TOP_K", "3"))
+        self.context_memory_min_score = float(
+            os.getenv("CONTEXT_MEMORY_MIN_SCORE", "0.2")
+        )
+        self.context_memory_share = float(os.getenv("CONTEXT_MEMORY_SHARE", "0.3"))
+        self.context_summary_share = float(os.getenv("CONTEXT_SUMMARY_SHARE", "0.15"))
         self.brand_primary = os.getenv("BRAND_PRIMARY", "#E5B80B")
         self.brand_background = os.getenv("BRAND_BG", "#0B0B0E")
         self.index_documents = os.getenv("INDEX_DOCUMENTS", "false").lower() == "true"
@@ -38,6 +106,12 @@ class Settings:
             os.getenv("DOCUMENTS_PATH", os.path.expanduser("~/Documents"))
         )
         self.plugins_dir = Path(os.getenv("PLUGINS_DIR", "./plugins"))
+        # WHY: "off" never installs the profiling middleware; "header" profiles only
+        # requests sent with `X-Atlas-Profile: 1`; "all" profiles every request.
+        self.profiling = os.getenv("PROFILING", "off").lower()
+        self.profile_dir = Path(os.getenv("PROFILE_DIR", "./data/logs/profiles"))
+        self.profile_interval_ms = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+        self.profile_keep = int(os.getenv("PROFILE_KEEP", "50"))
         self.platform = platform.system().lower()
 
     def database_url(self) -> str:
@@ -46,7 +120,11 @@ class Settings:
         # WHY: `resolve()` ensures consistent path when running from different cwd.
         db_full_path = self.db_path.resolve()
         db_full_path.parent.mkdir(parents=True, exist_ok=True)
-        return f"sqlite:///{db_full_path}" if db_full_path.suffix else f"sqlite:///{db_full_path}.db"
+        return (
+            f"sqlite:///{db_full_path}"
+            if db_full_path.suffix
+            else f"sqlite:///{db_full_path}.db"
+        )
 
 
 @functools.lru_cache()
@@ -2,18 +2,100 @@
 
 from __future__ import annotations
 
+import logging
+import time
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Dict, Iterator, Optional
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
+from .. import migrations
+from . import metrics
 from .config import get_settings
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
-engine = create_engine(settings.database_url(), connect_args={"check_same_thread": False})
+
+
+def sqlite_pragmas(profile: Optional[str] = None) -> Dict[str, str]:
+    """Return the PRAGMAs applied to every new connection for `SQLITE_PROFILE`.
+
+    `tuned` (the default) uses WAL so readers never block the writer, relaxes fsync to
+    `synchronous=NORMAL` (safe with WAL; a power cut can lose the last commits but
+    never corrupts the file), memory-maps the database and keeps temp tables in RAM.
+    `default` leaves SQLite's own settings, mostly for benchmarking.
+    """
+
+    if (profile or settings.sqlite_profile) != "tuned":
+        return {}
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "busy_timeout": str(settings.sqlite_busy_timeout_ms),
+        "mmap_size": str(settings.sqlite_mmap_size),
+        "cache_size": str(settings.sqlite_cache_size),
+        "temp_store": "MEMORY",
+    }
+
+
+def create_sqlite_engine(url: str, profile: Optional[str] = None) -> Engine:
+    """Create an engine whose pooled connections all carry the PRAGMA profile."""
+
+    # WHY: A QueuePool keeps connections (and their page cache and mmap) open between
+    # requests; the pool size bounds how many threads hit SQLite at once.
+    engine = create_engine(
+        url,
+        connect_args={
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        },
+        poolclass=QueuePool,
+        pool_size=settings.sqlite_pool_size,
+        max_overflow=settings.sqlite_max_overflow,
+    )
+    pragmas = sqlite_pragmas(profile)
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return engine
+
+
+engine = create_sqlite_engine(settings.database_url())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+SQL_SECONDS = metrics.histogram(
+    "atlas_sqlite_query_duration_seconds",
+    "SQLite statement execution time by statement kind",
+    ("operation",),
+)
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # WHY: The execution context lives and dies with one statement, so a statement
+    # that raises leaves nothing behind on the pooled connection.
+    if context is not None:
+        context._atlas_started = time.perf_counter()
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_atlas_started", None)
+    if started is None:
+        return
+    # WHY: The leading keyword (SELECT/INSERT/...) keeps the label set small.
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    SQL_SECONDS.observe(time.perf_counter() - started, operation=operation)
+
 
 @contextmanager
 def get_session() -> Iterator[Session]:
@@ -28,3 +110,10 @@ def get_session() -> Iterator[Session]:
         raise
     finally:
         session.close()
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """Apply pending migrations; an up-to-date database costs one query."""
+
+    for migration in migrations.upgrade(bind):
+        logger.info("Migrated schema to %04d_%s", migration.version, migration.name)
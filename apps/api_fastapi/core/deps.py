@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Iterator
 
-from fastapi import Depends
+from fastapi import Depends, Request
 from sqlalchemy.orm import Session
 
 from . import db
@@ -15,3 +15,17 @@ def get_db() -> Iterator[Session]:
 
     with db.get_session() as session:
         yield session
+
+
+def get_client_key(request: Request) -> str:
+    """Identify the caller for rate limiting as `host` or `host/X-Atlas-Client`.
+
+    The header only names a client within its address: the limiter charges every
+    call to the address, so rotating the header cannot buy extra budget.
+    """
+
+    host = request.client.host if request.client else "anonymous"
+    header = request.headers.get("x-atlas-client")
+    if header:
+        return f"{host}/{header[:64]}"
+    return host
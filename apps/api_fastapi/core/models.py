@@ -2,12 +2,29 @@
 
 from __future__ import annotations
 
-import json
 from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import Boolean, Date, DateTime, Integer, String, Text
-from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Table,
+    Text,
+)
+from sqlalchemy.orm import (
+    DeclarativeBase,
+    Mapped,
+    mapped_column,
+    query_expression,
+    relationship,
+)
 from sqlalchemy.types import LargeBinary
 
 
@@ -28,24 +45,62 @@ class ChatMessage(Base):
     __tablename__ = "chat_messages"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # WHY: Turns are appended per conversation; "" marks rows saved before sessions.
+    conversation_id: Mapped[str] = mapped_column(
+        String(64), default="", server_default="", nullable=False, index=True
+    )
     role: Mapped[str] = mapped_column(String(16), nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
 
 
+class Tag(Base):
+    """A tag name shared by tasks and notes."""
+
+    __tablename__ = "tags"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    # WHY: Unique index so tag filters and get-or-create are single seeks.
+    name: Mapped[str] = mapped_column(
+        String(255), nullable=False, unique=True, index=True
+    )
+
+
+# Item <-> tag links. The primary key serves item -> tags lookups; the
+# (tag_id, item id) index answers tag filters and counts without reading the table.
+task_tags = Table(
+    "task_tags",
+    Base.metadata,
+    Column("task_id", ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_task_tags_tag", "tag_id", "task_id"),
+)
+note_tags = Table(
+    "note_tags",
+    Base.metadata,
+    Column("note_id", ForeignKey("notes.id", ondelete="CASCADE"), primary_key=True),
+    Column("tag_id", ForeignKey("tags.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_note_tags_tag", "tag_id", "note_id"),
+)
+
+
 class Task(Base):
-    """Task model with tags stored as JSON string for simplicity."""
+    """Task model; tags live in `tags` via `task_tags`."""
 
     __tablename__ = "tasks"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     description: Mapped[str] = mapped_column(Text, default="")
-    due_date: Mapped[Optional[Date]] = mapped_column(Date, nullable=True)
-    tags: Mapped[str] = mapped_column(String(255), default="[]")
+    # WHY: Indexed because task lists are ordered by due date.
+    due_date: Mapped[Optional[Date]] = mapped_column(Date, nullable=True, index=True)
     completed: Mapped[bool] = mapped_column(Boolean, default=False)
+    # WHY: selectin loads the tags of a whole page in one extra query.
+    tags: Mapped[List[Tag]] = relationship(
+        secondary=task_tags, order_by=Tag.name, lazy="selectin"
+    )
 
     def tags_list(self) -> List[str]:
-        return json.loads(self.tags or "[]")
+        return [tag.name for tag in self.tags]
 
 
 class Note(Base):
@@ -56,21 +111,38 @@ class Note(Base):
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False)
     content: Mapped[str] = mapped_column(Text, default="")
-    tags: Mapped[str] = mapped_column(String(255), default="[]")
+    tags: Mapped[List[Tag]] = relationship(
+        secondary=note_tags, order_by=Tag.name, lazy="selectin"
+    )
+    # Filled only by queries that select it, e.g. the summary view of `GET /notes`.
+    extract: Mapped[Optional[str]] = query_expression()
 
     def tags_list(self) -> List[str]:
-        return json.loads(self.tags or "[]")
+        return [tag.name for tag in self.tags]
 
 
 class Embedding(Base):
-    """Embedding vectors stored as binary blobs."""
+    """Embedding vectors stored as binary blobs tagged with their model."""
 
     __tablename__ = "embeddings"
+    # WHY: Every write and delete looks vectors up by item; one row per item.
+    __table_args__ = (Index("ix_embeddings_item", "item_type", "item_id", unique=True),)
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     item_type: Mapped[str] = mapped_column(String(32), nullable=False)
     item_id: Mapped[int] = mapped_column(Integer, nullable=False)
     vector: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # WHY: Vectors from different models/dimensions must never be compared.
+    # An empty model_name marks rows written before these columns existed.
+    model_name: Mapped[str] = mapped_column(
+        String(255), default="", server_default="", nullable=False
+    )
+    dim: Mapped[int] = mapped_column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    normalized: Mapped[bool] = mapped_column(
+        Boolean, default=False, server_default="0", nullable=False
+    )
 
 
 class PluginState(Base):
@@ -101,8 +173,48 @@ class DocumentChunk(Base):
     """Indexed chunk from the optional Documents ingestion pipeline."""
 
     __tablename__ = "document_chunks"
+    # WHY: Re-indexing upserts by (file, position) and prunes by file prefix.
+    __table_args__ = (
+        Index(
+            "ix_document_chunks_source_chunk", "source_path", "chunk_index", unique=True
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     source_path: Mapped[str] = mapped_column(Text, nullable=False)
     chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
+
+
+class DocumentFile(Base):
+    """Manifest entry used to skip unchanged files when re-indexing Documents."""
+
+    __tablename__ = "document_files"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    path: Mapped[str] = mapped_column(Text, unique=True, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, default=0)
+    mtime: Mapped[float] = mapped_column(Float, default=0.0)
+    content_hash: Mapped[str] = mapped_column(String(64), default="")
+    chunk_count: Mapped[int] = mapped_column(Integer, default=0)
+    chunker: Mapped[str] = mapped_column(String(64), default="", server_default="")
+
+
+class LLMCallMetric(Base):
+    """Token counts and timings of one LLM provider call."""
+
+    __tablename__ = "llm_call_metrics"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    conversation_id: Mapped[str] = mapped_column(String(64), default="", index=True)
+    provider: Mapped[str] = mapped_column(String(16), nullable=False)
+    model: Mapped[str] = mapped_column(String(128), nullable=False)
+    stream: Mapped[bool] = mapped_column(Boolean, default=False)
+    prompt_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    completion_tokens: Mapped[int] = mapped_column(Integer, default=0)
+    # WHY: True when counts came from the local token counter, not the provider.
+    estimated: Mapped[bool] = mapped_column(Boolean, default=False)
+    ttft_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    latency_ms: Mapped[float] = mapped_column(Float, default=0.0)
+    tokens_per_second: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    load_ms: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -0,0 +1,34 @@
+"""Opaque keyset cursors for the paginated list endpoints.
+
+A cursor holds the sort key of the last row of a page; the next page starts with
+`WHERE (sort key) > cursor`, which an index answers directly, so every page costs
+the same regardless of how deep the client has scrolled (unlike `OFFSET`).
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from typing import List
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*values: object) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[object]:
+    """Return the `size` sort-key values stored in `cursor`; raise ValueError if bad."""
+
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
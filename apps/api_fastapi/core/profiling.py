@@ -0,0 +1,240 @@
+"""Opt-in per-request profiling that writes collapsed stacks for flamegraphs.
+
+`PROFILING=header` profiles requests sent with `X-Atlas-Profile: 1`;
+`PROFILING=all` profiles every request. With the default `off` the middleware is
+never installed, so requests pay nothing.
+
+A sampler thread snapshots the Python stacks of the event-loop thread and the
+threadpool workers each `PROFILE_INTERVAL_MS`. Sampling (rather than cProfile) is used
+because one request hops between the event loop and threadpool workers, and
+`sys.setprofile` only sees the thread it was set on. Those threads are shared, so work
+for requests running concurrently with the profiled one is sampled too; profile under
+a quiet load for clean attributions.
+Output files use the collapsed format (`frame;frame;frame count`) read by
+`flamegraph.pl`, speedscope and inferno.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from .config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PROFILE_HEADER = b"x-atlas-profile"
+PROFILE_SUFFIX = ".collapsed"
+# Name anyio gives the threadpool workers that run sync endpoints and dependencies.
+WORKER_THREAD_NAME = "AnyIO worker thread"
+# Top frames of threads that are parked rather than working for the request.
+IDLE_FRAMES = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+_NAME = re.compile(
+    r"^(?P<stamp>\d{8}-\d{6}-\d{6})_(?P<method>[A-Z]+)_(?P<path>.*)_(?P<ms>\d+)ms$"
+)
+
+# WHY: Only one request is profiled at a time; overlapping samplers would each see
+# the other request's stacks.
+_active = threading.Lock()
+
+
+class StackSampler:
+    """Count the Python stacks of busy threads at a fixed interval.
+
+    With `loop_thread` set, only that thread and the threadpool workers are sampled;
+    otherwise every thread is.
+    """
+
+    def __init__(
+        self, interval_seconds: float, loop_thread: Optional[int] = None
+    ) -> None:
+        self.interval = interval_seconds
+        self.loop_thread = loop_thread
+        self.stacks: Counter[str] = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="profile-sampler", daemon=True
+        )
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or _is_idle(frame):
+                    continue
+                if thread_id not in names:
+                    names.update(
+                        (thread.ident, thread.name) for thread in threading.enumerate()
+                    )
+                name = names.get(thread_id) or f"thread-{thread_id}"
+                if not self._wanted(thread_id, name):
+                    continue
+                stack = _stack(frame)
+                stack.append(name)
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def _wanted(self, thread_id: int, name: str) -> bool:
+        if self.loop_thread is None:
+            return True
+        return thread_id == self.loop_thread or name == WORKER_THREAD_NAME
+
+
+def _is_idle(frame: FrameType) -> bool:
+    return (Path(frame.f_code.co_filename).name, frame.f_code.co_name) in IDLE_FRAMES
+
+
+def _stack(frame: Optional[FrameType]) -> List[str]:
+    """Return frame labels innermost first, e.g. `encode (embed_service.py:329)`."""
+
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        filename = Path(code.co_filename).name
+        # Semicolons separate frames in the collapsed format.
+        label = f"{code.co_name} ({filename}:{code.co_firstlineno})"
+        labels.append(label.replace(";", ":"))
+        frame = frame.f_back
+    return labels
+
+
+def write_profile(
+    directory: Path,
+    stamp: str,
+    method: str,
+    path: str,
+    elapsed: float,
+    stacks: Counter[str],
+) -> Path:
+    """Write collapsed stacks and prune the oldest files beyond `PROFILE_KEEP`."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9.-]+", "-", path).strip("-") or "root"
+    target = directory / f"{stamp}_{method}_{slug}_{int(elapsed * 1000)}ms"
+    target = target.with_name(target.name + PROFILE_SUFFIX)
+    target.write_text(
+        "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+    )
+    for stale in sorted(directory.glob(f"*{PROFILE_SUFFIX}"))[: -settings.profile_keep]:
+        stale.unlink(missing_ok=True)
+    return target
+
+
+def list_profiles(directory: Path) -> List[Dict[str, object]]:
+    """Describe stored profiles, newest first."""
+
+    if not directory.exists():
+        return []
+    profiles = []
+    for file in sorted(directory.glob(f"*{PROFILE_SUFFIX}"), reverse=True):
+        match = _NAME.match(file.name[: -len(PROFILE_SUFFIX)])
+        stat = file.stat()
+        profiles.append(
+            {
+                "name": file.name,
+                "method": match["method"] if match else None,
+                "path": match["path"] if match else None,
+                "duration_ms": int(match["ms"]) if match else None,
+                "size_bytes": stat.st_size,
+                "created_at": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+            }
+        )
+    return profiles
+
+
+class ProfilingMiddleware:
+    """ASGI middleware sampling stacks for the requests selected by `PROFILING`.
+
+    The `X-Atlas-Profile` response header carries the timestamp the profile's file
+    name starts with (the file itself is written once the body has been sent).
+    """
+
+    def __init__(
+        self,
+        app: Callable[..., Awaitable[None]],
+        mode: Optional[str] = None,
+        directory: Optional[Path] = None,
+    ) -> None:
+        self.app = app
+        self.mode = mode or settings.profiling
+        self.directory = directory or settings.profile_dir
+
+    def _wanted(self, scope: Dict) -> bool:
+        if scope["type"] != "http":
+            return False
+        if self.mode == "all":
+            return True
+        headers = dict(scope.get("headers") or [])
+        return self.mode == "header" and headers.get(PROFILE_HEADER) in (b"1", b"true")
+
+    async def __call__(self, scope: Dict, receive: Callable, send: Callable) -> None:
+        if not self._wanted(scope) or not _active.acquire(blocking=False):
+            await self.app(scope, receive, send)
+            return
+        # WHY: Background threads (indexing, re-embedding, keep-alive) never serve
+        # the request, so only the loop and its threadpool workers are sampled.
+        sampler = StackSampler(
+            settings.profile_interval_ms / 1000, loop_thread=threading.get_ident()
+        )
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Dict) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((PROFILE_HEADER, stamp.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stacks = sampler.stop()
+            _active.release()
+            elapsed = time.perf_counter() - started
+            try:
+                # WHY: Writing and pruning files must not block the event loop.
+                target = await run_in_threadpool(
+                    write_profile,
+                    self.directory,
+                    stamp,
+                    scope["method"],
+                    scope["path"],
+                    elapsed,
+                    stacks,
+                )
+                logger.info(
+                    "Profiled %s %s (%d samples) -> %s",
+                    scope["method"],
+                    scope["path"],
+                    sampler.samples,
+                    target.name,
+                )
+            except OSError:
+                logger.exception("Could not write profile for %s", scope["path"])
@@ -2,10 +2,13 @@
 
 from __future__ import annotations
 
+import threading
 import time
 from collections import defaultdict, deque
 from typing import Deque, DefaultDict
 
+MAX_TRACKED_KEYS = 1024
+
 
 class SlidingWindowRateLimiter:
     """Track calls per key within a moving one-minute window."""
@@ -13,16 +16,36 @@ class SlidingWindowRateLimiter:
     def __init__(self, max_per_minute: int) -> None:
         self.max_per_minute = max_per_minute
         self.calls: DefaultDict[str, Deque[float]] = defaultdict(deque)
+        # WHY: One limiter is shared by every request thread.
+        self._lock = threading.Lock()
 
     def allow(self, key: str) -> bool:
-        """Return True if the caller is still within the rate limit."""
+        """Return True if the caller is still within the rate limit.
+
+        Keys may carry a sub-key after the first `/` (`host/client`); calls are
+        counted against the part before it, so sub-keys share one budget.
+        """
 
         now = time.time()
         window_start = now - 60
-        queue = self.calls[key]
-        while queue and queue[0] < window_start:
-            queue.popleft()
-        if len(queue) >= self.max_per_minute:
-            return False
-        queue.append(now)
-        return True
+        with self._lock:
+            queue = self.calls[key.partition("/")[0]]
+            while queue and queue[0] < window_start:
+                queue.popleft()
+            if len(queue) >= self.max_per_minute:
+                return False
+            queue.append(now)
+            if len(self.calls) > MAX_TRACKED_KEYS:
+                self._prune(window_start)
+            return True
+
+    def _prune(self, window_start: float) -> None:
+        """Forget keys with no calls in the window so per-client keys don't pile up."""
+
+        idle = [
+            key
+            for key, queue in self.calls.items()
+            if not queue or queue[-1] < window_start
+        ]
+        for key in idle:
+            del self.calls[key]
@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
-from datetime import date
-from typing import Dict, List, Optional
+from datetime import date, datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, BeforeValidator, Field
+
+
+def _tag_names(value: object) -> object:
+    # WHY: ORM rows carry `Tag` objects; the API exposes their names.
+    if isinstance(value, list):
+        return [getattr(tag, "name", tag) for tag in value]
+    return value
+
+
+Tags = Annotated[List[str], BeforeValidator(_tag_names)]
 
 
 class ChatMessageSchema(BaseModel):
@@ -19,7 +29,15 @@ class ChatRequest(BaseModel):
     """Incoming chat request from the UI."""
 
     message: str
-    history: List[ChatMessageSchema] = Field(default_factory=list)
+    conversation_id: Optional[str] = Field(
+        default=None, description="Continue a stored conversation; omit to start one"
+    )
+    history: List[ChatMessageSchema] = Field(
+        default_factory=list,
+        description=(
+            "Only used when starting a conversation; later turns load server-side"
+        ),
+    )
     mode: str | None = Field(default=None, description="local | cloud | auto")
 
 
@@ -29,6 +47,44 @@ class ChatResponse(BaseModel):
     reply: str
     tokens: int
     model_used: str
+    conversation_id: Optional[str] = None
+    # Token counts and timings of the provider call; absent for cached replies.
+    usage: Optional[Dict[str, object]] = None
+
+
+class ConversationResponse(BaseModel):
+    """Stored messages of one conversation."""
+
+    conversation_id: str
+    messages: List[ChatMessageSchema]
+
+
+class LLMCallMetricSchema(BaseModel):
+    """One recorded LLM provider call."""
+
+    id: int
+    created_at: datetime
+    conversation_id: str
+    provider: str
+    model: str
+    stream: bool
+    prompt_tokens: int
+    completion_tokens: int
+    estimated: bool
+    ttft_ms: Optional[float]
+    latency_ms: float
+    tokens_per_second: Optional[float]
+    load_ms: Optional[float]
+
+    class Config:
+        from_attributes = True
+
+
+class LLMMetricsResponse(BaseModel):
+    """Per provider/model aggregates plus the most recent calls."""
+
+    summary: List[Dict[str, object]]
+    recent: List[LLMCallMetricSchema]
 
 
 class TaskBase(BaseModel):
@@ -37,7 +93,7 @@ class TaskBase(BaseModel):
     title: str
     description: Optional[str] = ""
     due_date: Optional[date]
-    tags: List[str] = Field(default_factory=list)
+    tags: Tags = Field(default_factory=list)
 
 
 class TaskCreate(TaskBase):
@@ -59,13 +115,46 @@ class TaskRead(TaskBase):
     completed: bool
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class TaskSummary(BaseModel):
+    """Task without its description, returned by `GET /tasks?view=summary`."""
+
+    id: int
+    title: str
+    due_date: Optional[date]
+    completed: bool
+    tags: Tags = Field(default_factory=list)
+
+    class Config:
+        from_attributes = True
+
+
+class TaskPage(BaseModel):
+    """One page of tasks; pass `next_cursor` back as `cursor` for the next one."""
+
+    view: Literal["full"] = "full"
+    items: List[TaskRead]
+    next_cursor: Optional[str] = None
+
+
+class TaskSummaryPage(BaseModel):
+    """One page of `GET /tasks?view=summary`."""
+
+    view: Literal["summary"] = "summary"
+    items: List[TaskSummary]
+    next_cursor: Optional[str] = None
+
+
+# WHY: `view` tags each page so validation never guesses which item model applies.
+TaskListing = Annotated[Union[TaskPage, TaskSummaryPage], Field(discriminator="view")]
 
 
 class NoteBase(BaseModel):
     title: str
     content: str
-    tags: List[str] = Field(default_factory=list)
+    tags: Tags = Field(default_factory=list)
 
 
 class NoteCreate(NoteBase):
@@ -76,7 +165,38 @@ class NoteRead(NoteBase):
     id: int
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class NoteSummary(BaseModel):
+    """Note with a content extract, returned by `GET /notes?view=summary`."""
+
+    id: int
+    title: str
+    extract: str
+    tags: Tags = Field(default_factory=list)
+
+    class Config:
+        from_attributes = True
+
+
+class NotePage(BaseModel):
+    """One page of notes; pass `next_cursor` back as `cursor` for the next one."""
+
+    view: Literal["full"] = "full"
+    items: List[NoteRead]
+    next_cursor: Optional[str] = None
+
+
+class NoteSummaryPage(BaseModel):
+    """One page of `GET /notes?view=summary`."""
+
+    view: Literal["summary"] = "summary"
+    items: List[NoteSummary]
+    next_cursor: Optional[str] = None
+
+
+NoteListing = Annotated[Union[NotePage, NoteSummaryPage], Field(discriminator="view")]
 
 
 class SemanticSearchRequest(BaseModel):
@@ -97,6 +217,29 @@ class SemanticSearchResponse(BaseModel):
     results: List[SemanticSearchResult]
 
 
+class ReembedRequest(BaseModel):
+    batch_size: Optional[int] = None
+
+
+class ReembedStatusResponse(BaseModel):
+    state: str
+    target_model: str
+    migrated: int
+    removed: int
+    remaining: int
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+
+class TagCount(BaseModel):
+    """A tag and how many tasks and notes carry it."""
+
+    name: str
+    tasks: int
+    notes: int
+
+
 class PluginToggleRequest(BaseModel):
     name: str
     enabled: bool
@@ -118,7 +261,7 @@ class HealthResponse(BaseModel):
     status: str
     versions: Dict[str, str]
     message: Optional[str] = None
-    checks: Dict[str, Dict[str, str]] | None = None
+    checks: Dict[str, Dict[str, object]] | None = None
 
 
 class PlanStep(BaseModel):
@@ -0,0 +1,32 @@
+"""Token counting shared by context assembly and LLM usage accounting."""
+
+from __future__ import annotations
+
+from typing import Callable
+
+try:
+    import tiktoken  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore
+
+TokenCounter = Callable[[str], int]
+
+# WHY: Local models ship no tokenizer we can load cheaply; ~4 chars per token is the
+# usual estimate for English text with Llama-family vocabularies.
+CHARS_PER_TOKEN = 4
+
+
+def token_counter(model_name: str) -> TokenCounter:
+    """Return a token counting function for `model_name`.
+
+    OpenAI models use `tiktoken` when it is installed; everything else falls back to
+    a character-based estimate.
+    """
+
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.encoding_for_model(model_name)
+            return lambda text: len(encoding.encode(text))
+        except KeyError:
+            pass
+    return lambda text: max(1, -(-len(text) // CHARS_PER_TOKEN)) if text else 0
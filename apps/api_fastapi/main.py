@@ -2,20 +2,66 @@
 
 from __future__ import annotations
 
+import threading
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .core import models
 from .core.banner import print_banner
-from .core.db import engine
+from .core.config import get_settings
+from .core.db import engine, upgrade_schema
 from .core.logging import configure_logging
-from .routers import commands, control, health, llm, memory, notes, plugins, tasks, voice
+from .core.metrics import MetricsMiddleware
+from .core.profiling import ProfilingMiddleware
+from .migrations import require_current
+from .routers import (
+    commands,
+    control,
+    debug,
+    health,
+    llm,
+    memory,
+    notes,
+    plugins,
+    tags,
+    tasks,
+    voice,
+)
+from .services.embed_service import warm_up_embeddings
+from .services.llm_service import close_llm_service, get_llm_service
 
 configure_logging()
 print_banner()
-models.Base.metadata.create_all(bind=engine)
+settings = get_settings()
+if settings.auto_migrate:
+    upgrade_schema()
+else:
+    # WHY: Deployments that migrate out of band fail fast instead of serving
+    # against an old schema.
+    require_current(engine)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Warm shared resources on startup so the first request stays fast."""
+
+    if settings.embed_warmup:
+        # WHY: Loading the embedding model takes seconds; a daemon thread keeps
+        # startup instant while requests that need the model wait on the registry lock.
+        threading.Thread(
+            target=warm_up_embeddings, name="embed-warmup", daemon=True
+        ).start()
+    # WHY: One gateway per process keeps HTTP connections alive and the rate limit
+    # shared.
+    # Its keep-alive task loads MODEL_NAME now so the first chat skips the cold start.
+    get_llm_service().keepalive.start()
+    yield
+    await close_llm_service()
+
 
-app = FastAPI(title="Atlas API", version="0.7")
+app = FastAPI(title="Atlas API", version="0.7", lifespan=lifespan)
 
 # WHY: Allow local Streamlit app to call the API during development.
 app.add_middleware(
@@ -25,20 +71,28 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+if settings.profiling != "off":
+    # WHY: Installed only when enabled, so unprofiled requests pay nothing.
+    app.add_middleware(ProfilingMiddleware)
 
 app.include_router(health.router)
 app.include_router(llm.router)
 app.include_router(memory.router)
 app.include_router(tasks.router)
 app.include_router(notes.router)
+app.include_router(tags.router)
 app.include_router(plugins.router)
 app.include_router(control.router)
 app.include_router(commands.router)
 app.include_router(voice.router)
+app.include_router(debug.router)
 
 
 @app.get("/")
 def index() -> dict:
     """Simple root endpoint referencing documentation."""
 
-    return {"message": "Welcome to Atlas API. Visit /docs for interactive documentation."}
+    return {
+        "message": "Welcome to Atlas API. Visit /docs for interactive documentation."
+    }
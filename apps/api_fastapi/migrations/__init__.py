@@ -0,0 +1,132 @@
+"""Versioned schema migrations for `atlas.db`.
+
+Each `versions/vNNNN_<name>.py` module defines `upgrade(engine)` built from the
+idempotent helpers in `ops`. Applied versions are recorded in `schema_migrations`;
+an up-to-date database costs a single query at startup.
+
+Run `python scripts/migrate.py` (or `make migrate`) before starting the API. With
+`AUTO_MIGRATE=true` the API applies pending migrations itself on startup.
+"""
+
+from __future__ import annotations
+
+import importlib
+import logging
+import pkgutil
+import re
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from types import ModuleType
+from typing import Callable, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+
+from . import versions
+
+logger = logging.getLogger(__name__)
+
+_MODULE_NAME = re.compile(r"^v(?P<version>\d{4})_(?P<name>\w+)$")
+
+
+@dataclass
+class Migration:
+    """One schema version and the function that upgrades to it."""
+
+    version: int
+    name: str
+    module: ModuleType
+
+    def upgrade(self, engine: Engine) -> None:
+        self.module.upgrade(engine)
+
+
+def discover() -> List[Migration]:
+    """Return every migration in `versions/`, ordered by version."""
+
+    found = []
+    for info in pkgutil.iter_modules(versions.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{info.name}")
+        found.append(Migration(int(match["version"]), match["name"], module))
+    found.sort(key=lambda migration: migration.version)
+    numbers = [migration.version for migration in found]
+    if len(set(numbers)) != len(numbers):
+        raise RuntimeError(f"Duplicate migration versions: {numbers}")
+    return found
+
+
+def applied_versions(engine: Engine) -> Set[int]:
+    with engine.connect() as conn:
+        try:
+            rows = conn.execute(text("SELECT version FROM schema_migrations"))
+        except OperationalError:
+            # A database created before versioning, or a brand new file.
+            return set()
+        return {row[0] for row in rows}
+
+
+def pending(engine: Engine) -> List[Migration]:
+    applied = applied_versions(engine)
+    return [migration for migration in discover() if migration.version not in applied]
+
+
+def upgrade(
+    engine: Engine,
+    target: Optional[int] = None,
+    progress: Optional[Callable[[Migration, float], None]] = None,
+) -> List[Migration]:
+    """Apply pending migrations up to `target` (default: all) and return them."""
+
+    todo = [
+        migration
+        for migration in pending(engine)
+        if target is None or migration.version <= target
+    ]
+    if not todo:
+        return []
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                " version INTEGER PRIMARY KEY, name TEXT NOT NULL,"
+                " applied_at TEXT NOT NULL, seconds REAL NOT NULL)"
+            )
+        )
+    for migration in todo:
+        started = time.perf_counter()
+        logger.info("Applying migration %04d_%s", migration.version, migration.name)
+        migration.upgrade(engine)
+        seconds = time.perf_counter() - started
+        with engine.begin() as conn:
+            conn.execute(
+                text(
+                    "INSERT OR IGNORE INTO schema_migrations"
+                    " (version, name, applied_at, seconds)"
+                    " VALUES (:version, :name, :applied_at, :seconds)"
+                ),
+                {
+                    "version": migration.version,
+                    "name": migration.name,
+                    "applied_at": datetime.utcnow().isoformat(),
+                    "seconds": round(seconds, 3),
+                },
+            )
+        if progress:
+            progress(migration, seconds)
+    return todo
+
+
+def require_current(engine: Engine) -> None:
+    """Raise if migrations are pending (used when `AUTO_MIGRATE=false`)."""
+
+    missing = pending(engine)
+    if missing:
+        names = ", ".join(f"{m.version:04d}_{m.name}" for m in missing)
+        raise RuntimeError(
+            f"Database schema is behind ({names}); run `python scripts/migrate.py`"
+        )
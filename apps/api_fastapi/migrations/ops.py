@@ -0,0 +1,184 @@
+"""Idempotent schema operations for migrations.
+
+Every helper checks before it changes anything, so a migration interrupted halfway
+can simply be run again. Each step commits on its own: WAL readers keep serving
+while an index builds or a backfill runs, and writers only wait for one short batch.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def _name(identifier: str) -> str:
+    # WHY: DDL cannot use bound parameters, so identifiers are checked instead.
+    if not _IDENTIFIER.match(identifier):
+        raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+    return identifier
+
+
+def table_exists(engine: Engine, table: str) -> bool:
+    with engine.connect() as conn:
+        return (
+            conn.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+                ),
+                {"name": table},
+            ).first()
+            is not None
+        )
+
+
+def columns(engine: Engine, table: str) -> Set[str]:
+    with engine.connect() as conn:
+        rows = conn.execute(text(f"PRAGMA table_info({_name(table)})"))
+        return {row[1] for row in rows}
+
+
+def execute(engine: Engine, statement: str, params: Optional[Dict] = None) -> int:
+    """Run one statement in its own transaction and return the affected row count."""
+
+    with engine.begin() as conn:
+        return conn.execute(text(statement), params or {}).rowcount
+
+
+def create_table(engine: Engine, ddl: str) -> None:
+    """Run a `CREATE TABLE IF NOT EXISTS ...` statement."""
+
+    if "IF NOT EXISTS" not in ddl.upper():
+        raise ValueError("create_table() expects CREATE TABLE IF NOT EXISTS")
+    execute(engine, ddl)
+
+
+def add_column(engine: Engine, table: str, column: str, ddl: str) -> bool:
+    """Add `column` (declared by `ddl`, e.g. `dim INTEGER NOT NULL DEFAULT 0`).
+
+    SQLite only adds NOT NULL columns that carry a default; the default fills
+    existing rows without rewriting the table.
+    """
+
+    if column in columns(engine, table):
+        return False
+    execute(engine, f"ALTER TABLE {_name(table)} ADD COLUMN {ddl}")
+    logger.info("Added column %s.%s", table, column)
+    return True
+
+
+def create_index(
+    engine: Engine,
+    name: str,
+    table: str,
+    index_columns: Iterable[str],
+    unique: bool = False,
+    cleanup: Optional[str] = None,
+) -> bool:
+    """Create an index if it is missing.
+
+    For unique indexes the newest row (highest `id`) of each duplicate key is kept
+    first; `cleanup` then runs in the same transaction to drop rows that pointed at
+    the removed ones.
+    """
+
+    with engine.connect() as conn:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"),
+            {"name": name},
+        ).first()
+    if exists:
+        return False
+    column_sql = ", ".join(_name(column) for column in index_columns)
+    with engine.begin() as conn:
+        if unique:
+            removed = conn.execute(
+                text(
+                    f"DELETE FROM {_name(table)} WHERE id NOT IN"
+                    f" (SELECT MAX(id) FROM {table} GROUP BY {column_sql})"
+                )
+            ).rowcount
+            if removed:
+                logger.warning("Removed %d duplicate rows from %s", removed, table)
+                if cleanup:
+                    conn.execute(text(cleanup))
+        conn.execute(
+            text(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {_name(name)}"
+                f" ON {table} ({column_sql})"
+            )
+        )
+    logger.info("Created index %s on %s", name, table)
+    return True
+
+
+def backfill(
+    engine: Engine,
+    table: str,
+    assignments: str,
+    pending: str,
+    params: Optional[Dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Run `UPDATE table SET assignments` in batches until no row matches `pending`.
+
+    `pending` must stop matching a row once it is updated, which is what lets an
+    interrupted backfill resume where it stopped. Returns the number of rows updated.
+    """
+
+    total = 0
+    statement = (
+        f"UPDATE {_name(table)} SET {assignments} WHERE rowid IN"
+        f" (SELECT rowid FROM {table} WHERE {pending} LIMIT :batch_size)"
+    )
+    while True:
+        updated = execute(
+            engine, statement, {**(params or {}), "batch_size": batch_size}
+        )
+        total += updated
+        if updated < batch_size:
+            break
+    if total:
+        logger.info("Backfilled %d rows of %s", total, table)
+    return total
+
+
+def copy_in_batches(
+    engine: Engine,
+    table: str,
+    statement: str,
+    params: Optional[Dict] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> int:
+    """Run `statement` once per window of `table` ids, bound as `:low` and `:high`.
+
+    Meant for idempotent `INSERT OR IGNORE ... SELECT ... WHERE id > :low AND
+    id <= :high` copies, so a rerun only repeats work. Returns the rows inserted.
+    """
+
+    with engine.connect() as conn:
+        last_id = conn.execute(text(f"SELECT MAX(id) FROM {_name(table)}")).scalar()
+    total = 0
+    for low in range(0, last_id or 0, batch_size):
+        total += execute(
+            engine, statement, {**(params or {}), "low": low, "high": low + batch_size}
+        )
+    return total
+
+
+def drop_column(engine: Engine, table: str, column: str) -> bool:
+    """Drop `column` once nothing reads it (needs SQLite 3.35+; rewrites the table)."""
+
+    if column not in columns(engine, table):
+        return False
+    execute(engine, f"ALTER TABLE {_name(table)} DROP COLUMN {_name(column)}")
+    logger.info("Dropped column %s.%s", table, column)
+    return True
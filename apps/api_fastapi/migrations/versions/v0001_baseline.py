@@ -0,0 +1,133 @@
+"""Tables as of the first versioned release, plus columns older files lack.
+
+Databases created by the former `create_all()` startup already have most tables;
+every statement here is a no-op for them except the missing columns.
+"""
+
+from __future__ import annotations
+
+from sqlalchemy.engine import Engine
+
+from .. import ops
+
+TABLES = [
+    """CREATE TABLE IF NOT EXISTS audit_events (
+        id INTEGER NOT NULL PRIMARY KEY,
+        tool_name VARCHAR(64) NOT NULL,
+        args_json TEXT NOT NULL,
+        result_summary TEXT NOT NULL,
+        risk_level VARCHAR(16) NOT NULL,
+        confirmation_token VARCHAR(64),
+        succeeded BOOLEAN NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS chat_messages (
+        id INTEGER NOT NULL PRIMARY KEY,
+        conversation_id VARCHAR(64) DEFAULT '' NOT NULL,
+        role VARCHAR(16) NOT NULL,
+        content TEXT NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS document_chunks (
+        id INTEGER NOT NULL PRIMARY KEY,
+        source_path TEXT NOT NULL,
+        chunk_index INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS document_files (
+        id INTEGER NOT NULL PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        mtime FLOAT NOT NULL,
+        content_hash VARCHAR(64) NOT NULL,
+        chunk_count INTEGER NOT NULL,
+        chunker VARCHAR(64) DEFAULT '' NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS embeddings (
+        id INTEGER NOT NULL PRIMARY KEY,
+        item_type VARCHAR(32) NOT NULL,
+        item_id INTEGER NOT NULL,
+        vector BLOB NOT NULL,
+        model_name VARCHAR(255) DEFAULT '' NOT NULL,
+        dim INTEGER DEFAULT '0' NOT NULL,
+        normalized BOOLEAN DEFAULT '0' NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS llm_call_metrics (
+        id INTEGER NOT NULL PRIMARY KEY,
+        conversation_id VARCHAR(64) NOT NULL,
+        provider VARCHAR(16) NOT NULL,
+        model VARCHAR(128) NOT NULL,
+        stream BOOLEAN NOT NULL,
+        prompt_tokens INTEGER NOT NULL,
+        completion_tokens INTEGER NOT NULL,
+        estimated BOOLEAN NOT NULL,
+        ttft_ms FLOAT,
+        latency_ms FLOAT NOT NULL,
+        tokens_per_second FLOAT,
+        load_ms FLOAT,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS notes (
+        id INTEGER NOT NULL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        content TEXT NOT NULL,
+        tags VARCHAR(255) NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS plugin_state (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL UNIQUE,
+        enabled BOOLEAN NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER NOT NULL PRIMARY KEY,
+        title VARCHAR(255) NOT NULL,
+        description TEXT NOT NULL,
+        due_date DATE,
+        tags VARCHAR(255) NOT NULL,
+        completed BOOLEAN NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+]
+
+# Columns added after their table first shipped: (table, column, declaration).
+LATE_COLUMNS = [
+    (
+        "chat_messages",
+        "conversation_id",
+        "conversation_id VARCHAR(64) NOT NULL DEFAULT ''",
+    ),
+    ("document_files", "chunker", "chunker VARCHAR(64) NOT NULL DEFAULT ''"),
+    ("embeddings", "model_name", "model_name VARCHAR(255) NOT NULL DEFAULT ''"),
+    ("embeddings", "dim", "dim INTEGER NOT NULL DEFAULT '0'"),
+    ("embeddings", "normalized", "normalized BOOLEAN NOT NULL DEFAULT '0'"),
+]
+
+
+def upgrade(engine: Engine) -> None:
+    for ddl in TABLES:
+        ops.create_table(engine, ddl)
+    for table, column, ddl in LATE_COLUMNS:
+        ops.add_column(engine, table, column, ddl)
+    ops.create_index(
+        engine, "ix_chat_messages_conversation_id", "chat_messages", ["conversation_id"]
+    )
+    ops.create_index(
+        engine,
+        "ix_llm_call_metrics_conversation_id",
+        "llm_call_metrics",
+        ["conversation_id"],
+    )
@@ -0,0 +1,32 @@
+"""Indexes for embedding, document chunk and task due-date lookups."""
+
+from __future__ import annotations
+
+from sqlalchemy.engine import Engine
+
+from .. import ops
+
+# Embeddings of chunks dropped as duplicates would otherwise point at nothing.
+ORPHAN_CHUNK_EMBEDDINGS = (
+    "DELETE FROM embeddings WHERE item_type = 'document'"
+    " AND item_id NOT IN (SELECT id FROM document_chunks)"
+)
+
+
+def upgrade(engine: Engine) -> None:
+    ops.create_index(
+        engine,
+        "ix_embeddings_item",
+        "embeddings",
+        ["item_type", "item_id"],
+        unique=True,
+    )
+    ops.create_index(
+        engine,
+        "ix_document_chunks_source_chunk",
+        "document_chunks",
+        ["source_path", "chunk_index"],
+        unique=True,
+        cleanup=ORPHAN_CHUNK_EMBEDDINGS,
+    )
+    ops.create_index(engine, "ix_tasks_due_date", "tasks", ["due_date"])
@@ -0,0 +1,75 @@
+"""Move task and note tags from JSON strings into `tags` plus link tables.
+
+Tag names and links are copied in id batches with `INSERT OR IGNORE`, then the old
+`tags` columns are dropped; an interrupted run resumes from the first table that
+still has its column.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+from sqlalchemy.engine import Engine
+
+from .. import ops
+
+TABLES = [
+    """CREATE TABLE IF NOT EXISTS tags (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        created_at DATETIME NOT NULL,
+        updated_at DATETIME NOT NULL
+    )""",
+    """CREATE TABLE IF NOT EXISTS task_tags (
+        task_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (task_id, tag_id),
+        FOREIGN KEY(task_id) REFERENCES tasks (id) ON DELETE CASCADE,
+        FOREIGN KEY(tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    )""",
+    """CREATE TABLE IF NOT EXISTS note_tags (
+        note_id INTEGER NOT NULL,
+        tag_id INTEGER NOT NULL,
+        PRIMARY KEY (note_id, tag_id),
+        FOREIGN KEY(note_id) REFERENCES notes (id) ON DELETE CASCADE,
+        FOREIGN KEY(tag_id) REFERENCES tags (id) ON DELETE CASCADE
+    )""",
+]
+
+# Malformed JSON is treated as "no tags" instead of aborting the migration.
+_TAG_VALUES = (
+    "json_each(CASE WHEN json_valid({table}.tags) THEN {table}.tags ELSE '[]' END)"
+    " AS tag"
+)
+COPY_NAMES = (
+    "INSERT OR IGNORE INTO tags (name, created_at, updated_at)"
+    " SELECT DISTINCT trim(tag.value), :now, :now FROM {table}, "
+    + _TAG_VALUES
+    + " WHERE trim(tag.value) != '' AND {table}.id > :low AND {table}.id <= :high"
+)
+COPY_LINKS = (
+    "INSERT OR IGNORE INTO {link} ({item_column}, tag_id)"
+    " SELECT {table}.id, tags.id FROM {table}, "
+    + _TAG_VALUES
+    + " JOIN tags ON tags.name = trim(tag.value)"
+    " WHERE {table}.id > :low AND {table}.id <= :high"
+)
+# item table -> (link table, link column)
+LINKS = {"tasks": ("task_tags", "task_id"), "notes": ("note_tags", "note_id")}
+
+
+def upgrade(engine: Engine) -> None:
+    for ddl in TABLES:
+        ops.create_table(engine, ddl)
+    # WHY: The unique index must exist before the copy so INSERT OR IGNORE dedupes.
+    ops.create_index(engine, "ix_tags_name", "tags", ["name"], unique=True)
+    now = datetime.utcnow().isoformat(sep=" ")
+    for table, (link, item_column) in LINKS.items():
+        if "tags" not in ops.columns(engine, table):
+            continue
+        names = {"table": table, "link": link, "item_column": item_column}
+        ops.copy_in_batches(engine, table, COPY_NAMES.format(**names), {"now": now})
+        ops.copy_in_batches(engine, table, COPY_LINKS.format(**names))
+        ops.drop_column(engine, table, "tags")
+    ops.create_index(engine, "ix_task_tags_tag", "task_tags", ["tag_id", "task_id"])
+    ops.create_index(engine, "ix_note_tags_tag", "note_tags", ["tag_id", "note_id"])
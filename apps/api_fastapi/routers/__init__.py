@@ -1,15 +1,29 @@
 """Expose FastAPI routers."""
 
-from . import commands, control, health, llm, memory, notes, plugins, tasks, voice
+from . import (
+    commands,
+    control,
+    debug,
+    health,
+    llm,
+    memory,
+    notes,
+    plugins,
+    tags,
+    tasks,
+    voice,
+)
 
 __all__ = [
     "commands",
     "control",
+    "debug",
     "health",
     "llm",
     "memory",
     "notes",
     "plugins",
+    "tags",
     "tasks",
     "voice",
 ]
@@ -0,0 +1,36 @@
+"""Debug endpoints for request profiles."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import FileResponse
+
+from ..core.config import get_settings
+from ..core.profiling import PROFILE_SUFFIX, list_profiles
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+settings = get_settings()
+
+
+@router.get("/profiles")
+def profiles() -> dict:
+    """List stored request profiles, newest first."""
+
+    return {
+        "mode": settings.profiling,
+        "directory": str(settings.profile_dir),
+        "profiles": list_profiles(settings.profile_dir),
+    }
+
+
+@router.get("/profiles/{name}")
+def profile(name: str) -> FileResponse:
+    """Download one profile in the collapsed-stack format."""
+
+    path = settings.profile_dir / name
+    # WHY: Only bare file names from the listing are served, never other paths.
+    if "/" in name or "\\" in name or not name.endswith(PROFILE_SUFFIX):
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if not path.is_file():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain")
@@ -5,25 +5,35 @@ from __future__ import annotations
 import platform
 
 from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
 
+from ..core import metrics as metrics_module
 from ..core.config import get_health_metadata, get_settings
+from ..services.embed_service import get_model_registry
+from ..services.llm_service import get_llm_service
 
 router = APIRouter(tags=["health"])
 settings = get_settings()
 
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
 
 @router.get("/health")
 def health() -> dict:
     """Return API status and version info."""
 
     metadata = get_health_metadata()
+    llm = get_llm_service()
     checks = {
         "ollama": {
             "configured": bool(settings.ollama_host),
+            **llm.keepalive.status(),
         },
         "openai": {
             "configured": bool(settings.openai_api_key),
         },
+        "embeddings": get_model_registry().stats(),
+        "llm": llm.stats(),
     }
     return {
         "status": "ok",
@@ -34,3 +44,12 @@ def health() -> dict:
         },
         "checks": checks,
     }
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Expose in-process counters and histograms in the Prometheus text format."""
+
+    return PlainTextResponse(
+        metrics_module.REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE
+    )
@@ -2,32 +2,175 @@
 
 from __future__ import annotations
 
-from typing import List
+import asyncio
+import json
+import uuid
+from typing import AsyncIterator, Awaitable, Dict, List, Tuple
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
+from ..core import db as db_module
 from ..core import schemas
-from ..core.deps import get_db
-from ..services.llm_service import LLMService
+from ..core.config import get_settings
+from ..core.deps import get_client_key, get_db
+from ..services.context_builder import ContextBuilder
+from ..services.llm_cache import UNCACHEABLE_MODELS
+from ..services.llm_metrics_service import LLMMetricsService
+from ..services.llm_service import LLMService, get_llm_service
 from ..services.memory_service import MemoryService
 
 router = APIRouter(prefix="/llm", tags=["llm"])
+settings = get_settings()
+
+DISCONNECT_POLL_SECONDS = 0.5
+CLIENT_CLOSED_REQUEST = 499
+
+
+def _build_context(
+    memory: MemoryService, payload: schemas.ChatRequest
+) -> Tuple[str, List[Dict]]:
+    """Return `(conversation_id, context)` trimmed to the token budget."""
+
+    if payload.conversation_id:
+        conversation_id = payload.conversation_id
+        history = memory.conversation_history(
+            conversation_id, settings.chat_history_messages
+        )
+    else:
+        # WHY: A new conversation may be seeded with client-side history; it is used
+        # as context only and never persisted, so turns are not stored twice.
+        conversation_id = uuid.uuid4().hex
+        history = [msg.dict() for msg in payload.history]
+    return conversation_id, ContextBuilder(memory).build(payload.message, history)
+
+
+def _turn(message: str, reply: str) -> List[Dict]:
+    return [
+        {"role": "user", "content": message},
+        {"role": "assistant", "content": reply},
+    ]
+
+
+def _save_turn(
+    session: Session,
+    conversation_id: str,
+    message: str,
+    response: Dict,
+    stream: bool = False,
+) -> None:
+    """Append the turn and record the provider call's usage in one transaction."""
+
+    # WHY: Rate-limit/busy/unavailable notices are not model output; stored, they
+    # would be fed back to the model as context on the next turn.
+    if response.get("model_used") in UNCACHEABLE_MODELS:
+        return
+    MemoryService(session).save_chat_messages(
+        _turn(message, response["reply"]), conversation_id
+    )
+    LLMMetricsService(session).record(response.get("usage"), conversation_id, stream)
+
+
+def _save_streamed_turn(conversation_id: str, message: str, response: Dict) -> None:
+    # WHY: The request session is closed once streaming starts.
+    with db_module.get_session() as session:
+        _save_turn(session, conversation_id, message, response, stream=True)
+
+
+async def _unless_disconnected(request: Request, work: Awaitable[Dict]) -> Dict | None:
+    """Await `work`, cancelling it (and returning None) if the client goes away."""
+
+    task = asyncio.ensure_future(work)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            task.cancel()
+            return None
 
 
 @router.post("/chat", response_model=schemas.ChatResponse)
-def chat(
+async def chat(
     payload: schemas.ChatRequest,
+    request: Request,
     db: Session = Depends(get_db),
-) -> schemas.ChatResponse:
+    service: LLMService = Depends(get_llm_service),
+    client_key: str = Depends(get_client_key),
+):
     """Main chat endpoint bridging UI and model."""
 
-    service = LLMService()
     memory = MemoryService(db)
-    history = [msg.dict() for msg in payload.history]
-    memory.save_chat_messages(history)
-    response = service.chat(payload.message, history, payload.mode)
-    memory.save_chat_messages([
-        {"role": "assistant", "content": response["reply"]}
-    ])
-    return schemas.ChatResponse(**response)
+    # WHY: SQLite work stays on the threadpool; only the generation runs on the loop.
+    conversation_id, context = await run_in_threadpool(_build_context, memory, payload)
+    response = await _unless_disconnected(
+        request, service.achat(payload.message, context, payload.mode, client_key)
+    )
+    if response is None:
+        return Response(status_code=CLIENT_CLOSED_REQUEST)
+    await run_in_threadpool(_save_turn, db, conversation_id, payload.message, response)
+    return schemas.ChatResponse(**response, conversation_id=conversation_id)
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    payload: schemas.ChatRequest,
+    db: Session = Depends(get_db),
+    service: LLMService = Depends(get_llm_service),
+    client_key: str = Depends(get_client_key),
+) -> StreamingResponse:
+    """Stream the reply as NDJSON frames: `token` frames then one `done` frame."""
+
+    conversation_id, context = await run_in_threadpool(
+        _build_context, MemoryService(db), payload
+    )
+
+    async def frames() -> AsyncIterator[str]:
+        # A client disconnect cancels this generator, which aborts the provider stream.
+        done = None
+        async for event in service.astream_chat(
+            payload.message, context, payload.mode, client_key
+        ):
+            if event["type"] == "done":
+                done = event = {**event, "conversation_id": conversation_id}
+            yield json.dumps(event) + "\n"
+        if done is not None:
+            await run_in_threadpool(
+                _save_streamed_turn, conversation_id, payload.message, done
+            )
+
+    return StreamingResponse(frames(), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/conversations/{conversation_id}", response_model=schemas.ConversationResponse
+)
+def conversation(
+    conversation_id: str,
+    limit: int | None = None,
+    db: Session = Depends(get_db),
+) -> schemas.ConversationResponse:
+    """Return the stored messages of a conversation, oldest first."""
+
+    messages = MemoryService(db).conversation_history(conversation_id, limit)
+    return schemas.ConversationResponse(
+        conversation_id=conversation_id,
+        messages=[schemas.ChatMessageSchema(**msg) for msg in messages],
+    )
+
+
+@router.get("/metrics", response_model=schemas.LLMMetricsResponse)
+def metrics(
+    limit: int = Query(50, ge=1, le=500), db: Session = Depends(get_db)
+) -> schemas.LLMMetricsResponse:
+    """Return per provider/model token and latency aggregates plus recent calls."""
+
+    service = LLMMetricsService(db)
+    return schemas.LLMMetricsResponse(
+        summary=service.summary(),
+        recent=[
+            schemas.LLMCallMetricSchema.from_orm(row) for row in service.recent(limit)
+        ],
+    )
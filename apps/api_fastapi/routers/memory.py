@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from ..core import schemas
 from ..core.deps import get_db
 from ..services.memory_service import MemoryService
+from ..services.reembed_service import reembed_status, start_background_reembed
 
 router = APIRouter(prefix="/memory", tags=["memory"])
 
@@ -22,3 +23,18 @@ def semantic_search(
     service = MemoryService(db)
     results = service.semantic_search(payload.query, payload.top_k)
     return schemas.SemanticSearchResponse(results=results)
+
+
+@router.post("/reembed", response_model=schemas.ReembedStatusResponse)
+def start_reembed(payload: schemas.ReembedRequest) -> schemas.ReembedStatusResponse:
+    """Start migrating embeddings written by another model in the background."""
+
+    status = start_background_reembed(payload.batch_size)
+    return schemas.ReembedStatusResponse(**status.as_dict())
+
+
+@router.get("/reembed", response_model=schemas.ReembedStatusResponse)
+def get_reembed_status() -> schemas.ReembedStatusResponse:
+    """Report progress of the current or last re-embed job."""
+
+    return schemas.ReembedStatusResponse(**reembed_status().as_dict())
@@ -2,21 +2,53 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..core import schemas
 from ..core.deps import get_db
+from ..core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..services.note_service import NoteService
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
 
-@router.get("", response_model=list[schemas.NoteRead])
-def list_notes(db: Session = Depends(get_db)) -> list[schemas.NoteRead]:
+@router.get("", response_model=schemas.NoteListing)
+def list_notes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    view: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_db),
+) -> schemas.NotePage | schemas.NoteSummaryPage:
+    """List notes newest first, one keyset page at a time."""
+
     service = NoteService(db)
-    notes = service.list_notes()
-    return [schemas.NoteRead.from_orm(note) for note in notes]
+    try:
+        notes, next_cursor = service.page_notes(
+            limit=limit, cursor=cursor, tag=tag, summary=view == "summary"
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if view == "summary":
+        return schemas.NoteSummaryPage(
+            items=[schemas.NoteSummary.from_orm(note) for note in notes],
+            next_cursor=next_cursor,
+        )
+    return schemas.NotePage(
+        items=[schemas.NoteRead.from_orm(note) for note in notes],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{note_id}", response_model=schemas.NoteRead)
+def get_note(note_id: int, db: Session = Depends(get_db)) -> schemas.NoteRead:
+    note = NoteService(db).get_note(note_id)
+    if not note:
+        raise HTTPException(status_code=404, detail="Note not found")
+    return schemas.NoteRead.from_orm(note)
 
 
 @router.post("", response_model=schemas.NoteRead)
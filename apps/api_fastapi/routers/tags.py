@@ -0,0 +1,26 @@
+"""Tag endpoints."""
+
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from ..core import schemas
+from ..core.deps import get_db
+from ..services.tag_service import TagService
+
+router = APIRouter(prefix="/tags", tags=["tags"])
+
+
+@router.get("", response_model=list[schemas.TagCount])
+def list_tags(
+    prefix: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: Session = Depends(get_db),
+) -> list[schemas.TagCount]:
+    """Tag cloud: tags in use with task/note counts, optionally by name prefix."""
+
+    rows = TagService(db).cloud(prefix=prefix, limit=limit)
+    return [schemas.TagCount(**row) for row in rows]
@@ -2,21 +2,55 @@
 
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..core import schemas
 from ..core.deps import get_db
+from ..core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from ..services.task_service import TaskService
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
-@router.get("", response_model=list[schemas.TaskRead])
-def list_tasks(db: Session = Depends(get_db)) -> list[schemas.TaskRead]:
+@router.get("", response_model=schemas.TaskListing)
+def list_tasks(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    tag: Optional[str] = None,
+    completed: Optional[bool] = None,
+    due_from: Optional[date] = None,
+    due_to: Optional[date] = None,
+    view: Literal["full", "summary"] = "full",
+    db: Session = Depends(get_db),
+) -> schemas.TaskPage | schemas.TaskSummaryPage:
+    """List tasks by due date, one keyset page at a time."""
+
     service = TaskService(db)
-    tasks = service.list_tasks()
-    return [schemas.TaskRead.from_orm(task) for task in tasks]
+    try:
+        tasks, next_cursor = service.page_tasks(
+            limit=limit,
+            cursor=cursor,
+            tag=tag,
+            completed=completed,
+            due_from=due_from,
+            due_to=due_to,
+            summary=view == "summary",
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if view == "summary":
+        return schemas.TaskSummaryPage(
+            items=[schemas.TaskSummary.from_orm(task) for task in tasks],
+            next_cursor=next_cursor,
+        )
+    return schemas.TaskPage(
+        items=[schemas.TaskRead.from_orm(task) for task in tasks],
+        next_cursor=next_cursor,
+    )
 
 
 @router.post("", response_model=schemas.TaskRead)
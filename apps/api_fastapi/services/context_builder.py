@@ -0,0 +1,130 @@
+"""Token-budgeted prompt context: memory hits, a running summary and recent turns."""
+
+from __future__ import annotations
+
+import logging
+import re
+from typing import Dict, List, Optional
+
+from ..core.config import get_settings
+from ..core.tokens import TokenCounter, token_counter
+from .memory_service import MemoryService
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Role/formatting overhead every chat message costs on top of its content.
+MESSAGE_OVERHEAD_TOKENS = 4
+SUMMARY_LINE_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class ContextBuilder:
+    """Fill a token budget with the most useful context for the next reply.
+
+    Priority order: the new message, semantic memory hits (capped at
+    `CONTEXT_MEMORY_SHARE` of the budget), the most recent turns, then an extractive
+    summary of the older turns that no longer fit.
+    """
+
+    def __init__(
+        self,
+        memory: MemoryService,
+        count_tokens: Optional[TokenCounter] = None,
+        budget: Optional[int] = None,
+    ) -> None:
+        self.memory = memory
+        self.count_tokens = count_tokens or token_counter(settings.model_name)
+        self.budget = budget or settings.context_token_budget
+
+    def build(self, message: str, history: List[Dict]) -> List[Dict]:
+        """Return the messages to send before `message` (system context + turns)."""
+
+        remaining = self.budget - self._message_tokens(message)
+        memory_lines = self._memory_lines(
+            message, int(self.budget * settings.context_memory_share)
+        )
+        remaining -= self._lines_tokens(memory_lines)
+
+        summary_reserve = int(self.budget * settings.context_summary_share)
+        recent: List[Dict] = []
+        used = 0
+        older = list(history)
+        while older:
+            tokens = self._message_tokens(older[-1]["content"])
+            # WHY: The summary reserve only applies once older turns are dropped.
+            reserve = summary_reserve if len(older) > 1 else 0
+            if used + tokens > remaining - reserve:
+                break
+            recent.insert(0, older.pop())
+            used += tokens
+
+        summary_lines = self._summary_lines(older, remaining - used)
+        system = self._system_message(memory_lines, summary_lines)
+        return ([system] if system else []) + recent
+
+    def _memory_lines(self, query: str, budget: int) -> List[str]:
+        if budget <= 0 or settings.context_memory_top_k <= 0:
+            return []
+        try:
+            hits = self.memory.semantic_search(query, settings.context_memory_top_k)
+        except Exception:  # pragma: no cover - search must never break chat
+            logger.exception("Memory retrieval failed; answering without it")
+            return []
+        lines: List[str] = []
+        used = 0
+        for hit in hits:
+            if hit["score"] < settings.context_memory_min_score:
+                continue
+            line = (
+                f"- [{hit['type']}] {hit['title']}: {' '.join(hit['extract'].split())}"
+            )
+            tokens = self.count_tokens(line)
+            if used + tokens > budget:
+                break
+            lines.append(line)
+            used += tokens
+        return lines
+
+    def _summary_lines(self, older: List[Dict], budget: int) -> List[str]:
+        """Summarise dropped turns by their first sentence, newest first until full."""
+
+        lines: List[str] = []
+        used = 0
+        for turn in reversed(older):
+            first = _SENTENCE_END.split(" ".join(turn["content"].split()), 1)[0]
+            line = f"- {turn['role']}: {first[:SUMMARY_LINE_CHARS]}"
+            tokens = self.count_tokens(line)
+            if used + tokens > budget:
+                break
+            lines.insert(0, line)
+            used += tokens
+        return lines
+
+    def _system_message(
+        self, memory_lines: List[str], summary_lines: List[str]
+    ) -> Optional[Dict]:
+        sections = []
+        if memory_lines:
+            sections.append(
+                "Relevant notes, tasks and documents:\n" + "\n".join(memory_lines)
+            )
+        if summary_lines:
+            sections.append(
+                "Earlier in this conversation:\n" + "\n".join(summary_lines)
+            )
+        if not sections:
+            return None
+        return {"role": "system", "content": "\n\n".join(sections)}
+
+    def _message_tokens(self, content: str) -> int:
+        return self.count_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+
+    def _lines_tokens(self, lines: List[str]) -> int:
+        if not lines:
+            return 0
+        # Headers and the system message itself are counted with the lines.
+        return (
+            sum(self.count_tokens(line) for line in lines) + MESSAGE_OVERHEAD_TOKENS * 2
+        )
@@ -2,9 +2,11 @@
 
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass
 from typing import Callable, Dict, List, Tuple
 
+from ..core import metrics
 from ..core.config import get_settings
 from ..core.permissions import PermissionTier, requires_confirmation
 from ..core.platform_adapters import load_toolkit
@@ -12,6 +14,12 @@ from ..core.schemas import ExecuteResult, PlanResponse, PlanStep
 from .audit_service import AuditService
 from .memory_service import MemoryService
 
+TOOL_SECONDS = metrics.histogram(
+    "atlas_tool_duration_seconds",
+    "ControlService tool executor time by tool and result status",
+    ("tool", "status"),
+)
+
 
 @dataclass
 class ToolDefinition:
@@ -247,8 +255,18 @@ class ControlService:
                 )
                 status = "pending-confirmation"
                 continue
-            result = tool.executor(step.args)
+            started = time.perf_counter()
+            try:
+                result = tool.executor(step.args)
+            except Exception:
+                TOOL_SECONDS.observe(
+                    time.perf_counter() - started, tool=step.tool, status="exception"
+                )
+                raise
             result_status = str(result.get("status", "ok"))
+            TOOL_SECONDS.observe(
+                time.perf_counter() - started, tool=step.tool, status=result_status
+            )
             summary = str(result.get("details", ""))
             audit_id = self.audit.record_event(
                 step.tool,
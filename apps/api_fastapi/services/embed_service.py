@@ -2,8 +2,14 @@
 
 from __future__ import annotations
 
+import hashlib
 import logging
-from typing import Iterable, List
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 
@@ -12,38 +18,343 @@ try:
 except ImportError:  # pragma: no cover - optional dependency
     SentenceTransformer = None  # type: ignore
 
+try:
+    import psutil  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    psutil = None  # type: ignore
+
+from ..core import metrics
 from ..core.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+FALLBACK_MODEL_NAME = "random-fallback"
+FALLBACK_DIMENSION = 384
 
-class EmbeddingService:
-    """Create embeddings using sentence-transformers with graceful fallback."""
+EMBED_BATCH_SIZE = metrics.histogram(
+    "atlas_embedding_batch_size",
+    "Texts per embed() call and how many reached the model",
+    ("stage",),
+    buckets=metrics.SIZE_BUCKETS,
+)
+EMBED_SECONDS = metrics.histogram(
+    "atlas_embedding_duration_seconds", "Model encode time per batch", ("model",)
+)
+
+
+class EmbeddingModelRegistry:
+    """Load each sentence-transformers model once and share it across the process."""
 
     def __init__(self) -> None:
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> Any:
+        """Return the loaded model (or None when unavailable), loading it lazily."""
+
+        # WHY: The fast path skips the lock once a model (or a failed load) is cached.
+        if model_name in self._models:
+            return self._models[model_name]
+        with self._lock:
+            if model_name not in self._models:
+                self._models[model_name] = self._load(model_name)
+            return self._models[model_name]
+
+    def _load(self, model_name: str) -> Any:
+        """Load a model from disk and record timing/memory statistics."""
+
+        rss_before = _resident_memory_bytes()
+        started = time.perf_counter()
+        model = None
+        status = "unavailable"
         if SentenceTransformer:
             try:
-                self.model = SentenceTransformer(settings.embed_model_name)
+                model = SentenceTransformer(model_name)
+                status = "loaded"
             except Exception:
                 logger.warning(
-                    "Failed to load %s. Falling back to random embeddings.",
-                    settings.embed_model_name,
+                    "Failed to load %s. Falling back to random embeddings.", model_name
                 )
-                self.model = None
+                status = "failed"
         else:
-            self.model = None
-            logger.warning("sentence-transformers not available; embeddings will be random")
+            logger.warning(
+                "sentence-transformers not available; embeddings will be random"
+            )
+        elapsed = time.perf_counter() - started
+        rss_after = _resident_memory_bytes()
+        self._stats[model_name] = {
+            "status": status,
+            "load_seconds": round(elapsed, 3),
+            "model_bytes": _model_size_bytes(model),
+            "rss_delta_bytes": (
+                rss_after - rss_before
+                if rss_after is not None and rss_before is not None
+                else None
+            ),
+        }
+        if model is not None:
+            logger.info("Loaded embedding model %s in %.2fs", model_name, elapsed)
+        return model
+
+    def warm_up(self, model_names: Optional[Iterable[str]] = None) -> None:
+        """Eagerly load the given models (defaults to the configured model)."""
+
+        for name in model_names or [settings.embed_model_name]:
+            self.get(name)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load statistics for every model requested so far."""
+
+        cache = get_embedding_cache()
+        return {
+            "models": {name: dict(values) for name, values in self._stats.items()},
+            "process_rss_bytes": _resident_memory_bytes(),
+            "cache": cache.stats() if cache else {"enabled": False},
+        }
+
+    def clear(self) -> None:
+        """Drop cached models (mostly useful for tests)."""
+
+        with self._lock:
+            self._models.clear()
+            self._stats.clear()
+
+
+def _resident_memory_bytes() -> Optional[int]:
+    """Return the current process RSS when psutil is installed."""
+
+    if not psutil:
+        return None
+    try:
+        return int(psutil.Process().memory_info().rss)
+    except Exception:  # pragma: no cover - platform specific
+        return None
+
+
+def _model_size_bytes(model: Any) -> Optional[int]:
+    """Estimate the size of the model weights in bytes."""
+
+    if model is None or not hasattr(model, "parameters"):
+        return None
+    try:
+        return int(sum(p.numel() * p.element_size() for p in model.parameters()))
+    except Exception:  # pragma: no cover - depends on backend
+        return None
+
+
+_registry = EmbeddingModelRegistry()
+
+
+def get_model_registry() -> EmbeddingModelRegistry:
+    """Return the process-wide embedding model registry."""
+
+    return _registry
+
+
+def warm_up_embeddings() -> None:
+    """Load the configured embedding model; intended for FastAPI startup."""
+
+    _registry.warm_up()
+
+
+class EmbeddingCache:
+    """LRU of embeddings keyed by `(model, sha256(text))` backed by a SQLite file.
 
-    def embed(self, texts: Iterable[str]) -> List[np.ndarray]:
+    The on-disk table lives in its own database file so cache writes never contend
+    with the request's transaction on `atlas.db`.
+    """
+
+    def __init__(self, path: Optional[Path], max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @staticmethod
+    def text_hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Return cached vectors (or None) for each text, counting hits and misses."""
+
+        keys = [(model_name, self.text_hash(text)) for text in texts]
+        found: List[Optional[np.ndarray]] = []
+        missing: List[Tuple[str, str]] = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                else:
+                    missing.append(key)
+                found.append(vector)
+            on_disk = self._read_disk(model_name, [key[1] for key in missing])
+            for idx, key in enumerate(keys):
+                if found[idx] is None and key[1] in on_disk:
+                    found[idx] = on_disk[key[1]]
+                    self._remember(key, found[idx])
+                    self.disk_hits += 1
+            hits = sum(vector is not None for vector in found)
+            self.hits += hits
+            self.misses += len(found) - hits
+        return found
+
+    def put_many(
+        self, model_name: str, texts: List[str], vectors: List[np.ndarray]
+    ) -> None:
+        """Store freshly computed vectors in memory and on disk."""
+
+        rows = []
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = (model_name, self.text_hash(text))
+                self._remember(key, vector)
+                rows.append((model_name, key[1], vector.shape[0], vector.tobytes()))
+            conn = self._connection()
+            if conn is not None and rows:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embedding_cache"
+                    " (model, text_hash, dim, vector) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: Tuple[str, str], vector: np.ndarray) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, model_name: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        conn = self._connection()
+        if conn is None or not hashes:
+            return {}
+        found: Dict[str, np.ndarray] = {}
+        for start in range(0, len(hashes), 500):
+            batch = hashes[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            cursor = conn.execute(
+                "SELECT text_hash, vector FROM embedding_cache"
+                f" WHERE model = ? AND text_hash IN ({placeholders})",
+                [model_name, *batch],
+            )
+            for text_hash, blob in cursor:
+                found[text_hash] = np.frombuffer(blob, dtype=np.float32).copy()
+        return found
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if self._conn is None and self.path is not None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embedding_cache ("
+                    " model TEXT NOT NULL, text_hash TEXT NOT NULL,"
+                    " dim INTEGER NOT NULL, vector BLOB NOT NULL,"
+                    " PRIMARY KEY (model, text_hash)) WITHOUT ROWID"
+                )
+                self._conn = conn
+            except sqlite3.Error:
+                logger.warning(
+                    "Embedding cache at %s unavailable; memory only", self.path
+                )
+                self.path = None
+        return self._conn
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Return the process-wide embedding cache, or None when disabled."""
+
+    global _cache
+    if not settings.embed_cache_enabled:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = EmbeddingCache(
+                settings.embed_cache_path, settings.embed_cache_size
+            )
+        return _cache
+
+
+class EmbeddingService:
+    """Create embeddings using sentence-transformers with graceful fallback."""
+
+    def __init__(self, model_name: str | None = None) -> None:
+        self.model_name = model_name or settings.embed_model_name
+        # WHY: The registry shares one copy of the weights between every request.
+        self.model = get_model_registry().get(self.model_name)
+        # WHY: Fallback vectors are tagged separately so they never mix with real ones.
+        self.active_model_name = self.model_name if self.model else FALLBACK_MODEL_NAME
+        self.dimension = (
+            int(self.model.get_sentence_embedding_dimension() or FALLBACK_DIMENSION)
+            if self.model
+            else FALLBACK_DIMENSION
+        )
+
+    @property
+    def space(self) -> Tuple[str, int]:
+        """Return the `(model_name, dimension)` pair stored with each vector."""
+
+        return self.active_model_name, self.dimension
+
+    def embed(self, texts: Iterable[str], batch_size: int = 32) -> List[np.ndarray]:
         """Return embedding vectors for the provided texts."""
 
         texts = list(texts)
+        EMBED_BATCH_SIZE.observe(len(texts), stage="requested")
         if self.model:
-            embeddings = self.model.encode(texts, convert_to_numpy=True)
-            return [np.array(vec, dtype=np.float32) for vec in embeddings]
+            cache = get_embedding_cache()
+            if cache is None:
+                return self._encode(texts, batch_size)
+            vectors = cache.get_many(self.model_name, texts)
+            missing = [idx for idx, vector in enumerate(vectors) if vector is None]
+            if missing:
+                # WHY: Only cache misses reach the model, still as one batch.
+                fresh = self._encode([texts[idx] for idx in missing], batch_size)
+                cache.put_many(self.model_name, [texts[idx] for idx in missing], fresh)
+                for idx, vector in zip(missing, fresh):
+                    vectors[idx] = vector
+            return vectors  # type: ignore[return-value]
         rng = np.random.default_rng(42)
-        return [rng.standard_normal(384).astype(np.float32) for _ in texts]
+        return [
+            rng.standard_normal(FALLBACK_DIMENSION).astype(np.float32) for _ in texts
+        ]
+
+    def _encode(self, texts: List[str], batch_size: int) -> List[np.ndarray]:
+        if not texts:
+            return []
+        EMBED_BATCH_SIZE.observe(len(texts), stage="encoded")
+        with EMBED_SECONDS.time(model=self.model_name):
+            embeddings = self.model.encode(
+                texts, batch_size=batch_size, convert_to_numpy=True
+            )
+        return [np.array(vec, dtype=np.float32) for vec in embeddings]
+
+    @staticmethod
+    def normalize(vector: np.ndarray) -> np.ndarray:
+        """Return a unit-length float32 copy of `vector`."""
+
+        norm = float(np.linalg.norm(vector)) or 1.0
+        return (np.asarray(vector, dtype=np.float32) / norm).astype(np.float32)
 
     @staticmethod
     def cosine_similarity(vec_a: np.ndarray, vec_b: np.ndarray) -> float:
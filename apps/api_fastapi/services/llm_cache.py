@@ -0,0 +1,111 @@
+"""Prompt-level response cache with single-flight coalescing for `LLMService`."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Replies that describe a failure rather than a generation are never cached.
+UNCACHEABLE_MODELS = {"rate-limited", "busy", "unavailable"}
+
+
+class ResponseCache:
+    """TTL + LRU cache of chat replies keyed by model, messages and sampling params."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._inflight: Dict[str, "asyncio.Future[Dict]"] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], params: Dict[str, Any]) -> str:
+        """Hash the request; message whitespace is normalised so retries match."""
+
+        normalized = [
+            {"role": msg["role"], "content": " ".join(str(msg["content"]).split())}
+            for msg in messages
+        ]
+        payload = json.dumps(
+            {"model": model, "messages": normalized, "params": params}, sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached reply, or None when missing or expired."""
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, key: str, response: Dict) -> None:
+        if response.get("model_used") in UNCACHEABLE_MODELS:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, dict(response))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def get_or_generate(
+        self, key: str, generate: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, str]:
+        """Return `(reply, source)` where source is `hit`, `coalesced` or `miss`.
+
+        Concurrent callers with the same key share one in-flight generation.
+        """
+
+        cached = self.get(key)
+        if cached is not None:
+            return cached, "hit"
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                # WHY: shield() keeps one waiter's cancellation from killing the
+                # shared call.
+                return dict(await asyncio.shield(pending)), "coalesced"
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading caller disconnected; generate on our own instead.
+        self.misses += 1
+        future: "asyncio.Future[Dict]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await generate()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Retrieve the exception so an unawaited future doesn't log a warning.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.put(key, response)
+        future.set_result(response)
+        return dict(response), "miss"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "entries": len(self._entries),
+        }
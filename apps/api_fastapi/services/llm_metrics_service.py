@@ -0,0 +1,91 @@
+"""Persist and summarise per-call LLM token and latency metrics."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core import models
+
+METRIC_FIELDS = (
+    "provider",
+    "model",
+    "prompt_tokens",
+    "completion_tokens",
+    "estimated",
+    "ttft_ms",
+    "latency_ms",
+    "tokens_per_second",
+    "load_ms",
+)
+
+
+class LLMMetricsService:
+    """Store one `llm_call_metrics` row per provider call."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def record(
+        self, usage: Optional[Dict], conversation_id: str = "", stream: bool = False
+    ) -> Optional[int]:
+        """Store the `usage` block of an LLM reply; cached replies carry none."""
+
+        if not usage:
+            return None
+        metric = models.LLMCallMetric(
+            conversation_id=conversation_id,
+            stream=stream,
+            **{field: usage.get(field) for field in METRIC_FIELDS},
+        )
+        self.session.add(metric)
+        self.session.flush()
+        return metric.id
+
+    def recent(self, limit: int = 50) -> List[models.LLMCallMetric]:
+        stmt = (
+            select(models.LLMCallMetric)
+            .order_by(models.LLMCallMetric.id.desc())
+            .limit(limit)
+        )
+        return list(self.session.scalars(stmt))
+
+    def summary(self) -> List[Dict[str, object]]:
+        """Aggregate calls per provider/model."""
+
+        metric = models.LLMCallMetric
+        stmt = (
+            select(
+                metric.provider,
+                metric.model,
+                func.count(metric.id),
+                func.sum(metric.prompt_tokens),
+                func.sum(metric.completion_tokens),
+                func.avg(metric.ttft_ms),
+                func.avg(metric.latency_ms),
+                func.avg(metric.tokens_per_second),
+            )
+            .group_by(metric.provider, metric.model)
+            .order_by(metric.provider, metric.model)
+        )
+        return [
+            {
+                "provider": provider,
+                "model": model,
+                "calls": calls,
+                "prompt_tokens": int(prompt or 0),
+                "completion_tokens": int(completion or 0),
+                "avg_ttft_ms": _round(ttft),
+                "avg_latency_ms": _round(latency),
+                "avg_tokens_per_second": _round(rate),
+            }
+            for provider, model, calls, prompt, completion, ttft, latency, rate in (
+                self.session.execute(stmt)
+            )
+        ]
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return round(float(value), 1) if value is not None else None
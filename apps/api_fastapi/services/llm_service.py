@@ -2,95 +2,568 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
 
 try:
-    from ollama import Client as OllamaClient
+    from ollama import AsyncClient as AsyncOllamaClient
 except ImportError:  # pragma: no cover - optional dependency
-    OllamaClient = None  # type: ignore
+    AsyncOllamaClient = None  # type: ignore
 
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI
 except ImportError:  # pragma: no cover - optional dependency
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
+from ..core import metrics
 from ..core.config import get_settings
 from ..core.rate_limit import SlidingWindowRateLimiter
+from ..core.tokens import token_counter
+from .llm_cache import ResponseCache
+from .model_keepalive import ModelKeepAlive
+from .provider_health import CircuitBreaker
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
+OPENAI_MODEL = "gpt-3.5-turbo"
+DEFAULT_CLIENT_KEY = "chat"
+
+RATE_LIMITED_REPLY = {
+    "reply": "Too many requests. Please wait a moment before sending another message.",
+    "tokens": 0,
+    "model_used": "rate-limited",
+}
+BUSY_REPLY = {
+    "reply": "Atlas is busy with other replies. Please try again in a moment.",
+    "tokens": 0,
+    "model_used": "busy",
+}
+UNAVAILABLE_REPLY = {
+    "reply": "Model unavailable. Install Ollama or provide an OPENAI_API_KEY.",
+    "tokens": 0,
+    "model_used": "unavailable",
+}
+
+LLM_TOKENS = metrics.counter(
+    "atlas_llm_tokens_total", "LLM tokens by provider and kind", ("provider", "kind")
+)
+LLM_SECONDS = metrics.histogram(
+    "atlas_llm_call_duration_seconds",
+    "LLM provider call latency (ttft or total)",
+    ("provider", "stage"),
+)
+
+
+class GenerationQueueFull(RuntimeError):
+    """Raised when more generations are waiting than `LLM_MAX_QUEUE` allows."""
+
+
+def _http_options() -> Dict:
+    """Timeouts and keep-alive pool limits shared by both providers."""
+
+    return {
+        "timeout": httpx.Timeout(
+            settings.llm_timeout_seconds, connect=settings.llm_connect_timeout_seconds
+        ),
+        "limits": httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_connections,
+            keepalive_expiry=settings.llm_keepalive_seconds,
+        ),
+    }
+
 
 class LLMService:
-    """Interface with Ollama or OpenAI depending on availability."""
+    """Interface with Ollama or OpenAI depending on availability.
+
+    Build it once per process (see `get_llm_service`) so the HTTP connection pools and
+    the rate limiter are shared by every request.
+    """
 
     def __init__(self) -> None:
         self.settings = settings
         self.rate_limiter = SlidingWindowRateLimiter(settings.rate_limit_per_minute)
-        self.ollama_client = (
-            OllamaClient(host=settings.ollama_host) if OllamaClient else None
+        self._ollama_transport: Optional[httpx.AsyncHTTPTransport] = None
+        self.async_ollama_client = None
+        if AsyncOllamaClient:
+            # WHY: Owning the transport lets `aclose()` release Ollama's pool without
+            # touching the client's private httpx instance.
+            options = _http_options()
+            self._ollama_transport = httpx.AsyncHTTPTransport(limits=options["limits"])
+            self.async_ollama_client = AsyncOllamaClient(
+                host=settings.ollama_host, transport=self._ollama_transport, **options
+            )
+        self._async_openai_http: Optional[httpx.AsyncClient] = None
+        self.async_openai_client = None
+        if settings.openai_api_key and AsyncOpenAI:
+            self._async_openai_http = httpx.AsyncClient(**_http_options())
+            self.async_openai_client = AsyncOpenAI(
+                api_key=settings.openai_api_key,
+                timeout=settings.llm_timeout_seconds,
+                http_client=self._async_openai_http,
+            )
+        self.response_cache = (
+            ResponseCache(
+                settings.llm_response_cache_size,
+                settings.llm_response_cache_ttl_seconds,
+            )
+            if settings.llm_response_cache
+            else None
         )
-        self.openai_client = OpenAI(api_key=settings.openai_api_key) if (
-            settings.openai_api_key and OpenAI
-        ) else None
+        self.keepalive = ModelKeepAlive(self.async_ollama_client)
+        self.breakers = {"ollama": CircuitBreaker(), "openai": CircuitBreaker()}
+        # WHY: Generations wait on the semaphore instead of holding worker threads.
+        self._slots = asyncio.Semaphore(settings.llm_max_concurrency)
+        self._waiting = 0
 
-    def _chat_ollama(self, message: str, history: List[Dict]) -> Dict:
-        """Call the Ollama API for chat completions."""
+    async def aclose(self) -> None:
+        """Release every pooled connection (called on application shutdown)."""
+
+        await self.keepalive.aclose()
+        if self._async_openai_http is not None:
+            await self._async_openai_http.aclose()
+        if self._ollama_transport is not None:
+            await self._ollama_transport.aclose()
+
+    @asynccontextmanager
+    async def generation_slot(self) -> AsyncIterator[None]:
+        """Wait for one of `LLM_MAX_CONCURRENCY` generation slots.
+
+        Raises `GenerationQueueFull` when `LLM_MAX_QUEUE` requests are already waiting.
+        """
+
+        if self._slots.locked() and self._waiting >= self.settings.llm_max_queue:
+            raise GenerationQueueFull()
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def stats(self) -> Dict[str, Dict]:
+        """Return queue depth, provider health and cache counters for `/health`."""
 
-        if not self.ollama_client:
-            raise RuntimeError("Ollama client unavailable")
-        response = self.ollama_client.chat(
-            model=self.settings.model_name,
-            messages=[{"role": msg["role"], "content": msg["content"]} for msg in history]
-            + [{"role": "user", "content": message}],
-        )
-        content = response["message"]["content"]
         return {
-            "reply": content,
-            "tokens": len(content.split()),
-            "model_used": self.settings.model_name,
+            "providers": {
+                name: breaker.stats() for name, breaker in self.breakers.items()
+            },
+            "queue": {
+                "waiting": self._waiting,
+                "max_concurrency": self.settings.llm_max_concurrency,
+            },
+            "response_cache": (
+                self.response_cache.stats()
+                if self.response_cache
+                else {"enabled": False}
+            ),
         }
 
-    def _chat_openai(self, message: str, history: List[Dict]) -> Dict:
-        """Fallback to OpenAI Chat Completions."""
+    @staticmethod
+    def _messages(message: str, history: List[Dict]) -> List[Dict]:
+        return [{"role": msg["role"], "content": msg["content"]} for msg in history] + [
+            {"role": "user", "content": message}
+        ]
 
-        if not self.openai_client:
-            raise RuntimeError("OpenAI client unavailable")
-        response = self.openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": msg["role"], "content": msg["content"]} for msg in history]
-            + [{"role": "user", "content": message}],
-        )
-        reply = response.choices[0].message.content or ""
-        tokens = getattr(response.usage, "total_tokens", 0)
-        return {"reply": reply, "tokens": tokens, "model_used": "gpt-3.5-turbo"}
-
-    def chat(self, message: str, history: List[Dict], mode: str | None = None) -> Dict:
-        """Return a chat response from the available provider."""
-
-        if not self.rate_limiter.allow("chat"):
-            return {
-                "reply": "Too many requests. Please wait a moment before sending another message.",
-                "tokens": 0,
-                "model_used": "rate-limited",
-            }
-        provider_order: List[str]
+    @staticmethod
+    def _provider_order(mode: str | None) -> List[str]:
         if mode == "cloud":
-            provider_order = ["openai", "ollama"]
-        elif mode == "local":
-            provider_order = ["ollama", "openai"]
+            return ["openai", "ollama"]
+        return ["ollama", "openai"]
+
+    def _ready(self, provider: str) -> bool:
+        """Return True if the provider is configured and its circuit lets a call in.
+
+        Call it right before trying the provider: a half-open circuit reserves its
+        single probe here.
+        """
+
+        client = (
+            self.async_ollama_client
+            if provider == "ollama"
+            else self.async_openai_client
+        )
+        return client is not None and self.breakers[provider].allow()
+
+    def _provider_model(self, provider: str) -> str:
+        return self.settings.model_name if provider == "ollama" else OPENAI_MODEL
+
+    def _sampling_params(self) -> Dict:
+        """Sampling parameters sent to the provider (and part of the cache key)."""
+
+        if self.settings.llm_temperature is None:
+            return {}
+        return {"temperature": self.settings.llm_temperature}
+
+    def _ollama_params(self) -> Dict:
+        params: Dict = {"keep_alive": self.settings.ollama_keep_alive}
+        sampling = self._sampling_params()
+        if sampling:
+            params["options"] = sampling
+        return params
+
+    def _cache_key(self, messages: List[Dict], mode: str | None) -> str:
+        models = "|".join(self._provider_model(p) for p in self._provider_order(mode))
+        return ResponseCache.make_key(models, messages, self._sampling_params())
+
+    @staticmethod
+    def _mark_cached(response: Dict, source: str) -> Dict:
+        """Tag replies that did not run a generation, e.g. `llama3.2:3b (cached)`."""
+
+        if source == "hit":
+            response["model_used"] = f"{response['model_used']} (cached)"
+        elif source == "coalesced":
+            response["model_used"] = f"{response['model_used']} (coalesced)"
+        if source != "miss":
+            # WHY: No provider call happened, so there is no usage to account for.
+            response.pop("usage", None)
+        return response
+
+    def _done_frame(
+        self,
+        provider: str,
+        parts: List[str],
+        started: float,
+        first_token_at: float | None,
+        usage: Dict,
+    ) -> Dict:
+        return {
+            "type": "done",
+            "reply": "".join(parts),
+            "tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+            "model_used": self._provider_model(provider),
+            "ttft_ms": (
+                round((first_token_at - started) * 1000, 1) if first_token_at else None
+            ),
+            "usage": usage,
+        }
+
+    def _reply(
+        self,
+        provider: str,
+        reply: str,
+        stats: Dict,
+        messages: List[Dict],
+        started: float,
+    ) -> Dict:
+        usage = self.usage(provider, stats, messages, reply, started, None)
+        return {
+            "reply": reply,
+            "tokens": usage["prompt_tokens"] + usage["completion_tokens"],
+            "model_used": self._provider_model(provider),
+            "usage": usage,
+        }
+
+    def usage(
+        self,
+        provider: str,
+        stats: Dict,
+        messages: List[Dict],
+        reply: str,
+        started: float,
+        first_token_at: float | None,
+    ) -> Dict:
+        """Token counts and timings of one provider call.
+
+        Ollama reports `prompt_eval_count`/`eval_count` and nanosecond durations, and
+        OpenAI reports `usage` on non-streamed calls. Anything missing is estimated
+        with the model's token counter and flagged with `estimated: True`.
+        """
+
+        latency = time.perf_counter() - started
+        ttft = first_token_at - started if first_token_at else None
+        model = self._provider_model(provider)
+        tokens_per_second = None
+        load_ms = None
+        if "eval_count" in stats:
+            prompt_tokens = int(stats.get("prompt_eval_count") or 0)
+            completion_tokens = int(stats["eval_count"])
+            eval_seconds = (stats.get("eval_duration") or 0) / 1e9
+            if eval_seconds:
+                tokens_per_second = completion_tokens / eval_seconds
+            load_ms = (stats.get("load_duration") or 0) / 1e6
+            if ttft is None:
+                # Non-streamed: the first token follows loading and prompt evaluation.
+                ttft = (
+                    (stats.get("load_duration") or 0)
+                    + (stats.get("prompt_eval_duration") or 0)
+                ) / 1e9 or None
+            estimated = False
+        elif "completion_tokens" in stats:
+            prompt_tokens = int(stats.get("prompt_tokens") or 0)
+            completion_tokens = int(stats["completion_tokens"])
+            estimated = False
         else:
-            provider_order = ["ollama", "openai"]
-
-        for provider in provider_order:
-            try:
-                if provider == "ollama":
-                    return self._chat_ollama(message, history)
-                if provider == "openai":
-                    return self._chat_openai(message, history)
-            except Exception:
-                continue
+            count = token_counter(model)
+            prompt_tokens = sum(count(msg["content"]) for msg in messages)
+            completion_tokens = count(reply)
+            estimated = True
+        if tokens_per_second is None and ttft is not None and latency > ttft:
+            tokens_per_second = completion_tokens / (latency - ttft)
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, provider=provider, kind="completion")
+        LLM_SECONDS.observe(latency, provider=provider, stage="total")
+        if ttft is not None:
+            LLM_SECONDS.observe(ttft, provider=provider, stage="ttft")
         return {
-            "reply": "Model unavailable. Install Ollama or provide an OPENAI_API_KEY.",
-            "tokens": 0,
-            "model_used": "unavailable",
+            "provider": provider,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "estimated": estimated,
+            "ttft_ms": round(ttft * 1000, 1) if ttft is not None else None,
+            "latency_ms": round(latency * 1000, 1),
+            "tokens_per_second": (
+                round(tokens_per_second, 2) if tokens_per_second else None
+            ),
+            "load_ms": round(load_ms, 1) if load_ms is not None else None,
         }
+
+    async def _achat_ollama(self, messages: List[Dict]) -> Dict:
+        if not self.async_ollama_client:
+            raise RuntimeError("Ollama client unavailable")
+        started = time.perf_counter()
+        response = await self.async_ollama_client.chat(
+            model=self.settings.model_name, messages=messages, **self._ollama_params()
+        )
+        self.keepalive.record(response)
+        return self._reply(
+            "ollama", response["message"]["content"], response, messages, started
+        )
+
+    async def _achat_openai(self, messages: List[Dict]) -> Dict:
+        if not self.async_openai_client:
+            raise RuntimeError("OpenAI client unavailable")
+        started = time.perf_counter()
+        response = await self.async_openai_client.chat.completions.create(
+            model=OPENAI_MODEL, messages=messages, **self._sampling_params()
+        )
+        return self._reply(
+            "openai",
+            response.choices[0].message.content or "",
+            _openai_usage(response),
+            messages,
+            started,
+        )
+
+    async def _astream_ollama(
+        self, messages: List[Dict], stats: Dict
+    ) -> AsyncIterator[str]:
+        if not self.async_ollama_client:
+            raise RuntimeError("Ollama client unavailable")
+        stream = await self.async_ollama_client.chat(
+            model=self.settings.model_name,
+            messages=messages,
+            stream=True,
+            **self._ollama_params(),
+        )
+        async for chunk in stream:
+            if chunk.get("done"):
+                self.keepalive.record(chunk)
+                stats.update(chunk)
+            content = chunk.get("message", {}).get("content", "")
+            if content:
+                yield content
+
+    async def _astream_openai(
+        self, messages: List[Dict], stats: Dict
+    ) -> AsyncIterator[str]:
+        if not self.async_openai_client:
+            raise RuntimeError("OpenAI client unavailable")
+        stream = await self.async_openai_client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            stream=True,
+            **self._sampling_params(),
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    async def achat(
+        self,
+        message: str,
+        history: List[Dict],
+        mode: str | None = None,
+        client_key: str = DEFAULT_CLIENT_KEY,
+    ) -> Dict:
+        """Return a chat response, waiting for a generation slot without holding a
+        thread.
+
+        With `LLM_RESPONSE_CACHE=true`, repeated prompts are answered from the cache and
+        concurrent identical prompts share one generation.
+        """
+
+        messages = self._messages(message, history)
+
+        async def generate() -> Dict:
+            if not self.rate_limiter.allow(client_key):
+                return dict(RATE_LIMITED_REPLY)
+            return await self._agenerate(messages, mode)
+
+        if self.response_cache is None:
+            return await generate()
+        response, source = await self.response_cache.get_or_generate(
+            self._cache_key(messages, mode), generate
+        )
+        return self._mark_cached(response, source)
+
+    async def _agenerate(self, messages: List[Dict], mode: str | None) -> Dict:
+        try:
+            async with self.generation_slot():
+                for provider in self._provider_order(mode):
+                    if not self._ready(provider):
+                        continue
+                    try:
+                        with self.breakers[provider].attempt():
+                            if provider == "ollama":
+                                return await self._achat_ollama(messages)
+                            return await self._achat_openai(messages)
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        continue
+        except GenerationQueueFull:
+            return dict(BUSY_REPLY)
+        return dict(UNAVAILABLE_REPLY)
+
+    async def astream_chat(
+        self,
+        message: str,
+        history: List[Dict],
+        mode: str | None = None,
+        client_key: str = DEFAULT_CLIENT_KEY,
+    ) -> AsyncIterator[Dict]:
+        """Yield `token` frames as they arrive, then one `done` frame.
+
+        The `done` frame carries the same fields as `achat()` plus `ttft_ms`, the time
+        until the first token. A provider that fails before producing any token falls
+        through to the next one; a failure mid-stream ends the reply where it stopped.
+        Cancelling the consumer aborts the provider stream. Cached replies are sent as
+        a single token frame. Streams are not coalesced.
+        """
+
+        started = time.perf_counter()
+        messages = self._messages(message, history)
+        key = None
+        if self.response_cache is not None:
+            key = self._cache_key(messages, mode)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                yield {"type": "token", "content": cached["reply"]}
+                ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                yield {
+                    "type": "done",
+                    **self._mark_cached(cached, "hit"),
+                    "ttft_ms": ttft_ms,
+                }
+                return
+        if not self.rate_limiter.allow(client_key):
+            yield {"type": "done", **RATE_LIMITED_REPLY, "ttft_ms": None}
+            return
+        try:
+            async with self.generation_slot():
+                for provider in self._provider_order(mode):
+                    if not self._ready(provider):
+                        continue
+                    parts: List[str] = []
+                    first_token_at: float | None = None
+                    interrupted = False
+                    stats: Dict = {}
+                    call_started = time.perf_counter()
+                    stream = (
+                        self._astream_ollama(messages, stats)
+                        if provider == "ollama"
+                        else self._astream_openai(messages, stats)
+                    )
+                    try:
+                        with self.breakers[provider].attempt():
+                            async for token in stream:
+                                if first_token_at is None:
+                                    first_token_at = time.perf_counter()
+                                parts.append(token)
+                                yield {"type": "token", "content": token}
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception:
+                        if not parts:
+                            continue
+                        interrupted = True
+                        logger.warning(
+                            "%s stream interrupted after %d tokens",
+                            provider,
+                            len(parts),
+                        )
+                    finally:
+                        await stream.aclose()
+                    usage = self.usage(
+                        provider,
+                        stats,
+                        messages,
+                        "".join(parts),
+                        call_started,
+                        first_token_at,
+                    )
+                    done = self._done_frame(
+                        provider, parts, started, first_token_at, usage
+                    )
+                    if key is not None and not interrupted:
+                        self.response_cache.put(
+                            key,
+                            {
+                                field: done[field]
+                                for field in ("reply", "tokens", "model_used")
+                            },
+                        )
+                    yield done
+                    return
+        except GenerationQueueFull:
+            yield {"type": "done", **BUSY_REPLY, "ttft_ms": None}
+            return
+        yield {"type": "done", **UNAVAILABLE_REPLY, "ttft_ms": None}
+
+
+def _openai_usage(response: Any) -> Dict:
+    """Return OpenAI's `usage` block as a dict (empty when absent)."""
+
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0),
+        "completion_tokens": getattr(usage, "completion_tokens", 0),
+    }
+
+
+_service: Optional[LLMService] = None
+_service_lock = threading.Lock()
+
+
+def get_llm_service() -> LLMService:
+    """Return the process-wide LLM gateway, creating it on first use."""
+
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = LLMService()
+    return _service
+
+
+async def close_llm_service() -> None:
+    """Close the shared gateway's connection pools."""
+
+    global _service
+    service, _service = _service, None
+    if service is not None:
+        await service.aclose()
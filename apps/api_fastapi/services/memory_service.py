@@ -2,19 +2,103 @@
 
 from __future__ import annotations
 
-import json
-from typing import Iterable, List, Optional
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import numpy as np
-from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, func, insert, or_, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, load_only, with_expression
 
-from ..core import models
+from ..core import metrics, models
 from ..core.config import get_settings
+from ..core.pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor
 from .embed_service import EmbeddingService
+from .vector_index import VectorIndex, get_vector_index
 
 settings = get_settings()
 
+EXTRACT_CHARS = 200
+IN_CLAUSE_BATCH = 500
+# item_type -> (model, title column, body column used for extracts)
+HYDRATION_COLUMNS = {
+    "note": (models.Note, "title", "content"),
+    "task": (models.Task, "title", "description"),
+    "document": (models.DocumentChunk, "source_path", "content"),
+}
+# item_type -> (model, link table column pointing at the item)
+TAG_LINKS = {
+    "note": (models.Note, models.note_tags.c.note_id),
+    "task": (models.Task, models.task_tags.c.task_id),
+}
+
+SEARCH_SECONDS = metrics.histogram(
+    "atlas_search_duration_seconds",
+    "Semantic search time per phase (embed, index, hydrate) and in total",
+    ("phase",),
+)
+
+
+def has_tag(item_type: str, tag: str) -> Any:
+    """SQL condition on tasks/notes: the row carries `tag`.
+
+    Resolves to one seek on `ix_tags_name` plus a range of the link table's tag
+    index, however many rows the item table has.
+    """
+
+    model, link_column = TAG_LINKS[item_type]
+    links = link_column.table
+    return model.id.in_(
+        select(link_column)
+        .join(models.Tag, models.Tag.id == links.c.tag_id)
+        .where(models.Tag.name == tag)
+    )
+
+
+def tag_names(tags: Iterable[str]) -> List[str]:
+    """Strip tags and drop blanks and repeats, keeping the first spelling's order."""
+
+    return list(dict.fromkeys(tag.strip() for tag in tags if tag and tag.strip()))
+
+
+def _batched(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@dataclass
+class IngestStats:
+    """Progress counters reported by the bulk ingestion helpers."""
+
+    chunks: int = 0
+    unchanged: int = 0
+    batches: int = 0
+    commits: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+def embedding_text(item_type: str, item: Any) -> str:
+    """Return the text that gets embedded for a note, task or document chunk."""
+
+    if item_type == "note":
+        return f"{item.title}\n{item.content}"
+    if item_type == "task":
+        return f"{item.title}\n{item.description}\nTags: {', '.join(item.tags_list())}"
+    return item.content
+
 
 class MemoryService:
     """Persist and query chats, notes, tasks, and semantic embeddings."""
@@ -23,32 +107,150 @@ class MemoryService:
         self.session = session
         self.embed_service = EmbeddingService()
 
-    def save_chat_messages(self, messages: Iterable[dict]) -> None:
-        """Persist chat messages in the database."""
+    def save_chat_messages(
+        self, messages: Iterable[dict], conversation_id: str = ""
+    ) -> None:
+        """Append chat messages to a conversation with one bulk insert."""
 
+        rows = []
         for msg in messages:
-            role = getattr(msg, "role", None) or msg["role"]
-            content = getattr(msg, "content", None) or msg["content"]
-            record = models.ChatMessage(role=role, content=content)
-            self.session.add(record)
+            # WHY: Accept plain dicts and schema objects alike; `""` is valid content.
+            if isinstance(msg, dict):
+                role, content = msg["role"], msg["content"]
+            else:
+                role, content = msg.role, msg.content
+            rows.append(
+                {"conversation_id": conversation_id, "role": role, "content": content}
+            )
+        if rows:
+            self.session.execute(insert(models.ChatMessage), rows)
+
+    def conversation_history(
+        self, conversation_id: str, limit: int | None = None
+    ) -> List[Dict[str, str]]:
+        """Return the last `limit` messages of a conversation, oldest first."""
+
+        stmt = (
+            select(models.ChatMessage.role, models.ChatMessage.content)
+            .where(models.ChatMessage.conversation_id == conversation_id)
+            .order_by(models.ChatMessage.id.desc())
+        )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        rows = self.session.execute(stmt).all()
+        return [{"role": row.role, "content": row.content} for row in reversed(rows)]
 
     def recall_last_messages(self, limit: int = 5) -> List[models.ChatMessage]:
         """Return the most recent chat messages."""
 
-        stmt = select(models.ChatMessage).order_by(models.ChatMessage.id.desc()).limit(limit)
+        stmt = (
+            select(models.ChatMessage)
+            .order_by(models.ChatMessage.id.desc())
+            .limit(limit)
+        )
         return list(reversed(self.session.scalars(stmt).all()))
 
+    # Tags ------------------------------------------------------------------
+    def tag_rows(
+        self, tags: Iterable[str], known: Optional[Dict[str, models.Tag]] = None
+    ) -> List[models.Tag]:
+        """Return `Tag` rows for `tags`, adding the ones that do not exist yet.
+
+        `known` caches rows between calls so bulk inserts look each name up once.
+        """
+
+        known = {} if known is None else known
+        names = tag_names(tags)
+        missing = [name for name in names if name not in known]
+        self._load_tags(missing, known)
+        new = [name for name in missing if name not in known]
+        if new:
+            # WHY: Another request may create the same tag between the select and the
+            # insert; DO NOTHING keeps that race from failing on `ix_tags_name`.
+            self.session.execute(
+                sqlite_insert(models.Tag).on_conflict_do_nothing(
+                    index_elements=[models.Tag.name]
+                ),
+                [{"name": name} for name in new],
+            )
+            self._load_tags(new, known)
+        return [known[name] for name in names]
+
+    def _load_tags(self, names: List[str], known: Dict[str, models.Tag]) -> None:
+        for start in range(0, len(names), IN_CLAUSE_BATCH):
+            batch = names[start : start + IN_CLAUSE_BATCH]
+            stmt = select(models.Tag).where(models.Tag.name.in_(batch))
+            known.update((tag.name, tag) for tag in self.session.scalars(stmt))
+
+    def _prefetch_tags(self, payloads: List[dict]) -> Dict[str, models.Tag]:
+        known: Dict[str, models.Tag] = {}
+        self.tag_rows(
+            (tag for payload in payloads for tag in payload.get("tags", [])), known
+        )
+        return known
+
     # Notes -----------------------------------------------------------------
     def create_note(self, title: str, content: str, tags: List[str]) -> models.Note:
-        note = models.Note(title=title, content=content, tags=json.dumps(tags))
+        note = models.Note(title=title, content=content, tags=self.tag_rows(tags))
         self.session.add(note)
         self.session.flush()
-        self._store_embedding("note", note.id, f"{title}\n{content}")
+        self._store_embedding("note", note.id, embedding_text("note", note))
         return note
 
-    def list_notes(self) -> List[models.Note]:
-        stmt = select(models.Note).order_by(models.Note.id.desc())
-        return list(self.session.scalars(stmt).all())
+    def create_notes(self, payloads: Iterable[dict]) -> List[models.Note]:
+        """Insert many notes and embed them in a single batch."""
+
+        payloads = list(payloads)
+        known = self._prefetch_tags(payloads)
+        notes = [
+            models.Note(
+                title=payload["title"],
+                content=payload.get("content", ""),
+                tags=self.tag_rows(payload.get("tags", []), known),
+            )
+            for payload in payloads
+        ]
+        self.session.add_all(notes)
+        self.session.flush()
+        self._store_embeddings(
+            [("note", note.id, embedding_text("note", note)) for note in notes]
+        )
+        return notes
+
+    def page_notes(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        tag: Optional[str] = None,
+        summary: bool = False,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Return one page of notes, newest first, and the cursor of the next page.
+
+        With `summary` only `id`, `title`, `tags` and an `extract` of the content are
+        loaded. Raises ValueError for a malformed `cursor`.
+        """
+
+        note = models.Note
+        stmt = select(note)
+        if summary:
+            stmt = stmt.options(
+                load_only(note.id, note.title),
+                with_expression(
+                    note.extract, func.substr(note.content, 1, EXTRACT_CHARS)
+                ),
+            ).execution_options(populate_existing=True)
+        if tag:
+            stmt = stmt.where(has_tag("note", tag))
+        if cursor:
+            (last_id,) = decode_cursor(cursor, 1)
+            if not isinstance(last_id, int):
+                raise ValueError("Invalid cursor")
+            stmt = stmt.where(note.id < last_id)
+        stmt = stmt.order_by(note.id.desc()).limit(limit + 1)
+        rows = list(self.session.scalars(stmt).all())
+        if len(rows) <= limit:
+            return rows, None
+        return rows[:limit], encode_cursor(rows[limit - 1].id)
 
     def delete_note(self, note_id: int) -> None:
         note = self.session.get(models.Note, note_id)
@@ -75,34 +277,124 @@ class MemoryService:
         task = models.Task(
             title=title,
             description=description,
-            due_date=self._parse_due_date(due_date) if isinstance(due_date, str) else due_date,
-            tags=json.dumps(tags),
+            due_date=(
+                self._parse_due_date(due_date)
+                if isinstance(due_date, str)
+                else due_date
+            ),
+            tags=self.tag_rows(tags),
         )
         self.session.add(task)
         self.session.flush()
-        self._store_embedding(
-            "task", task.id, f"{title}\n{description}\nTags: {', '.join(tags)}"
-        )
+        self._store_embedding("task", task.id, embedding_text("task", task))
         return task
 
-    def list_tasks(self) -> List[models.Task]:
-        stmt = select(models.Task).order_by(models.Task.due_date)
-        return list(self.session.scalars(stmt).all())
+    def create_tasks(self, payloads: Iterable[dict]) -> List[models.Task]:
+        """Insert many tasks and embed them in a single batch."""
+
+        payloads = list(payloads)
+        known = self._prefetch_tags(payloads)
+        tasks = []
+        for payload in payloads:
+            due_date = payload.get("due_date")
+            tasks.append(
+                models.Task(
+                    title=payload["title"],
+                    description=payload.get("description", ""),
+                    due_date=(
+                        self._parse_due_date(due_date)
+                        if isinstance(due_date, str)
+                        else due_date
+                    ),
+                    tags=self.tag_rows(payload.get("tags", []), known),
+                )
+            )
+        self.session.add_all(tasks)
+        self.session.flush()
+        self._store_embeddings(
+            [("task", task.id, embedding_text("task", task)) for task in tasks]
+        )
+        return tasks
+
+    def page_tasks(
+        self,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        tag: Optional[str] = None,
+        completed: Optional[bool] = None,
+        due_from: Optional[date] = None,
+        due_to: Optional[date] = None,
+        summary: bool = False,
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Return one page of tasks ordered by due date, and the next page's cursor.
+
+        Undated tasks come first; the date range excludes them.
+        With `summary` the description is not loaded. Raises ValueError for a
+        malformed `cursor`.
+        """
+
+        task = models.Task
+        stmt = select(task)
+        if summary:
+            stmt = stmt.options(
+                load_only(task.id, task.title, task.due_date, task.completed)
+            )
+        if tag:
+            stmt = stmt.where(has_tag("task", tag))
+        if completed is not None:
+            stmt = stmt.where(task.completed == completed)
+        if due_from:
+            stmt = stmt.where(task.due_date >= due_from)
+        if due_to:
+            stmt = stmt.where(task.due_date <= due_to)
+        if cursor:
+            last_due, last_id = self._task_cursor(cursor)
+            if last_due is None:
+                # NULL sorts first in SQLite, so every dated task is still ahead.
+                stmt = stmt.where(
+                    or_(
+                        and_(task.due_date.is_(None), task.id > last_id),
+                        task.due_date.is_not(None),
+                    )
+                )
+            else:
+                # WHY: A row-value comparison lets SQLite seek ix_tasks_due_date
+                # (whose entries end with the rowid, i.e. `id`).
+                stmt = stmt.where(tuple_(task.due_date, task.id) > (last_due, last_id))
+        stmt = stmt.order_by(task.due_date, task.id).limit(limit + 1)
+        rows = list(self.session.scalars(stmt).all())
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        due = last.due_date.isoformat() if last.due_date else None
+        return rows[:limit], encode_cursor(due, last.id)
+
+    @staticmethod
+    def _task_cursor(cursor: str) -> Tuple[Optional[date], int]:
+        last_due, last_id = decode_cursor(cursor, 2)
+        try:
+            if not isinstance(last_id, int):
+                raise ValueError("Invalid cursor")
+            return (date.fromisoformat(last_due) if last_due else None), last_id
+        except TypeError as exc:
+            raise ValueError("Invalid cursor") from exc
 
     def update_task(self, task_id: int, payload: dict) -> models.Task | None:
         task = self.session.get(models.Task, task_id)
         if not task:
             return None
+        before = embedding_text("task", task)
         for key, value in payload.items():
             if key == "tags" and value is not None:
-                setattr(task, key, json.dumps(value))
+                task.tags = self.tag_rows(value)
             elif key == "due_date" and value:
                 task.due_date = self._parse_due_date(value)
             elif value is not None:
                 setattr(task, key, value)
-        self._store_embedding(
-            "task", task.id, f"{task.title}\n{task.description}\nTags: {task.tags_list()}"
-        )
+        text = embedding_text("task", task)
+        # WHY: Toggling completion or the due date leaves the embedded text unchanged.
+        if text != before:
+            self._store_embedding("task", task.id, text)
         return task
 
     def delete_task(self, task_id: int) -> None:
@@ -133,74 +425,415 @@ class MemoryService:
         self._store_embedding("document", chunk.id, content)
         return chunk
 
+    def upsert_document_chunks(
+        self,
+        chunks: Iterable[Tuple[str, int, str]],
+        batch_size: Optional[int] = None,
+        commit_every: Optional[int] = None,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+    ) -> IngestStats:
+        """Bulk variant of `upsert_document_chunk` for indexing pipelines.
+
+        `chunks` yields `(source_path, chunk_index, content)` tuples. Each batch is
+        embedded with one `model.encode` call and written with executemany-style bulk
+        INSERT/UPDATE statements; the session is committed every `commit_every` chunks.
+        """
+
+        batch_size = batch_size or settings.embed_batch_size
+        return self.write_document_batches(
+            ((batch, None) for batch in _batched(chunks, batch_size)),
+            commit_every=commit_every,
+            progress=progress,
+        )
+
+    def embed_document_batch(
+        self, batch: List[Tuple[str, int, str]]
+    ) -> Dict[Tuple[str, int], np.ndarray]:
+        """Embed the chunks of `batch` whose stored content changed, without writing.
+
+        Run it on a second session so embedding overlaps `write_document_batches`.
+        """
+
+        latest, _, unchanged = self._chunk_changes(batch)
+        keys = [key for key in latest if key not in unchanged]
+        vectors = self.embed_service.embed(
+            [latest[key] for key in keys], batch_size=settings.embed_batch_size
+        )
+        return dict(zip(keys, vectors))
+
+    def write_document_batches(
+        self,
+        batches: Iterable[
+            Tuple[List[Tuple[str, int, str]], Optional[Dict[Tuple[str, int], Any]]]
+        ],
+        commit_every: Optional[int] = None,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+    ) -> IngestStats:
+        """Upsert `(chunks, vectors)` batches; `vectors` from `embed_document_batch`
+        may be None, and chunks without a vector are embedded here."""
+
+        commit_every = commit_every or settings.ingest_commit_every
+        stats = IngestStats()
+        started = time.perf_counter()
+        since_commit = 0
+        for batch, vectors in batches:
+            stats.unchanged += self._write_chunk_batch(batch, vectors)
+            stats.chunks += len(batch)
+            stats.batches += 1
+            since_commit += len(batch)
+            if since_commit >= commit_every:
+                self.session.commit()
+                stats.commits += 1
+                since_commit = 0
+            stats.seconds = time.perf_counter() - started
+            if progress:
+                progress(stats)
+        self.session.commit()
+        stats.commits += 1
+        stats.seconds = time.perf_counter() - started
+        if progress:
+            progress(stats)
+        return stats
+
+    def _chunk_changes(
+        self, batch: List[Tuple[str, int, str]]
+    ) -> Tuple[Dict[Tuple[str, int], str], Dict[Tuple[str, int], int], set]:
+        """Return the batch's latest content, stored ids and unchanged keys."""
+
+        # WHY: Later duplicates of the same (path, index) win, like repeated upserts.
+        latest = {(path, index): content for path, index, content in batch}
+        stmt = select(
+            models.DocumentChunk.id,
+            models.DocumentChunk.source_path,
+            models.DocumentChunk.chunk_index,
+            models.DocumentChunk.content,
+        ).where(
+            tuple_(
+                models.DocumentChunk.source_path, models.DocumentChunk.chunk_index
+            ).in_(list(latest))
+        )
+        existing: Dict[Tuple[str, int], int] = {}
+        unchanged = set()
+        for row in self.session.execute(stmt):
+            key = (row.source_path, row.chunk_index)
+            existing[key] = row.id
+            if row.content == latest[key]:
+                unchanged.add(key)
+        return latest, existing, unchanged
+
+    def _write_chunk_batch(
+        self,
+        batch: List[Tuple[str, int, str]],
+        vectors: Optional[Dict[Tuple[str, int], Any]] = None,
+    ) -> int:
+        """Upsert one batch of document chunks; return how many were unchanged."""
+
+        latest, existing, unchanged = self._chunk_changes(batch)
+        # WHY: Identical chunks keep their row and vector; only real edits re-embed.
+        keys = [key for key in latest if key not in unchanged]
+        updates = [
+            {"id": existing[key], "content": latest[key]}
+            for key in keys
+            if key in existing
+        ]
+        if updates:
+            self.session.execute(update(models.DocumentChunk), updates)
+        new_keys = [key for key in keys if key not in existing]
+        if new_keys:
+            inserted = self.session.execute(
+                insert(models.DocumentChunk).returning(
+                    models.DocumentChunk.id, sort_by_parameter_order=True
+                ),
+                [
+                    {
+                        "source_path": path,
+                        "chunk_index": index,
+                        "content": latest[(path, index)],
+                    }
+                    for path, index in new_keys
+                ],
+            ).scalars()
+            existing.update(zip(new_keys, inserted))
+        vectors = vectors or {}
+        ready = [key for key in keys if key in vectors]
+        if ready:
+            self.write_vectors(
+                [("document", existing[key]) for key in ready],
+                [vectors[key] for key in ready],
+            )
+        self._store_embeddings(
+            [
+                ("document", existing[key], latest[key])
+                for key in keys
+                if key not in vectors
+            ]
+        )
+        return len(unchanged)
+
+    def document_manifest(self) -> Dict[str, Any]:
+        """Return manifest rows (`path/size/mtime/content_hash/chunk_count/chunker`)."""
+
+        # WHY: Plain rows survive commits without triggering per-object refreshes.
+        stmt = select(
+            models.DocumentFile.path,
+            models.DocumentFile.size,
+            models.DocumentFile.mtime,
+            models.DocumentFile.content_hash,
+            models.DocumentFile.chunk_count,
+            models.DocumentFile.chunker,
+        )
+        return {row.path: row for row in self.session.execute(stmt)}
+
+    def record_document_file(
+        self,
+        path: str,
+        size: int,
+        mtime: float,
+        content_hash: str,
+        chunk_count: int,
+        chunker: str = "",
+    ) -> None:
+        """Create or update the manifest entry for an indexed file."""
+
+        record = self.session.scalars(
+            select(models.DocumentFile).where(models.DocumentFile.path == path)
+        ).one_or_none()
+        if record is None:
+            record = models.DocumentFile(path=path)
+            self.session.add(record)
+        record.size = size
+        record.mtime = mtime
+        record.content_hash = content_hash
+        record.chunk_count = chunk_count
+        record.chunker = chunker
+
+    def prune_document(self, source_path: str, keep_chunks: int = 0) -> int:
+        """Delete chunks at or beyond `keep_chunks` (all chunks by default)."""
+
+        stmt = select(models.DocumentChunk.id).where(
+            models.DocumentChunk.source_path == source_path,
+            models.DocumentChunk.chunk_index >= keep_chunks,
+        )
+        chunk_ids = list(self.session.scalars(stmt))
+        self._delete_chunks(chunk_ids)
+        return len(chunk_ids)
+
+    def remove_documents(self, paths: Iterable[str]) -> int:
+        """Drop chunks, embeddings and manifest rows for deleted files."""
+
+        removed = 0
+        for path in paths:
+            removed += self.prune_document(path)
+            self.session.execute(
+                delete(models.DocumentFile).where(models.DocumentFile.path == path)
+            )
+        return removed
+
+    def purge_orphan_embeddings(self) -> int:
+        """Delete embeddings whose note/task/chunk no longer exists."""
+
+        purged = 0
+        for item_type, (model, _, _) in HYDRATION_COLUMNS.items():
+            stmt = select(models.Embedding.item_id).where(
+                models.Embedding.item_type == item_type,
+                models.Embedding.item_id.not_in(select(model.id)),
+            )
+            orphan_ids = list(self.session.scalars(stmt))
+            self.delete_embeddings(item_type, orphan_ids)
+            purged += len(orphan_ids)
+        return purged
+
+    def _delete_chunks(self, chunk_ids: List[int]) -> None:
+        for start in range(0, len(chunk_ids), IN_CLAUSE_BATCH):
+            batch = chunk_ids[start : start + IN_CLAUSE_BATCH]
+            self.session.execute(
+                delete(models.DocumentChunk).where(models.DocumentChunk.id.in_(batch))
+            )
+        self.delete_embeddings("document", chunk_ids)
+
     # Search ----------------------------------------------------------------
     def semantic_search(self, query: str, top_k: int = 5) -> List[dict]:
         """Search notes, tasks, and documents by semantic similarity."""
 
-        query_vec = self.embed_service.embed([query])[0]
-        stmt = select(models.Embedding)
-        matches: List[tuple[models.Embedding, float]] = []
-        for embedding in self.session.scalars(stmt).all():
-            vector = np.frombuffer(embedding.vector, dtype=np.float32)
-            score = self.embed_service.cosine_similarity(query_vec, vector)
-            matches.append((embedding, score))
-        matches.sort(key=lambda item: item[1], reverse=True)
+        with SEARCH_SECONDS.time(phase="total"):
+            with SEARCH_SECONDS.time(phase="embed"):
+                query_vec = self.embed_service.embed([query])[0]
+            with SEARCH_SECONDS.time(phase="index"):
+                matches = self._vector_index().search(self.session, query_vec, top_k)
+            with SEARCH_SECONDS.time(phase="hydrate"):
+                items = self.load_items(
+                    [(item_type, item_id) for item_type, item_id, _ in matches],
+                    extract_chars=EXTRACT_CHARS,
+                )
         results = []
-        for embedding, score in matches[:top_k]:
-            if embedding.item_type == "note":
-                note = self.session.get(models.Note, embedding.item_id)
-                if note:
-                    results.append(
-                        {
-                            "type": "note",
-                            "id": note.id,
-                            "score": score,
-                            "title": note.title,
-                            "extract": note.content[:200],
-                        }
-                    )
-            elif embedding.item_type == "task":
-                task = self.session.get(models.Task, embedding.item_id)
-                if task:
-                    results.append(
-                        {
-                            "type": "task",
-                            "id": task.id,
-                            "score": score,
-                            "title": task.title,
-                            "extract": task.description[:200],
-                        }
-                    )
-            elif embedding.item_type == "document":
-                chunk = self.session.get(models.DocumentChunk, embedding.item_id)
-                if chunk:
-                    results.append(
-                        {
-                            "type": "document",
-                            "id": chunk.id,
-                            "score": score,
-                            "title": chunk.source_path,
-                            "extract": chunk.content[:200],
-                            "source_path": chunk.source_path,
-                        }
-                    )
+        for item_type, item_id, score in matches:
+            item = items.get((item_type, item_id))
+            if not item:
+                continue
+            result = {
+                "type": item_type,
+                "id": item.id,
+                "score": score,
+                "title": item.title,
+                "extract": item.extract or "",
+            }
+            if item_type == "document":
+                result["source_path"] = item.title
+            results.append(result)
         return results
 
+    def load_items(
+        self, keys: Iterable[Tuple[str, int]], extract_chars: Optional[int] = None
+    ) -> Dict[Tuple[str, int], Any]:
+        """Fetch notes/tasks/chunks in one `IN (...)` query per item type.
+
+        With `extract_chars` only `id`, `title` and the first characters of the body
+        are selected (as rows with `id/title/extract` attributes) so large `content`
+        blobs never leave SQLite. Without it full ORM objects are returned.
+        """
+
+        grouped: Dict[str, List[int]] = defaultdict(list)
+        for item_type, item_id in keys:
+            if item_type in HYDRATION_COLUMNS:
+                grouped[item_type].append(item_id)
+        loaded: Dict[Tuple[str, int], Any] = {}
+        for item_type, ids in grouped.items():
+            model, title_attr, body_attr = HYDRATION_COLUMNS[item_type]
+            unique_ids = list(dict.fromkeys(ids))
+            # WHY: Stay well below SQLite's bound-parameter limit for huge requests.
+            for start in range(0, len(unique_ids), IN_CLAUSE_BATCH):
+                batch = unique_ids[start : start + IN_CLAUSE_BATCH]
+                if extract_chars is None:
+                    stmt = select(model).where(model.id.in_(batch))
+                    rows = self.session.scalars(stmt).all()
+                else:
+                    stmt = select(
+                        model.id,
+                        getattr(model, title_attr).label("title"),
+                        func.substr(getattr(model, body_attr), 1, extract_chars).label(
+                            "extract"
+                        ),
+                    ).where(model.id.in_(batch))
+                    rows = self.session.execute(stmt).all()
+                for row in rows:
+                    loaded[(item_type, row.id)] = row
+        return loaded
+
     # Embedding helpers -----------------------------------------------------
+    def _vector_index(self) -> VectorIndex:
+        return get_vector_index(self.session, self.embed_service.space)
+
+    def _embedding_header(self) -> Dict[str, Any]:
+        model_name, dim = self.embed_service.space
+        return {"model_name": model_name, "dim": dim, "normalized": True}
+
     def _store_embedding(self, item_type: str, item_id: int, text: str) -> None:
-        vector = self.embed_service.embed([text])[0]
-        record = self.session.query(models.Embedding).filter_by(
-            item_type=item_type, item_id=item_id
-        ).one_or_none()
+        vector = self.embed_service.normalize(self.embed_service.embed([text])[0])
+        record = (
+            self.session.query(models.Embedding)
+            .filter_by(item_type=item_type, item_id=item_id)
+            .one_or_none()
+        )
         if record:
             record.vector = vector.tobytes()
+            for key, value in self._embedding_header().items():
+                setattr(record, key, value)
         else:
-            record = models.Embedding(item_type=item_type, item_id=item_id, vector=vector.tobytes())
+            record = models.Embedding(
+                item_type=item_type,
+                item_id=item_id,
+                vector=vector.tobytes(),
+                **self._embedding_header(),
+            )
             self.session.add(record)
+        # WHY: Flushing assigns id/updated_at so the vector index can track the write.
+        self.session.flush()
+        self._vector_index().upsert(self.session, item_type, item_id, vector, record)
+
+    def _store_embeddings(self, items: List[Tuple[str, int, str]]) -> None:
+        """Embed `(item_type, item_id, text)` triples in one batch; bulk write them."""
+
+        if not items:
+            return
+        vectors = self.embed_service.embed(
+            [text for _, _, text in items], batch_size=settings.embed_batch_size
+        )
+        self.write_vectors(
+            [(item_type, item_id) for item_type, item_id, _ in items], vectors
+        )
+
+    def write_vectors(
+        self, keys: List[Tuple[str, int]], vectors: List[np.ndarray]
+    ) -> None:
+        """Bulk upsert already-computed vectors tagged with the active model."""
+
+        vectors = [self.embed_service.normalize(vector) for vector in vectors]
+        header = self._embedding_header()
+        existing: Dict[Tuple[str, int], int] = {}
+        for start in range(0, len(keys), IN_CLAUSE_BATCH):
+            stmt = select(
+                models.Embedding.id,
+                models.Embedding.item_type,
+                models.Embedding.item_id,
+            ).where(
+                tuple_(models.Embedding.item_type, models.Embedding.item_id).in_(
+                    keys[start : start + IN_CLAUSE_BATCH]
+                )
+            )
+            for row in self.session.execute(stmt):
+                existing[(row.item_type, row.item_id)] = row.id
+        updates = []
+        inserts = []
+        for key, vector in zip(keys, vectors):
+            if key in existing:
+                updates.append(
+                    {"id": existing[key], "vector": vector.tobytes(), **header}
+                )
+            else:
+                inserts.append(
+                    {
+                        "item_type": key[0],
+                        "item_id": key[1],
+                        "vector": vector.tobytes(),
+                        **header,
+                    }
+                )
+        if updates:
+            self.session.execute(update(models.Embedding), updates)
+        if inserts:
+            self.session.execute(insert(models.Embedding), inserts)
+        self._vector_index().upsert_many(
+            self.session,
+            [
+                (item_type, item_id, vector)
+                for (item_type, item_id), vector in zip(keys, vectors)
+            ],
+        )
+
+    def delete_embeddings(self, item_type: str, item_ids: List[int]) -> None:
+        """Bulk delete embeddings for many items of one type."""
+
+        if not item_ids:
+            return
+        for start in range(0, len(item_ids), IN_CLAUSE_BATCH):
+            batch = item_ids[start : start + IN_CLAUSE_BATCH]
+            self.session.execute(
+                delete(models.Embedding).where(
+                    models.Embedding.item_type == item_type,
+                    models.Embedding.item_id.in_(batch),
+                )
+            )
+        self._vector_index().remove_many(
+            self.session, [(item_type, item_id) for item_id in item_ids]
+        )
 
     def _delete_embedding(self, item_type: str, item_id: int) -> None:
-        record = self.session.query(models.Embedding).filter_by(
-            item_type=item_type, item_id=item_id
-        ).one_or_none()
+        record = (
+            self.session.query(models.Embedding)
+            .filter_by(item_type=item_type, item_id=item_id)
+            .one_or_none()
+        )
         if record:
             self.session.delete(record)
+            self.session.flush()
+            self._vector_index().remove(self.session, item_type, item_id)
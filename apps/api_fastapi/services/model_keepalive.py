@@ -0,0 +1,177 @@
+"""Keep the local Ollama model resident: startup warm-up, an active-hours heartbeat and
+a background `/api/ps` poll that `/health` reads from."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+import httpx
+
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# WHY: Ollama reports a few milliseconds of load_duration even for a resident model;
+# anything slower means the weights were actually (re)loaded.
+COLD_LOAD_SECONDS = 0.5
+PS_TIMEOUT_SECONDS = 2.0
+# WHY: `/health` must never wait on Ollama; residency is polled here and served cached.
+PS_REFRESH_SECONDS = 30.0
+
+
+def parse_active_hours(value: str) -> Optional[Tuple[int, int]]:
+    """Parse `"07-23"` into `(7, 23)`; an empty value means always active."""
+
+    if not value.strip():
+        return None
+    start, _, end = value.partition("-")
+    return int(start) % 24, int(end or 24) % 24
+
+
+def in_active_hours(hours: Optional[Tuple[int, int]], hour: int) -> bool:
+    """Return True when `hour` falls in `[start, end)`; windows may wrap midnight."""
+
+    if hours is None:
+        return True
+    start, end = hours
+    if start == end:
+        return True
+    if start < end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class ModelKeepAlive:
+    """Warm `MODEL_NAME` on startup and ping it periodically during active hours."""
+
+    def __init__(
+        self, async_client: Any, http: Optional[httpx.AsyncClient] = None
+    ) -> None:
+        self.async_client = async_client
+        # WHY: `/api/ps` has no method on the ollama client; a client of our own keeps
+        # the poll off the library's private httpx instance.
+        self.http = http or httpx.AsyncClient(
+            base_url=settings.ollama_host, timeout=PS_TIMEOUT_SECONDS
+        )
+        self.model_name = settings.model_name
+        self.active_hours = parse_active_hours(settings.ollama_active_hours)
+        self.last_load_at: Optional[float] = None
+        self.last_load_seconds: Optional[float] = None
+        self.last_warm_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.loaded: Optional[bool] = None
+        self.expires_at: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, response: Mapping[str, Any]) -> None:
+        """Note a cold load from any Ollama response carrying `load_duration`."""
+
+        load_seconds = (response.get("load_duration") or 0) / 1e9
+        if load_seconds >= COLD_LOAD_SECONDS:
+            self.last_load_at = time.time()
+            self.last_load_seconds = round(load_seconds, 3)
+            logger.info("Ollama loaded %s in %.2fs", self.model_name, load_seconds)
+
+    async def warm(self) -> bool:
+        """Load the model (an empty prompt loads weights without generating)."""
+
+        if self.async_client is None:
+            self.last_error = "Ollama client unavailable"
+            return False
+        try:
+            response = await self.async_client.generate(
+                model=self.model_name, prompt="", keep_alive=settings.ollama_keep_alive
+            )
+        except Exception as exc:
+            self.last_error = str(exc) or exc.__class__.__name__
+            logger.warning("Could not warm %s: %s", self.model_name, self.last_error)
+            return False
+        self.record(response)
+        self.last_warm_at = time.time()
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        """Start the warm-up/heartbeat/residency task on the running event loop."""
+
+        if self._task is None and self.async_client is not None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def aclose(self) -> None:
+        """Stop the background task and close the `/api/ps` connection pool."""
+
+        await self.stop()
+        await self.http.aclose()
+
+    async def _run(self) -> None:
+        if settings.ollama_warmup:
+            await self.warm()
+        heartbeat = settings.ollama_heartbeat_seconds
+        next_warm = time.monotonic() + heartbeat
+        while True:
+            await self.refresh_residency()
+            await asyncio.sleep(PS_REFRESH_SECONDS)
+            if heartbeat <= 0 or time.monotonic() < next_warm:
+                continue
+            next_warm = time.monotonic() + heartbeat
+            # WHY: Outside active hours Ollama may unload the model and free the RAM.
+            if in_active_hours(self.active_hours, datetime.now().hour):
+                await self.warm()
+
+    async def refresh_residency(self) -> None:
+        """Ask Ollama's `/api/ps` whether the model is loaded; cache the answer."""
+
+        self.loaded, self.expires_at = await self._resident()
+        self.checked_at = time.time()
+
+    def status(self) -> Dict[str, Any]:
+        """Return cached load state for `/health`; `loaded` is None if Ollama is
+        unreachable or has not been polled yet."""
+
+        return {
+            "model": self.model_name,
+            "loaded": self.loaded,
+            "expires_at": self.expires_at,
+            "checked_at": _iso(self.checked_at),
+            "last_load_at": _iso(self.last_load_at),
+            "last_load_seconds": self.last_load_seconds,
+            "last_warm_at": _iso(self.last_warm_at),
+            "keep_alive": settings.ollama_keep_alive,
+            "heartbeat_active": self._task is not None
+            and settings.ollama_heartbeat_seconds > 0
+            and in_active_hours(self.active_hours, datetime.now().hour),
+            "error": self.last_error,
+        }
+
+    async def _resident(self) -> Tuple[Optional[bool], Optional[str]]:
+        if self.async_client is None:
+            return None, None
+        try:
+            response = await self.http.get("/api/ps")
+            response.raise_for_status()
+            running = response.json().get("models", [])
+        except Exception:
+            return None, None
+        for model in running:
+            if model.get("name") in (self.model_name, f"{self.model_name}:latest"):
+                return True, model.get("expires_at")
+        return False, None
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
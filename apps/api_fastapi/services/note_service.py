@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import Any, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -17,8 +17,13 @@ class NoteService:
         self.session = session
         self.memory = MemoryService(session)
 
-    def list_notes(self) -> List[models.Note]:
-        return self.memory.list_notes()
+    def page_notes(self, **filters: Any) -> Tuple[List[Any], Optional[str]]:
+        """One page of notes; see `MemoryService.page_notes` for the filters."""
+
+        return self.memory.page_notes(**filters)
+
+    def get_note(self, note_id: int) -> models.Note | None:
+        return self.session.get(models.Note, note_id)
 
     def create_note(self, payload: dict) -> models.Note:
         return self.memory.create_note(
@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import importlib.util
 import logging
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
@@ -12,12 +13,18 @@ import yaml
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
-from ..core import models
+from ..core import metrics, models
 from ..core.config import get_settings
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+PLUGIN_SECONDS = metrics.histogram(
+    "atlas_plugin_duration_seconds",
+    "Plugin callable execution time by plugin and outcome",
+    ("plugin", "outcome"),
+)
+
 
 @dataclass
 class Plugin:
@@ -108,5 +115,13 @@ class PluginService:
         if not hasattr(module, callable_name):
             raise HTTPException(status_code=500, detail="Plugin missing callable")
 
-        result = getattr(module, callable_name)(payload)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = getattr(module, callable_name)(payload)
+            outcome = "ok"
+        finally:
+            PLUGIN_SECONDS.observe(
+                time.perf_counter() - started, plugin=plugin.name, outcome=outcome
+            )
         return {"result": result}
@@ -0,0 +1,127 @@
+"""Per-provider circuit breakers and latency tracking for `LLMService`."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import get_settings
+
+settings = get_settings()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+# Latency percentiles and the error rate cover the most recent calls only.
+WINDOW_SIZE = 200
+
+
+class CircuitBreaker:
+    """Skip a provider after repeated failures, then probe it with one request.
+
+    After `LLM_BREAKER_FAILURES` consecutive failures the circuit opens for
+    `LLM_BREAKER_BACKOFF_SECONDS`. Once that elapses a single half-open probe is let
+    through: success closes the circuit, failure re-opens it with the backoff doubled
+    (capped at `LLM_BREAKER_MAX_BACKOFF_SECONDS`).
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = None,
+        base_backoff: Optional[float] = None,
+        max_backoff: Optional[float] = None,
+    ) -> None:
+        self.failure_threshold = failure_threshold or settings.llm_breaker_failures
+        self.base_backoff = base_backoff or settings.llm_breaker_backoff_seconds
+        self.max_backoff = max_backoff or settings.llm_breaker_max_backoff_seconds
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.backoff = self.base_backoff
+        self.opened_until = 0.0
+        self._probe_in_flight = False
+        self._calls: Deque[Tuple[float, bool]] = deque(maxlen=WINDOW_SIZE)
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent to the provider now."""
+
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() >= self.opened_until:
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self._calls.append((seconds, True))
+            self.state = CLOSED
+            self.consecutive_failures = 0
+            self.backoff = self.base_backoff
+            self._probe_in_flight = False
+
+    def record_failure(self, seconds: float) -> None:
+        with self._lock:
+            self._calls.append((seconds, False))
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                self._open()
+            elif self.consecutive_failures >= self.failure_threshold:
+                self._open()
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """Forget an abandoned (cancelled) call without judging the provider."""
+
+        with self._lock:
+            self._probe_in_flight = False
+
+    @contextmanager
+    def attempt(self) -> Iterator[None]:
+        """Time the enclosed provider call and record its outcome."""
+
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.record_failure(time.perf_counter() - started)
+            raise
+        except BaseException:
+            # Cancellation or a closed generator says nothing about provider health.
+            self.release()
+            raise
+        self.record_success(time.perf_counter() - started)
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_until = time.monotonic() + self.backoff
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            calls = list(self._calls)
+            state = self.state
+            retry_in = max(0.0, self.opened_until - time.monotonic())
+        latencies = np.array([seconds for seconds, _ in calls], dtype=np.float64)
+        percentiles = (
+            np.percentile(latencies * 1000, [50, 95, 99]).round(1).tolist()
+            if calls
+            else [None, None, None]
+        )
+        errors = sum(1 for _, ok in calls if not ok)
+        return {
+            "state": state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_in_seconds": round(retry_in, 1) if state == OPEN else 0.0,
+            "calls": len(calls),
+            "error_rate": round(errors / len(calls), 3) if calls else 0.0,
+            "latency_ms": dict(zip(("p50", "p95", "p99"), percentiles)),
+        }
@@ -0,0 +1,168 @@
+"""Background migration of embeddings produced by a different model."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func, not_, select
+from sqlalchemy.orm import Session
+
+from ..core import db, models
+from ..core.config import get_settings
+from .embed_service import FALLBACK_MODEL_NAME
+from .memory_service import MemoryService, embedding_text
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class ReembedStatus:
+    """Progress of the most recent re-embed run."""
+
+    state: str = "idle"
+    target_model: str = ""
+    migrated: int = 0
+    removed: int = 0
+    remaining: int = 0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, object]:
+        return asdict(self)
+
+
+class ReembedService:
+    """Re-embed rows whose model/dimension differs from the active model."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+        self.memory = MemoryService(session)
+
+    def _stale(self):
+        model_name, dim = self.memory.embed_service.space
+        return not_(
+            and_(
+                models.Embedding.model_name == model_name,
+                models.Embedding.dim == dim,
+                models.Embedding.normalized.is_(True),
+            )
+        )
+
+    def ensure_model_loaded(self) -> None:
+        """Raise unless the real model is loaded.
+
+        WHY: With the random fallback every stored vector looks stale, and the job
+        would replace real embeddings with noise.
+        """
+
+        embed_service = self.memory.embed_service
+        if (
+            embed_service.model is None
+            or embed_service.active_model_name == FALLBACK_MODEL_NAME
+        ):
+            raise RuntimeError(
+                f"Embedding model {embed_service.model_name} is not loaded; "
+                "refusing to overwrite stored vectors"
+            )
+
+    def pending_count(self) -> int:
+        stmt = select(func.count(models.Embedding.id)).where(self._stale())
+        return int(self.session.scalar(stmt) or 0)
+
+    def migrate_batch(self, batch_size: int) -> Tuple[int, int]:
+        """Re-embed one batch; return `(migrated, removed_orphans)`."""
+
+        stmt = (
+            select(models.Embedding.item_type, models.Embedding.item_id)
+            .where(self._stale())
+            .order_by(models.Embedding.id)
+            .limit(batch_size)
+        )
+        keys = [(row.item_type, row.item_id) for row in self.session.execute(stmt)]
+        if not keys:
+            return 0, 0
+        items = self.memory.load_items(keys)
+        live = [key for key in keys if key in items]
+        orphans = [key for key in keys if key not in items]
+        grouped: Dict[str, List[int]] = defaultdict(list)
+        for item_type, item_id in orphans:
+            grouped[item_type].append(item_id)
+        for item_type, item_ids in grouped.items():
+            self.memory.delete_embeddings(item_type, item_ids)
+        if live:
+            vectors = self.memory.embed_service.embed(
+                [embedding_text(key[0], items[key]) for key in live],
+                batch_size=settings.embed_batch_size,
+            )
+            self.memory.write_vectors(live, vectors)
+        return len(live), len(orphans)
+
+
+def run_reembed(
+    batch_size: Optional[int] = None,
+    status: Optional[ReembedStatus] = None,
+    progress: Optional[Callable[[ReembedStatus], None]] = None,
+    session_scope: Callable[[], ContextManager[Session]] = db.get_session,
+) -> ReembedStatus:
+    """Migrate every stale embedding, committing after each batch."""
+
+    batch_size = batch_size or settings.embed_batch_size
+    status = status or ReembedStatus()
+    status.state = "running"
+    status.started_at = time.time()
+    try:
+        while True:
+            # WHY: One short transaction per batch keeps search serving meanwhile.
+            with session_scope() as session:
+                service = ReembedService(session)
+                service.ensure_model_loaded()
+                status.target_model = service.memory.embed_service.active_model_name
+                migrated, removed = service.migrate_batch(batch_size)
+                status.remaining = service.pending_count()
+            status.migrated += migrated
+            status.removed += removed
+            if progress:
+                progress(status)
+            if not migrated and not removed:
+                break
+        status.state = "finished"
+    except Exception as exc:  # surfaced through the status API
+        logger.exception("Re-embed job failed")
+        status.state = "failed"
+        status.error = str(exc)
+    status.finished_at = time.time()
+    return status
+
+
+_status = ReembedStatus()
+_status_lock = threading.Lock()
+
+
+def start_background_reembed(batch_size: Optional[int] = None) -> ReembedStatus:
+    """Start the re-embed job in a daemon thread unless one is already running."""
+
+    global _status
+    with _status_lock:
+        if _status.state == "running":
+            return _status
+        _status = ReembedStatus(state="running")
+        threading.Thread(
+            target=run_reembed,
+            kwargs={"batch_size": batch_size, "status": _status},
+            name="reembed",
+            daemon=True,
+        ).start()
+        return _status
+
+
+def reembed_status() -> ReembedStatus:
+    """Return the status of the current or last re-embed job."""
+
+    return _status
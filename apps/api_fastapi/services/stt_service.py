@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import base64
 import json
+import time
 from typing import Tuple
 
 try:
@@ -12,6 +13,12 @@ except Exception:  # pragma: no cover - optional dependency
     KaldiRecognizer = None  # type: ignore
     Model = None  # type: ignore
 
+from ..core import metrics
+
+STT_SECONDS = metrics.histogram(
+    "atlas_stt_duration_seconds", "Speech-to-text time by outcome", ("outcome",)
+)
+
 
 class STTService:
     """Decode base64 audio and run offline transcription when possible."""
@@ -27,8 +34,10 @@ class STTService:
     def transcribe(self, audio_base64: str, lang: str = "en") -> Tuple[str, float]:
         """Return transcription text and a rough confidence score."""
 
+        started = time.perf_counter()
         audio_bytes = base64.b64decode(audio_base64)
         if not self.model or not KaldiRecognizer:
+            STT_SECONDS.observe(time.perf_counter() - started, outcome="unavailable")
             return ("Transcription unavailable (model not installed)", 0.0)
         recognizer = KaldiRecognizer(self.model, 16000)
         recognizer.AcceptWaveform(audio_bytes)
@@ -38,4 +47,7 @@ class STTService:
             text = result.get("text", "")
         except Exception:
             text = ""
+        STT_SECONDS.observe(
+            time.perf_counter() - started, outcome="text" if text else "empty"
+        )
         return text or "", 0.65 if text else 0.0
@@ -0,0 +1,50 @@
+"""Tag lookups and tag clouds over the normalized `tags` tables."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..core import models
+
+
+class TagService:
+    """Read-side queries for tags; tags are written through `MemoryService`."""
+
+    def __init__(self, session: Session) -> None:
+        self.session = session
+
+    def cloud(self, prefix: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """Return tags in use with their task and note counts, most used first.
+
+        Each count is a range scan of a link table's `(tag_id, item_id)` index and
+        `prefix` is a range on `ix_tags_name`, so no task or note row is read.
+        """
+
+        tag = models.Tag
+        task_count = (
+            select(func.count())
+            .where(models.task_tags.c.tag_id == tag.id)
+            .scalar_subquery()
+        )
+        note_count = (
+            select(func.count())
+            .where(models.note_tags.c.tag_id == tag.id)
+            .scalar_subquery()
+        )
+        counts = select(tag.name, task_count.label("tasks"), note_count.label("notes"))
+        if prefix:
+            # WHY: A range instead of LIKE, which SQLite cannot answer from the index.
+            counts = counts.where(tag.name >= prefix, tag.name < prefix + "\U0010ffff")
+        # MATERIALIZED keeps SQLite from re-running the counts in WHERE and ORDER BY.
+        counts = counts.cte("tag_counts").prefix_with("MATERIALIZED")
+        total = counts.c.tasks + counts.c.notes
+        stmt = (
+            select(counts)
+            .where(total > 0)
+            .order_by(total.desc(), counts.c.name)
+            .limit(limit)
+        )
+        return [dict(row._mapping) for row in self.session.execute(stmt)]
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from typing import List
+from typing import Any, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -17,8 +17,10 @@ class TaskService:
         self.session = session
         self.memory = MemoryService(session)
 
-    def list_tasks(self) -> List[models.Task]:
-        return self.memory.list_tasks()
+    def page_tasks(self, **filters: Any) -> Tuple[List[Any], Optional[str]]:
+        """One page of tasks; see `MemoryService.page_tasks` for the filters."""
+
+        return self.memory.page_tasks(**filters)
 
     def create_task(self, payload: dict) -> models.Task:
         return self.memory.create_task(
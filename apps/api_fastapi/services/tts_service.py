@@ -2,11 +2,19 @@
 
 from __future__ import annotations
 
+import time
+
 try:
     import pyttsx3  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
     pyttsx3 = None
 
+from ..core import metrics
+
+TTS_SECONDS = metrics.histogram(
+    "atlas_tts_duration_seconds", "Text-to-speech time by outcome", ("outcome",)
+)
+
 
 class TTSService:
     """Provide spoken feedback using a friendly 'professional butler' tone."""
@@ -25,11 +33,15 @@ class TTSService:
     def speak(self, text: str) -> bool:
         """Speak the provided text if pyttsx3 is installed."""
 
+        started = time.perf_counter()
         if not self.engine:
+            TTS_SECONDS.observe(time.perf_counter() - started, outcome="unavailable")
             return False
         try:
             self.engine.say(text)
             self.engine.runAndWait()
-            return True
+            outcome = "spoken"
         except Exception:
-            return False
+            outcome = "error"
+        TTS_SECONDS.observe(time.perf_counter() - started, outcome=outcome)
+        return outcome == "spoken"
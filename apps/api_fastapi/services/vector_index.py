@@ -0,0 +1,395 @@
+"""In-memory vector index kept in sync with the `embeddings` table."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import weakref
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, event, func, or_, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from ..core import models
+from ..core.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+Signature = Tuple[int, Optional[int], Optional[datetime]]
+
+
+class VectorIndex:
+    """Contiguous, pre-normalised float32 matrix with an item side table.
+
+    Each index serves one embedding space (model name + dimension); rows from other
+    models are never loaded. Legacy rows without a model tag are served while their
+    dimension matches, until the re-embed job migrates them.
+
+    The index is loaded once from the database and then updated incrementally by
+    `MemoryService` writes. A cheap `(count, max(id), max(updated_at))` signature
+    detects writes from other processes (e.g. `scripts/index_documents.py`) and
+    triggers a reload.
+    """
+
+    def __init__(self, model_name: str, dim: int) -> None:
+        self.model_name = model_name
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._type_names: List[str] = []
+        self._type_codes = np.zeros(0, dtype=np.int16)
+        self._item_ids = np.zeros(0, dtype=np.int64)
+        self._positions: Dict[Tuple[str, int], int] = {}
+        self._count = 0
+        self._loaded = False
+        self._signature: Optional[Signature] = None
+        # IVF (inverted file) state for approximate search on large corpora.
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_at_count = 0
+
+    # Public API ------------------------------------------------------------
+    def __len__(self) -> int:
+        return self._count
+
+    def search(
+        self,
+        session: Session,
+        query: np.ndarray,
+        top_k: int,
+        item_types: Optional[Iterable[str]] = None,
+    ) -> List[Tuple[str, int, float]]:
+        """Return `(item_type, item_id, score)` tuples ordered by cosine similarity."""
+
+        self.ensure_fresh(session)
+        with self._lock:
+            if not self._count or top_k <= 0:
+                return []
+            query = _normalise(np.asarray(query, dtype=np.float32).reshape(-1))
+            if query.shape[0] != self.dim:
+                logger.warning(
+                    "Query dimension %s does not match index dimension %s",
+                    query.shape[0],
+                    self.dim,
+                )
+                return []
+            candidates = self._candidate_rows(query)
+            if item_types is not None:
+                codes = [
+                    self._type_names.index(t)
+                    for t in item_types
+                    if t in self._type_names
+                ]
+                candidates = candidates[np.isin(self._type_codes[candidates], codes)]
+            if not len(candidates):
+                return []
+            scores = self._vectors[candidates] @ query
+            k = min(top_k, len(scores))
+            # WHY: argpartition is O(n); only the k winners get fully sorted.
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [
+                (
+                    self._type_names[self._type_codes[candidates[idx]]],
+                    int(self._item_ids[candidates[idx]]),
+                    float(scores[idx]),
+                )
+                for idx in top
+            ]
+
+    def upsert(
+        self,
+        session: Session,
+        item_type: str,
+        item_id: int,
+        vector: np.ndarray,
+        record: Optional[models.Embedding] = None,
+    ) -> None:
+        """Insert or replace the vector for an item after a `MemoryService` write."""
+
+        _track_session(session, self)
+        with self._lock:
+            if not self._loaded:
+                return
+            if not self._set_vector(item_type, item_id, vector):
+                return
+            if record is not None and self._signature is not None:
+                count, max_id, max_updated = self._signature
+                if record.id is not None and (max_id is None or record.id > max_id):
+                    count += 1
+                    max_id = record.id
+                if record.updated_at is not None and (
+                    max_updated is None or record.updated_at > max_updated
+                ):
+                    max_updated = record.updated_at
+                self._signature = (count, max_id, max_updated)
+
+    def upsert_many(
+        self, session: Session, items: Iterable[Tuple[str, int, np.ndarray]]
+    ) -> None:
+        """Apply a batch of bulk-written vectors, then resync the table signature."""
+
+        _track_session(session, self)
+        with self._lock:
+            if not self._loaded:
+                return
+            for item_type, item_id, vector in items:
+                self._set_vector(item_type, item_id, vector)
+            # WHY: Bulk statements bypass the ORM, so read the signature back.
+            self._signature = _table_signature(session)
+
+    def remove(self, session: Session, item_type: str, item_id: int) -> None:
+        """Drop an item from the index after a `MemoryService` delete."""
+
+        _track_session(session, self)
+        with self._lock:
+            if not self._loaded:
+                return
+            if self._remove_row(item_type, item_id) and self._signature is not None:
+                count, max_id, max_updated = self._signature
+                self._signature = (count - 1, max_id, max_updated)
+
+    def remove_many(self, session: Session, keys: Iterable[Tuple[str, int]]) -> None:
+        """Drop a batch of bulk-deleted items, then resync the table signature."""
+
+        _track_session(session, self)
+        with self._lock:
+            if not self._loaded:
+                return
+            for item_type, item_id in keys:
+                self._remove_row(item_type, item_id)
+            self._signature = _table_signature(session)
+
+    def invalidate(self) -> None:
+        """Force a full reload on the next search."""
+
+        with self._lock:
+            self._loaded = False
+            self._signature = None
+
+    def ensure_fresh(self, session: Session) -> None:
+        """Reload from the database when the table changed behind our back."""
+
+        signature = _table_signature(session)
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return
+            self._rebuild(session)
+            self._signature = signature
+
+    # Internal helpers ------------------------------------------------------
+    def _rebuild(self, session: Session) -> None:
+        stmt = select(
+            models.Embedding.item_type,
+            models.Embedding.item_id,
+            models.Embedding.vector,
+        )
+        stmt = stmt.where(
+            or_(
+                and_(
+                    models.Embedding.model_name == self.model_name,
+                    models.Embedding.dim == self.dim,
+                ),
+                and_(
+                    models.Embedding.model_name == "",
+                    func.length(models.Embedding.vector) == self.dim * 4,
+                ),
+            )
+        )
+        rows = session.execute(stmt).all()
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._type_codes = np.zeros(0, dtype=np.int16)
+        self._item_ids = np.zeros(0, dtype=np.int64)
+        self._positions = {}
+        self._count = 0
+        self._centroids = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_at_count = 0
+        if rows:
+            matrix = np.frombuffer(
+                b"".join(row.vector for row in rows), dtype=np.float32
+            )
+            matrix = matrix.reshape(len(rows), self.dim)
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            self._vectors = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+            self._type_codes = np.array(
+                [self._type_code(row.item_type) for row in rows], dtype=np.int16
+            )
+            self._item_ids = np.array([row.item_id for row in rows], dtype=np.int64)
+            self._positions = {
+                (row.item_type, row.item_id): idx for idx, row in enumerate(rows)
+            }
+            self._count = len(rows)
+            self._assignments = np.full(self._count, -1, dtype=np.int32)
+        self._loaded = True
+        self._maybe_train()
+
+    def _set_vector(self, item_type: str, item_id: int, vector: np.ndarray) -> bool:
+        vector = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if vector.shape[0] != self.dim:
+            logger.warning(
+                "Ignoring %s/%s: dimension %s != %s",
+                item_type,
+                item_id,
+                vector.shape[0],
+                self.dim,
+            )
+            self._remove_row(item_type, item_id)
+            return False
+        vector = _normalise(vector)
+        key = (item_type, item_id)
+        row = self._positions.get(key)
+        if row is None:
+            row = self._count
+            self._reserve(row + 1)
+            self._positions[key] = row
+            self._count += 1
+        self._vectors[row] = vector
+        self._type_codes[row] = self._type_code(item_type)
+        self._item_ids[row] = item_id
+        self._assignments[row] = self._assign(vector[None, :])[0]
+        self._maybe_train()
+        return True
+
+    def _remove_row(self, item_type: str, item_id: int) -> bool:
+        row = self._positions.pop((item_type, item_id), None)
+        if row is None:
+            return False
+        last = self._count - 1
+        if row != last:
+            # WHY: Swap-with-last keeps the matrix contiguous without shifting rows.
+            self._vectors[row] = self._vectors[last]
+            self._type_codes[row] = self._type_codes[last]
+            self._item_ids[row] = self._item_ids[last]
+            self._assignments[row] = self._assignments[last]
+            moved_type = self._type_names[self._type_codes[row]]
+            self._positions[(moved_type, int(self._item_ids[row]))] = row
+        self._count = last
+        return True
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._vectors.shape[0]
+        if size <= capacity:
+            return
+        new_capacity = max(size, capacity * 2, 64)
+        vectors = np.zeros((new_capacity, self.dim), dtype=np.float32)
+        vectors[: self._count] = self._vectors[: self._count]
+        type_codes = np.zeros(new_capacity, dtype=np.int16)
+        type_codes[: self._count] = self._type_codes[: self._count]
+        item_ids = np.zeros(new_capacity, dtype=np.int64)
+        item_ids[: self._count] = self._item_ids[: self._count]
+        assignments = np.full(new_capacity, -1, dtype=np.int32)
+        assignments[: self._count] = self._assignments[: self._count]
+        self._vectors, self._type_codes = vectors, type_codes
+        self._item_ids, self._assignments = item_ids, assignments
+
+    def _type_code(self, item_type: str) -> int:
+        if item_type not in self._type_names:
+            self._type_names.append(item_type)
+        return self._type_names.index(item_type)
+
+    # Approximate (IVF) mode ------------------------------------------------
+    def _ivf_enabled(self) -> bool:
+        mode = settings.vector_index_mode
+        if mode == "ivf":
+            return self._count >= 2
+        if mode == "auto":
+            return self._count >= settings.vector_index_ivf_threshold
+        return False
+
+    def _maybe_train(self) -> None:
+        if not self._ivf_enabled():
+            self._centroids = None
+            return
+        # WHY: Retrain only when the corpus doubled so incremental writes stay cheap.
+        if self._centroids is not None and self._count < 2 * self._trained_at_count:
+            return
+        self._train_ivf()
+
+    def _train_ivf(self, iterations: int = 8) -> None:
+        vectors = self._vectors[: self._count]
+        n_lists = max(1, int(np.sqrt(self._count)))
+        rng = np.random.default_rng(0)
+        sample_size = min(self._count, n_lists * 64)
+        sample = vectors[rng.choice(self._count, size=sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for idx in range(n_lists):
+                members = sample[labels == idx]
+                if len(members):
+                    centroids[idx] = _normalise(members.mean(axis=0))
+        self._centroids = centroids
+        self._assignments[: self._count] = np.argmax(vectors @ centroids.T, axis=1)
+        self._trained_at_count = self._count
+        logger.info(
+            "Trained IVF index with %s lists over %s vectors", n_lists, self._count
+        )
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.full(len(vectors), -1, dtype=np.int32)
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _candidate_rows(self, query: np.ndarray) -> np.ndarray:
+        if self._centroids is None:
+            return np.arange(self._count)
+        n_probe = min(settings.vector_index_nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ query), n_probe - 1)[:n_probe]
+        return np.nonzero(np.isin(self._assignments[: self._count], probe))[0]
+
+
+def _normalise(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector)) or 1.0
+    return (vector / norm).astype(np.float32)
+
+
+def _table_signature(session: Session) -> Signature:
+    stmt = select(
+        func.count(models.Embedding.id),
+        func.max(models.Embedding.id),
+        func.max(models.Embedding.updated_at),
+    )
+    count, max_id, max_updated = session.execute(stmt).one()
+    return int(count or 0), max_id, max_updated
+
+
+_indexes: "weakref.WeakKeyDictionary[Engine, Dict[Tuple[str, int], VectorIndex]]" = (
+    weakref.WeakKeyDictionary()
+)
+_indexes_lock = threading.Lock()
+
+
+def get_vector_index(session: Session, space: Tuple[str, int]) -> VectorIndex:
+    """Return the process-wide index for `space` in the database bound to `session`."""
+
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    with _indexes_lock:
+        spaces = _indexes.setdefault(engine, {})
+        index = spaces.get(space)
+        if index is None:
+            index = VectorIndex(*space)
+            spaces[space] = index
+        return index
+
+
+def _track_session(session: Session, index: VectorIndex) -> None:
+    session.info.setdefault("vector_indexes", set()).add(index)
+
+
+@event.listens_for(Session, "after_commit")
+def _forget_tracked_indexes(session: Session) -> None:
+    session.info.pop("vector_indexes", None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_on_rollback(session: Session, previous_transaction) -> None:
+    # WHY: Index updates are applied eagerly, so a rolled back write must not linger.
+    for index in session.info.pop("vector_indexes", set()):
+        index.invalidate()
@@ -0,0 +1,71 @@
+"""Tests for the streaming chunker."""
+
+import sys
+from types import SimpleNamespace
+
+from ..core import chunking
+from ..core.chunking import chunk_lines, chunk_text, length_function
+from ..core.config import get_settings
+
+
+def test_chunks_respect_size_and_keep_all_text() -> None:
+    lines = [f"line {idx}" for idx in range(200)]
+    chunks = list(chunk_lines(lines, size=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert "\n".join(chunks).splitlines() == lines
+
+
+def test_overlap_repeats_trailing_lines() -> None:
+    chunks = list(chunk_text("aaaa\nbbbb\ncccc\ndddd", size=10, overlap=4))
+    assert chunks == ["aaaa\nbbbb", "bbbb\ncccc", "cccc\ndddd"]
+
+
+def test_long_single_line_is_split() -> None:
+    line = " ".join(["word"] * 1000)
+    chunks = list(chunk_lines([line], size=100))
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert list(chunk_lines(["x" * 250], size=100)) == ["x" * 100, "x" * 100, "x" * 50]
+
+
+def test_custom_length_function_counts_tokens() -> None:
+    words = lambda text: len(text.split())  # noqa: E731
+    chunks = list(
+        chunk_lines(["one two", "three four", "five"], size=4, length_fn=words)
+    )
+    assert chunks == ["one two\nthree four", "five"]
+
+
+def test_chunker_is_lazy() -> None:
+    def endless():
+        while True:
+            yield "some text here"
+
+    first = next(chunk_lines(endless(), size=40))
+    assert len(first) <= 40
+
+
+def test_token_mode_loads_only_the_tokenizer(monkeypatch) -> None:
+    loaded = []
+
+    class FakeTokenizer:
+        def tokenize(self, text):
+            return list(text.replace(" ", ""))
+
+    class FakeAutoTokenizer:
+        @staticmethod
+        def from_pretrained(name):
+            loaded.append(name)
+            return FakeTokenizer()
+
+    monkeypatch.setitem(
+        sys.modules, "transformers", SimpleNamespace(AutoTokenizer=FakeAutoTokenizer)
+    )
+    chunking._load_tokenizer.cache_clear()
+    try:
+        measure = length_function("tokens")
+        assert measure("ab cd") == 4
+        length_function("tokens")
+        assert loaded == [f"sentence-transformers/{get_settings().embed_model_name}"]
+    finally:
+        chunking._load_tokenizer.cache_clear()
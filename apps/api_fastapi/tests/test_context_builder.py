@@ -0,0 +1,52 @@
+"""Tests for token-budgeted chat context assembly."""
+
+from ..services.context_builder import ContextBuilder
+
+
+class FakeMemory:
+    def __init__(self, hits=None) -> None:
+        self.hits = hits or []
+
+    def semantic_search(self, query, top_k):
+        return self.hits[:top_k]
+
+
+def count_words(text: str) -> int:
+    return len(text.split())
+
+
+def turns(count: int):
+    return [
+        {
+            "role": "user" if idx % 2 == 0 else "assistant",
+            "content": f"turn {idx}. " * 5,
+        }
+        for idx in range(count)
+    ]
+
+
+def test_recent_turns_fit_budget_and_older_turns_are_summarised() -> None:
+    builder = ContextBuilder(FakeMemory(), count_tokens=count_words, budget=120)
+    context = builder.build("next question", turns(20))
+    system, recent = context[0], context[1:]
+    assert system["role"] == "system"
+    assert "Earlier in this conversation" in system["content"]
+    assert recent[-1]["content"].startswith("turn 19.")
+    assert sum(count_words(msg["content"]) + 4 for msg in context) <= 120
+
+
+def test_memory_hits_are_included_above_threshold() -> None:
+    hits = [
+        {
+            "type": "note",
+            "title": "Wifi",
+            "extract": "Password is in the drawer",
+            "score": 0.9,
+        },
+        {"type": "task", "title": "Noise", "extract": "irrelevant", "score": 0.01},
+    ]
+    builder = ContextBuilder(FakeMemory(hits), count_tokens=count_words, budget=200)
+    context = builder.build("where is the wifi password?", turns(2))
+    assert "[note] Wifi: Password is in the drawer" in context[0]["content"]
+    assert "Noise" not in context[0]["content"]
+    assert len(context) == 3
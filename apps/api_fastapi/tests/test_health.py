@@ -15,3 +15,17 @@ def test_health_endpoint_returns_ok() -> None:
     assert "versions" in data
     assert "checks" in data
     assert "ollama" in data["checks"]
+
+
+def test_metrics_endpoint_exposes_route_latency() -> None:
+    client.get("/health")
+    client.get("/tasks")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert "# TYPE atlas_http_request_duration_seconds histogram" in body
+    assert (
+        'atlas_http_requests_total{route="/health",method="GET",status="200"}' in body
+    )
+    assert 'atlas_sqlite_query_duration_seconds_count{operation="SELECT"}' in body
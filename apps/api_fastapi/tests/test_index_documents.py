@@ -0,0 +1,24 @@
+"""Tests for the document indexing pipeline in `scripts/index_documents.py`."""
+
+import threading
+
+from scripts.index_documents import ScanState, iter_messages
+
+
+def test_dangling_symlink_does_not_hang_the_reader_pool(tmp_path) -> None:
+    (tmp_path / "a.txt").write_text("hello\nworld\n")
+    (tmp_path / "gone.txt").symlink_to(tmp_path / "missing.txt")
+    state = ScanState()
+    messages = []
+
+    def drain() -> None:
+        messages.extend(iter_messages(tmp_path, {}, state, workers=2, queue_size=8))
+
+    reader = threading.Thread(target=drain, daemon=True)
+    reader.start()
+    reader.join(timeout=30)
+    assert not reader.is_alive()
+    assert state.failed_files == 1
+    assert [message[1] for message in messages if message[0] == "file"] == [
+        str(tmp_path / "a.txt")
+    ]
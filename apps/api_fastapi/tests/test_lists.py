@@ -0,0 +1,75 @@
+"""Tests for the paginated /tasks and /notes list endpoints."""
+
+from fastapi.testclient import TestClient
+
+from ..core.deps import get_db
+from ..main import app
+from ..services.memory_service import MemoryService
+from .test_memory import setup_database
+
+
+def _client_with(session) -> TestClient:
+    app.dependency_overrides[get_db] = lambda: session
+    return TestClient(app)
+
+
+def test_task_pages_and_summary_view() -> None:
+    session = setup_database()
+    MemoryService(session).create_tasks(
+        [
+            {"title": f"Task {idx}", "due_date": f"2024-05-0{idx}", "tags": ["x"]}
+            for idx in range(1, 4)
+        ]
+    )
+    client = _client_with(session)
+    try:
+        first = client.get("/tasks", params={"limit": 2, "view": "summary"}).json()
+        assert first["view"] == "summary"
+        assert [item["title"] for item in first["items"]] == ["Task 1", "Task 2"]
+        assert "description" not in first["items"][0]
+        assert first["items"][0]["tags"] == ["x"]
+
+        rest = client.get("/tasks", params={"cursor": first["next_cursor"]}).json()
+        assert rest["view"] == "full"
+        assert [item["title"] for item in rest["items"]] == ["Task 3"]
+        assert rest["items"][0]["description"] == ""
+        assert rest["next_cursor"] is None
+
+        assert client.get("/tasks", params={"cursor": "bogus"}).status_code == 400
+        assert client.get("/tasks", params={"limit": 0}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_note_summary_view_and_detail() -> None:
+    session = setup_database()
+    note = MemoryService(session).create_note("Long", "y" * 1000, ["ref"])
+    client = _client_with(session)
+    try:
+        page = client.get("/notes", params={"view": "summary", "tag": "ref"}).json()
+        assert page["view"] == "summary"
+        assert page["items"][0]["extract"] == "y" * 200
+        assert "content" not in page["items"][0]
+        assert client.get("/notes", params={"tag": "other"}).json()["items"] == []
+        assert client.get(f"/notes/{note.id}").json()["content"] == "y" * 1000
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_tag_filter_and_cloud_use_the_tags_tables() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.create_tasks([{"title": "t1", "tags": ["work", " work", "x"]}])
+    service.create_notes(
+        [{"title": "n1", "tags": ["work"]}, {"title": "n2", "tags": ["wonder"]}]
+    )
+    client = _client_with(session)
+    try:
+        tasks = client.get("/tasks", params={"tag": "work"}).json()["items"]
+        assert tasks[0]["tags"] == ["work", "x"]
+        cloud = client.get("/tags").json()
+        assert cloud[0] == {"name": "work", "tasks": 1, "notes": 1}
+        prefixed = client.get("/tags", params={"prefix": "won"}).json()
+        assert [tag["name"] for tag in prefixed] == ["wonder"]
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,304 @@
+"""Tests for the LLM gateway."""
+
+import asyncio
+import time
+from contextlib import contextmanager
+
+import httpx
+from fastapi import Request
+from fastapi.testclient import TestClient
+
+from ..core import db as db_module
+from ..core import models
+from ..core.deps import get_client_key, get_db
+from ..core.rate_limit import SlidingWindowRateLimiter
+from ..main import app
+from ..services import llm_service
+from ..services.llm_metrics_service import LLMMetricsService
+from ..services.llm_service import LLMService, get_llm_service
+from ..services.model_keepalive import (
+    ModelKeepAlive,
+    in_active_hours,
+    parse_active_hours,
+)
+from ..services.provider_health import CircuitBreaker
+from .test_memory import setup_database
+
+
+async def _chunks(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+def collect(frames):
+    async def drain():
+        return [frame async for frame in frames]
+
+    return asyncio.run(drain())
+
+
+class FakeOllama:
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        if self.fail:
+            raise ConnectionError("offline")
+        return _chunks(
+            [{"message": {"content": part}} for part in ["Hel", "lo", " there"]]
+        )
+
+
+def test_stream_chat_yields_tokens_then_done() -> None:
+    service = LLMService()
+    service.async_ollama_client = FakeOllama()
+    frames = collect(service.astream_chat("Hi", [], "local"))
+    assert [frame["content"] for frame in frames[:-1]] == ["Hel", "lo", " there"]
+    done = frames[-1]
+    assert done["type"] == "done"
+    assert done["reply"] == "Hello there"
+    assert done["ttft_ms"] is not None
+
+
+class FakeCountingOllama:
+    async def chat(self, model, messages, stream=False, **kwargs):
+        return _chunks(
+            [
+                {"message": {"content": "Hi"}, "done": False},
+                {
+                    "message": {"content": "!"},
+                    "done": True,
+                    "prompt_eval_count": 12,
+                    "eval_count": 2,
+                    "eval_duration": 500_000_000,
+                    "load_duration": 1_000_000,
+                },
+            ]
+        )
+
+
+def test_stream_usage_uses_provider_counts_and_is_recorded() -> None:
+    service = LLMService()
+    service.async_ollama_client = FakeCountingOllama()
+    done = collect(service.astream_chat("Hi", [], "local"))[-1]
+    usage = done["usage"]
+    assert (usage["prompt_tokens"], usage["completion_tokens"]) == (12, 2)
+    assert usage["tokens_per_second"] == 4.0
+    assert not usage["estimated"] and done["tokens"] == 14
+
+    session = setup_database()
+    metrics = LLMMetricsService(session)
+    metrics.record(usage, "conv", stream=True)
+    metrics.record(None, "conv")  # cached replies carry no usage
+    assert len(metrics.recent()) == 1
+    summary = metrics.summary()[0]
+    assert summary["calls"] == 1 and summary["prompt_tokens"] == 12
+
+
+def test_usage_is_estimated_without_provider_counts() -> None:
+    service = LLMService()
+    service.async_ollama_client = FakeOllama()
+    usage = collect(service.astream_chat("Hi", [], "local"))[-1]["usage"]
+    assert usage["estimated"]
+    assert usage["completion_tokens"] > 0 and usage["ttft_ms"] is not None
+
+
+def test_stream_chat_reports_unavailable_providers() -> None:
+    service = LLMService()
+    service.async_ollama_client = FakeOllama(fail=True)
+    service.async_openai_client = None
+    frames = collect(service.astream_chat("Hi", []))
+    assert len(frames) == 1
+    assert frames[0]["model_used"] == "unavailable"
+
+
+def test_gateway_is_shared_and_limits_per_client() -> None:
+    service = get_llm_service()
+    assert get_llm_service() is service
+    limiter = SlidingWindowRateLimiter(2)
+    assert limiter.allow("a") and limiter.allow("a")
+    assert not limiter.allow("a")
+    assert limiter.allow("b")
+
+
+def test_client_header_shares_its_address_budget() -> None:
+    def key(host, header=None):
+        headers = [(b"x-atlas-client", header.encode())] if header else []
+        return get_client_key(
+            Request({"type": "http", "client": (host, 1234), "headers": headers})
+        )
+
+    assert key("10.0.0.1") == "10.0.0.1"
+    assert key("10.0.0.1", "ui") == "10.0.0.1/ui"
+    limiter = SlidingWindowRateLimiter(2)
+    assert limiter.allow(key("10.0.0.1", "a")) and limiter.allow(key("10.0.0.1", "b"))
+    assert not limiter.allow(key("10.0.0.1", "c"))
+    assert not limiter.allow(key("10.0.0.1"))
+    assert limiter.allow(key("10.0.0.2", "a"))
+
+
+class FakeAsyncOllama:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+
+    async def chat(self, model, messages, stream=False, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        return {"message": {"content": "pong"}}
+
+
+def test_async_chat_bounds_concurrent_generations(monkeypatch) -> None:
+    monkeypatch.setattr(llm_service.settings, "llm_max_concurrency", 1)
+    monkeypatch.setattr(llm_service.settings, "llm_max_queue", 1)
+    service = LLMService()
+    service.async_ollama_client = FakeAsyncOllama(delay=0.05)
+
+    async def run_three():
+        return await asyncio.gather(
+            *(service.achat("ping", [], "local", f"c{i}") for i in range(3))
+        )
+
+    replies = asyncio.run(run_three())
+    assert service.async_ollama_client.peak == 1
+    assert sorted(reply["model_used"] for reply in replies).count("busy") == 1
+    assert [reply["reply"] for reply in replies].count("pong") == 2
+
+
+def test_response_cache_coalesces_and_serves_hits(monkeypatch) -> None:
+    monkeypatch.setattr(llm_service.settings, "llm_response_cache", True)
+    service = LLMService()
+    service.async_ollama_client = FakeAsyncOllama(delay=0.05)
+
+    async def ask_twice_concurrently():
+        return await asyncio.gather(
+            service.achat("ping", [], "local"), service.achat("  ping ", [], "local")
+        )
+
+    first, second = asyncio.run(ask_twice_concurrently())
+    assert service.async_ollama_client.peak == 1
+    assert {first["model_used"], second["model_used"]} == {
+        llm_service.settings.model_name,
+        f"{llm_service.settings.model_name} (coalesced)",
+    }
+    again = asyncio.run(service.achat("ping", [], "local"))
+    assert again["model_used"].endswith("(cached)")
+    assert service.stats()["response_cache"]["hits"] == 1
+
+
+def test_active_hours_wrap_midnight() -> None:
+    assert parse_active_hours("") is None
+    assert in_active_hours(parse_active_hours("07-23"), 12)
+    assert not in_active_hours(parse_active_hours("07-23"), 23)
+    night = parse_active_hours("22-06")
+    assert in_active_hours(night, 23) and in_active_hours(night, 3)
+    assert not in_active_hours(night, 12)
+
+
+class FakeWarmOllama:
+    async def generate(self, model, prompt, keep_alive=None):
+        return {"load_duration": 2_500_000_000, "keep_alive": keep_alive}
+
+
+def test_warm_up_records_cold_load() -> None:
+    keepalive = ModelKeepAlive(FakeWarmOllama())
+    assert asyncio.run(keepalive.warm())
+    status = keepalive.status()
+    assert status["last_load_seconds"] == 2.5
+    assert status["last_load_at"] is not None
+    assert status["loaded"] is None
+
+
+def test_status_serves_cached_residency(monkeypatch) -> None:
+    calls = []
+
+    def ps(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        models = [{"name": "llama3.2:3b", "expires_at": "2030-01-01T00:00:00Z"}]
+        return httpx.Response(200, json={"models": models})
+
+    http = httpx.AsyncClient(
+        base_url="http://ollama.test", transport=httpx.MockTransport(ps)
+    )
+    keepalive = ModelKeepAlive(FakeWarmOllama(), http=http)
+    monkeypatch.setattr(keepalive, "model_name", "llama3.2:3b")
+    assert keepalive.status()["loaded"] is None
+    asyncio.run(keepalive.refresh_residency())
+    for _ in range(3):
+        status = keepalive.status()
+    assert status["loaded"] is True
+    assert status["expires_at"] == "2030-01-01T00:00:00Z"
+    assert status["checked_at"] is not None
+    assert calls == ["/api/ps"]
+    asyncio.run(keepalive.aclose())
+    assert http.is_closed
+
+
+def test_circuit_breaker_opens_and_probes_once() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, base_backoff=0.01, max_backoff=1)
+    breaker.record_failure(0.1)
+    assert breaker.allow()
+    breaker.record_failure(0.1)
+    assert breaker.state == "open" and not breaker.allow()
+    time.sleep(0.02)
+    assert breaker.allow()  # the half-open probe
+    assert not breaker.allow()
+    breaker.record_failure(0.1)
+    assert breaker.state == "open" and breaker.backoff == 0.02
+    time.sleep(0.03)
+    assert breaker.allow()
+    breaker.record_success(0.05)
+    assert breaker.state == "closed"
+    assert breaker.stats()["error_rate"] == 0.75
+
+
+def test_open_circuit_skips_failing_provider() -> None:
+    service = LLMService()
+    failing = FakeOllama(fail=True)
+    calls = []
+    original = failing.chat
+
+    async def counting_chat(*args, **kwargs):
+        calls.append(1)
+        return await original(*args, **kwargs)
+
+    failing.chat = counting_chat
+    service.async_ollama_client = failing
+    service.async_openai_client = None
+    for _ in range(5):
+        reply = asyncio.run(service.achat("hi", [], "local", "test"))
+        assert reply["model_used"] == "unavailable"
+    assert len(calls) == llm_service.settings.llm_breaker_failures
+    assert service.stats()["providers"]["ollama"]["state"] == "open"
+
+
+class FakeBusyService:
+    async def achat(self, message, history, mode=None, client_key=None):
+        return dict(llm_service.BUSY_REPLY)
+
+    async def astream_chat(self, message, history, mode=None, client_key=None):
+        yield {"type": "done", **llm_service.RATE_LIMITED_REPLY, "ttft_ms": None}
+
+
+def test_error_replies_are_not_saved_as_turns(monkeypatch) -> None:
+    session = setup_database()
+    assert session.query(models.ChatMessage).count() == 0
+    app.dependency_overrides[get_db] = lambda: session
+    app.dependency_overrides[get_llm_service] = FakeBusyService
+
+    @contextmanager
+    def same_session():
+        yield session
+
+    monkeypatch.setattr(db_module, "get_session", same_session)
+    client = TestClient(app)
+    try:
+        reply = client.post("/llm/chat", json={"message": "hi"}).json()
+        assert reply["model_used"] == "busy"
+        client.post("/llm/chat/stream", json={"message": "hi"})
+        assert session.query(models.ChatMessage).count() == 0
+    finally:
+        app.dependency_overrides.clear()
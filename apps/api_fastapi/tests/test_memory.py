@@ -1,14 +1,22 @@
 """Tests for semantic search service."""
 
-from sqlalchemy import create_engine
+from datetime import date
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.orm import Session, sessionmaker
 
 from ..core import models
-from ..services.memory_service import MemoryService
+from ..core.schemas import ChatMessageSchema
+from ..services.embed_service import EmbeddingCache
+from ..services.memory_service import EXTRACT_CHARS, MemoryService
 
 
 def setup_database() -> Session:
-    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}
+    )
     models.Base.metadata.create_all(bind=engine)
     SessionLocal = sessionmaker(bind=engine)
     return SessionLocal()
@@ -25,3 +33,203 @@ def test_semantic_search_returns_results() -> None:
     assert results
     types = {result["type"] for result in results}
     assert "note" in types
+
+
+def test_load_items_projects_extracts() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    note = service.create_note("Long Note", "x" * 500, [])
+    task = service.create_task("Task", "Short", None, [])
+
+    items = service.load_items(
+        [("task", task.id), ("note", note.id), ("note", 999)], extract_chars=200
+    )
+    assert set(items) == {("task", task.id), ("note", note.id)}
+    assert items[("note", note.id)].title == "Long Note"
+    assert len(items[("note", note.id)].extract) == 200
+
+    full = service.load_items([("note", note.id)])
+    assert full[("note", note.id)].content == "x" * 500
+
+
+def test_bulk_document_upsert_updates_and_inserts() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.upsert_document_chunk("docs/a.txt", 0, "old text")
+
+    stats = service.upsert_document_chunks(
+        [
+            ("docs/a.txt", 0, "new text"),
+            ("docs/a.txt", 1, "second"),
+            ("docs/b.txt", 0, "b"),
+        ],
+        batch_size=2,
+    )
+    assert stats.chunks == 3
+    assert stats.batches == 2
+    chunks = session.query(models.DocumentChunk).order_by(models.DocumentChunk.id).all()
+    assert [chunk.content for chunk in chunks] == ["new text", "second", "b"]
+    assert session.query(models.Embedding).filter_by(item_type="document").count() == 3
+    results = service.semantic_search("anything", top_k=10)
+    assert {result["id"] for result in results} == {chunk.id for chunk in chunks}
+
+
+def test_precomputed_document_vectors_are_written_as_is() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.upsert_document_chunk("docs/a.txt", 0, "same")
+    batch = [("docs/a.txt", 0, "same"), ("docs/a.txt", 1, "new")]
+    vectors = service.embed_document_batch(batch)
+    assert list(vectors) == [("docs/a.txt", 1)]
+
+    calls = []
+    service.embed_service.embed = lambda texts, batch_size=32: calls.append(texts)
+    stats = service.write_document_batches([(batch, vectors)])
+    assert (stats.chunks, stats.unchanged) == (2, 1)
+    assert calls == []
+    chunk = session.query(models.DocumentChunk).filter_by(chunk_index=1).one()
+    stored = session.query(models.Embedding).filter_by(
+        item_type="document", item_id=chunk.id
+    )
+    assert np.allclose(
+        np.frombuffer(stored.one().vector, dtype="float32"),
+        service.embed_service.normalize(vectors[("docs/a.txt", 1)]),
+    )
+
+
+def test_prune_document_and_purge_orphans() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    stats = service.upsert_document_chunks(
+        [("docs/a.txt", idx, f"chunk {idx}") for idx in range(4)]
+    )
+    assert stats.unchanged == 0
+    again = service.upsert_document_chunks([("docs/a.txt", 0, "chunk 0")])
+    assert again.unchanged == 1
+
+    assert service.prune_document("docs/a.txt", keep_chunks=2) == 2
+    assert session.query(models.DocumentChunk).count() == 2
+    assert session.query(models.Embedding).count() == 2
+
+    session.query(models.DocumentChunk).filter_by(chunk_index=1).delete()
+    assert service.purge_orphan_embeddings() == 1
+    assert session.query(models.Embedding).count() == 1
+
+
+def test_embedding_cache_round_trips_through_disk(tmp_path) -> None:
+    path = tmp_path / "cache.db"
+    cache = EmbeddingCache(path, max_entries=1)
+    vectors = [np.arange(3, dtype=np.float32), np.ones(3, dtype=np.float32)]
+    cache.put_many("m", ["a", "b"], vectors)
+    assert cache.get_many("m", ["a", "b", "c"])[2] is None
+    # A fresh process only has the disk copy.
+    reloaded = EmbeddingCache(path, max_entries=8).get_many("m", ["a", "b"])
+    assert np.array_equal(reloaded[0], vectors[0])
+    assert cache.get_many("other", ["a"]) == [None]
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 2
+
+
+def test_chat_turns_are_appended_per_conversation() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.save_chat_messages(
+        [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}],
+        "c1",
+    )
+    service.save_chat_messages([{"role": "user", "content": "other"}], "c2")
+    service.save_chat_messages(
+        [{"role": "user", "content": "again"}, {"role": "assistant", "content": "yes"}],
+        "c1",
+    )
+    assert session.query(models.ChatMessage).count() == 5
+    assert [msg["content"] for msg in service.conversation_history("c1", 3)] == [
+        "hello",
+        "again",
+        "yes",
+    ]
+
+
+def test_schema_messages_with_empty_content_are_saved() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.save_chat_messages(
+        [
+            ChatMessageSchema(role="user", content=""),
+            {"role": "assistant", "content": ""},
+        ],
+        "c1",
+    )
+    assert [
+        (msg["role"], msg["content"]) for msg in service.conversation_history("c1", 5)
+    ] == [("user", ""), ("assistant", "")]
+
+
+def test_tag_rows_tolerates_a_concurrently_created_tag(monkeypatch) -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    session.add(models.Tag(name="work"))
+    session.flush()
+    load_tags = service._load_tags
+    calls = []
+
+    def stale_first_lookup(names, known) -> None:
+        # The first lookup misses, as if another request inserted the tag since.
+        calls.append(names)
+        if len(calls) > 1:
+            load_tags(names, known)
+
+    monkeypatch.setattr(service, "_load_tags", stale_first_lookup)
+    [tag] = service.tag_rows(["work"])
+    session.flush()
+    assert tag.name == "work" and tag.id is not None
+    assert session.query(models.Tag).count() == 1
+
+
+def test_page_tasks_walks_keyset_pages_with_filters() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    service.create_tasks(
+        [
+            {"title": "undated", "tags": ["home"]},
+            {"title": "b", "due_date": "2024-05-02", "tags": ["work"]},
+            {"title": "a", "due_date": "2024-05-01", "tags": ["work", "home"]},
+            {"title": "c", "due_date": "2024-05-02", "tags": ["work"]},
+            {"title": "d", "due_date": "2024-06-01", "tags": []},
+        ]
+    )
+    titles, cursor = [], None
+    while True:
+        page, cursor = service.page_tasks(limit=2, cursor=cursor)
+        titles.extend(task.title for task in page)
+        if cursor is None:
+            break
+    assert titles == ["undated", "a", "b", "c", "d"]
+
+    work, _ = service.page_tasks(tag="work", due_from=date(2024, 5, 2))
+    assert [task.title for task in work] == ["b", "c"]
+    service.update_task(work[0].id, {"completed": True})
+    open_tasks, _ = service.page_tasks(completed=False, due_to=date(2024, 5, 31))
+    assert [task.title for task in open_tasks] == ["a", "c"]
+
+    session.expunge_all()
+    summary, _ = service.page_tasks(limit=2, summary=True)
+    assert "description" in inspect(summary[0]).unloaded
+    assert summary[1].tags_list() == ["home", "work"]
+
+
+def test_page_notes_newest_first_with_summary_extracts() -> None:
+    session = setup_database()
+    service = MemoryService(session)
+    for idx in range(5):
+        service.create_note(f"Note {idx}", "x" * 500, ["even"] if idx % 2 == 0 else [])
+
+    first, cursor = service.page_notes(limit=3, summary=True)
+    assert [note.title for note in first] == ["Note 4", "Note 3", "Note 2"]
+    assert len(first[0].extract) == EXTRACT_CHARS
+    rest, cursor = service.page_notes(limit=3, cursor=cursor)
+    assert [note.title for note in rest] == ["Note 1", "Note 0"] and cursor is None
+
+    tagged, _ = service.page_notes(tag="even")
+    assert [note.title for note in tagged] == ["Note 4", "Note 2", "Note 0"]
+    with pytest.raises(ValueError):
+        service.page_notes(cursor="not-a-cursor")
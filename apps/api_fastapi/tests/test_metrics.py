@@ -0,0 +1,47 @@
+"""Tests for the in-process Prometheus metrics registry."""
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from ..core import db
+from ..core.metrics import MetricsRegistry, _Metric
+
+
+def test_histogram_renders_cumulative_buckets() -> None:
+    registry = MetricsRegistry()
+    latency = registry.histogram("demo_seconds", "Demo", ("phase",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        latency.observe(value, phase="embed")
+    assert registry.histogram("demo_seconds", "Demo", ("phase",)) is latency
+
+    lines = registry.render().splitlines()
+    assert lines[:2] == ["# HELP demo_seconds Demo", "# TYPE demo_seconds histogram"]
+    assert 'demo_seconds_bucket{phase="embed",le="0.1"} 1' in lines
+    assert 'demo_seconds_bucket{phase="embed",le="1.0"} 2' in lines
+    assert 'demo_seconds_bucket{phase="embed",le="+Inf"} 3' in lines
+    assert 'demo_seconds_sum{phase="embed"} 5.55' in lines
+    assert latency.count(phase="embed") == 3
+
+
+def test_counter_escapes_label_values() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_total", "Demo", ("route",))
+    requests.inc(route='/say "hi"')
+    requests.inc(2, route='/say "hi"')
+    assert 'demo_total{route="/say \\"hi\\""} 3.0' in registry.render()
+
+
+def test_failed_statements_leave_no_timer_state() -> None:
+    before = db.SQL_SECONDS.count(operation="SELECT")
+    with db.engine.connect() as conn:
+        info = dict(conn.info)
+        with pytest.raises(OperationalError):
+            conn.exec_driver_sql("SELECT * FROM no_such_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert dict(conn.info) == info
+    assert db.SQL_SECONDS.count(operation="SELECT") == before + 1
+
+
+def test_metric_base_class_is_abstract() -> None:
+    with pytest.raises(TypeError):
+        _Metric("demo", "Demo", ())
@@ -0,0 +1,97 @@
+"""Tests for the versioned schema migrations."""
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from ..core import models
+from ..migrations import discover, ops, pending, require_current, upgrade
+
+
+def _indexes(engine, table):
+    return {
+        index["name"]: bool(index["unique"])
+        for index in inspect(engine).get_indexes(table)
+    }
+
+
+def test_fresh_database_matches_models() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    applied = upgrade(engine)
+    assert [migration.version for migration in applied] == [
+        migration.version for migration in discover()
+    ]
+    inspector = inspect(engine)
+    for table in models.Base.metadata.sorted_tables:
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        assert columns == {column.name for column in table.columns}, table.name
+        expected = {index.name: bool(index.unique) for index in table.indexes}
+        assert _indexes(engine, table.name) == expected, table.name
+
+
+def test_upgrade_is_idempotent_and_recorded() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    upgrade(engine)
+    assert upgrade(engine) == []
+    assert pending(engine) == []
+    require_current(engine)
+    with engine.connect() as conn:
+        count = conn.execute(text("SELECT COUNT(*) FROM schema_migrations")).scalar()
+    assert count == len(discover())
+
+
+def test_require_current_rejects_unmigrated_database() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    with pytest.raises(RuntimeError, match="scripts/migrate.py"):
+        require_current(engine)
+
+
+def test_backfill_runs_in_batches_until_done() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    ops.execute(engine, "CREATE TABLE items (id INTEGER PRIMARY KEY, label TEXT)")
+    for _ in range(25):
+        ops.execute(engine, "INSERT INTO items (label) VALUES (NULL)")
+    updated = ops.backfill(
+        engine, "items", "label = :label", "label IS NULL", {"label": "x"}, 10
+    )
+    assert updated == 25
+    with engine.connect() as conn:
+        assert (
+            conn.execute(text("SELECT COUNT(*) FROM items WHERE label = 'x'")).scalar()
+            == 25
+        )
+
+
+def test_tags_migration_moves_json_tags_into_link_tables() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    upgrade(engine, target=2)
+    now = "2024-01-01 00:00:00"
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "INSERT INTO tasks (id, title, description, tags, completed,"
+                " created_at, updated_at) VALUES"
+                " (1, 'a', '', '[\"work\", \" home \", \"work\"]', 0, :now, :now),"
+                " (2, 'b', '', 'not json', 0, :now, :now)"
+            ),
+            {"now": now},
+        )
+        conn.execute(
+            text(
+                "INSERT INTO notes (id, title, content, tags, created_at, updated_at)"
+                " VALUES (1, 'n', '', '[\"home\", \"\"]', :now, :now)"
+            ),
+            {"now": now},
+        )
+    upgrade(engine)
+    assert "tags" not in ops.columns(engine, "tasks")
+    assert "tags" not in ops.columns(engine, "notes")
+    with engine.connect() as conn:
+        links = conn.execute(
+            text(
+                "SELECT 'task', task_id, name FROM task_tags"
+                " JOIN tags ON tags.id = tag_id"
+                " UNION ALL SELECT 'note', note_id, name FROM note_tags"
+                " JOIN tags ON tags.id = tag_id ORDER BY 1, 2, 3"
+            )
+        ).all()
+    assert links == [("note", 1, "home"), ("task", 1, "home"), ("task", 1, "work")]
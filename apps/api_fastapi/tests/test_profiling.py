@@ -0,0 +1,66 @@
+"""Tests for opt-in request profiling."""
+
+import threading
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from ..core.profiling import ProfilingMiddleware, StackSampler, list_profiles
+
+
+def busy_loop(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_collects_busy_stacks() -> None:
+    sampler = StackSampler(0.001)
+    sampler.start()
+    busy_loop(0.05)
+    stacks = sampler.stop()
+    assert any("busy_loop (test_profiling.py" in stack for stack in stacks)
+
+
+def other_work(stop: threading.Event) -> None:
+    while not stop.is_set():
+        pass
+
+
+def test_sampler_can_skip_unrelated_threads() -> None:
+    stop = threading.Event()
+    other = threading.Thread(target=other_work, args=(stop,), name="indexer")
+    other.start()
+    sampler = StackSampler(0.001, loop_thread=threading.get_ident())
+    sampler.start()
+    busy_loop(0.05)
+    stacks = sampler.stop()
+    stop.set()
+    other.join()
+    assert any("busy_loop (test_profiling.py" in stack for stack in stacks)
+    assert not any("other_work" in stack for stack in stacks)
+
+
+def test_middleware_profiles_only_flagged_requests(tmp_path) -> None:
+    app = FastAPI()
+
+    @app.get("/slow")
+    def slow() -> dict:
+        busy_loop(0.05)
+        return {"ok": True}
+
+    app.add_middleware(ProfilingMiddleware, mode="header", directory=tmp_path)
+    client = TestClient(app)
+
+    assert "x-atlas-profile" not in client.get("/slow").headers
+    assert list_profiles(tmp_path) == []
+
+    response = client.get("/slow", headers={"X-Atlas-Profile": "1"})
+    [profile] = list_profiles(tmp_path)
+    assert profile["name"].startswith(response.headers["x-atlas-profile"])
+    assert profile["method"] == "GET" and profile["path"] == "slow"
+    lines = (tmp_path / profile["name"]).read_text().splitlines()
+    assert any(
+        "busy_loop" in line and line.rsplit(" ", 1)[1].isdigit() for line in lines
+    )
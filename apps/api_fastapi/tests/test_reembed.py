@@ -0,0 +1,175 @@
+"""Tests for embedding headers, schema upgrades and the re-embed job."""
+
+from contextlib import contextmanager
+
+import numpy as np
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.orm import sessionmaker
+
+from ..core import models
+from ..core.config import get_settings
+from ..migrations import upgrade
+from ..services import embed_service
+from ..services.embed_service import get_model_registry
+from ..services.memory_service import MemoryService
+from ..services.reembed_service import ReembedService, run_reembed
+
+settings = get_settings()
+
+
+def test_upgrade_adds_embedding_header_columns() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE embeddings (id INTEGER PRIMARY KEY,"
+                " item_type VARCHAR(32), item_id INTEGER, vector BLOB,"
+                " created_at DATETIME, updated_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO embeddings (item_type, item_id, vector)"
+                " VALUES ('note', 1, x'00')"
+            )
+        )
+    upgrade(engine)
+    columns = {column["name"] for column in inspect(engine).get_columns("embeddings")}
+    assert {"model_name", "dim", "normalized"} <= columns
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT model_name, dim FROM embeddings")).one() == (
+            "",
+            0,
+        )
+
+
+def test_upgrade_dedupes_before_adding_unique_indexes() -> None:
+    engine = create_engine("sqlite:///:memory:")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE document_chunks (id INTEGER PRIMARY KEY,"
+                " source_path TEXT, chunk_index INTEGER, content TEXT,"
+                " created_at DATETIME, updated_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO document_chunks (id, source_path, chunk_index, content)"
+                " VALUES (1, 'a.txt', 0, 'old'), (2, 'a.txt', 0, 'new')"
+            )
+        )
+        conn.execute(
+            text(
+                "CREATE TABLE embeddings (id INTEGER PRIMARY KEY,"
+                " item_type VARCHAR(32), item_id INTEGER, vector BLOB,"
+                " created_at DATETIME, updated_at DATETIME)"
+            )
+        )
+        conn.execute(
+            text(
+                "INSERT INTO embeddings (item_type, item_id, vector) VALUES"
+                " ('document', 1, x'00'), ('document', 2, x'00'),"
+                " ('document', 2, x'01')"
+            )
+        )
+    upgrade(engine)
+    indexes = {
+        index["name"]: index["unique"]
+        for table in ("embeddings", "document_chunks")
+        for index in inspect(engine).get_indexes(table)
+    }
+    assert indexes["ix_embeddings_item"] and indexes["ix_document_chunks_source_chunk"]
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT id, content FROM document_chunks")).all() == [
+            (2, "new")
+        ]
+        assert conn.execute(text("SELECT item_id, vector FROM embeddings")).all() == [
+            (2, b"\x01")
+        ]
+
+
+class FakeModel:
+    """Deterministic stand-in for a loaded SentenceTransformer."""
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return 8
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        return np.array([[len(text), 1, 0, 0, 0, 0, 0, 1] for text in texts], "f4")
+
+
+def memory_session_scope():
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}
+    )
+    models.Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def session_scope():
+        session = SessionLocal()
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    return session_scope
+
+
+def test_reembed_migrates_legacy_vectors(monkeypatch) -> None:
+    monkeypatch.setitem(
+        get_model_registry()._models, settings.embed_model_name, FakeModel()
+    )
+    monkeypatch.setattr(embed_service, "get_embedding_cache", lambda: None)
+    session_scope = memory_session_scope()
+
+    with session_scope() as session:
+        note = MemoryService(session).create_note("Legacy", "Old vector", [])
+        record = session.query(models.Embedding).one()
+        record.model_name = ""
+        record.dim = 0
+        record.vector = np.ones(8, dtype=np.float32).tobytes()
+        # An orphaned legacy vector whose note was deleted long ago.
+        session.add(models.Embedding(item_type="note", item_id=999, vector=b"\0" * 32))
+        note_id = note.id
+
+    with session_scope() as session:
+        assert ReembedService(session).pending_count() == 2
+
+    status = run_reembed(batch_size=1, session_scope=session_scope)
+    assert status.state == "finished"
+    assert (status.migrated, status.removed, status.remaining) == (1, 1, 0)
+
+    with session_scope() as session:
+        memory = MemoryService(session)
+        record = session.query(models.Embedding).one()
+        assert (record.model_name, record.dim) == memory.embed_service.space
+        assert record.normalized
+        assert memory.semantic_search("Legacy", top_k=1)[0]["id"] == note_id
+
+
+def test_reembed_refuses_to_run_on_the_fallback_model(monkeypatch) -> None:
+    monkeypatch.setitem(get_model_registry()._models, settings.embed_model_name, None)
+    session_scope = memory_session_scope()
+    real = np.ones(8, dtype=np.float32).tobytes()
+    with session_scope() as session:
+        session.add(
+            models.Embedding(
+                item_type="note",
+                item_id=1,
+                vector=real,
+                model_name="all-MiniLM-L6-v2",
+                dim=8,
+                normalized=True,
+            )
+        )
+
+    status = run_reembed(session_scope=session_scope)
+    assert status.state == "failed"
+    assert "not loaded" in status.error
+    assert status.migrated == 0
+    with session_scope() as session:
+        record = session.query(models.Embedding).one()
+        assert (record.model_name, record.vector) == ("all-MiniLM-L6-v2", real)
@@ -0,0 +1,99 @@
+"""Tests for the incremental in-memory vector index."""
+
+import numpy as np
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from ..core import models
+from ..services import vector_index
+from ..services.vector_index import get_vector_index
+
+
+def setup_database() -> Session:
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}
+    )
+    models.Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+    return SessionLocal()
+
+
+def make_embedding(item_type: str, item_id: int, vector, model_name: str = "test"):
+    vector = np.asarray(vector, dtype=np.float32)
+    return models.Embedding(
+        item_type=item_type,
+        item_id=item_id,
+        vector=vector.tobytes(),
+        model_name=model_name,
+        dim=len(vector),
+    )
+
+
+def add_embedding(session: Session, item_type: str, item_id: int, vector) -> None:
+    record = make_embedding(item_type, item_id, vector)
+    session.add(record)
+    session.flush()
+    index = get_vector_index(session, ("test", len(vector)))
+    index.upsert(
+        session, item_type, item_id, np.asarray(vector, dtype=np.float32), record
+    )
+
+
+def test_index_tracks_incremental_writes() -> None:
+    session = setup_database()
+    index = get_vector_index(session, ("test", 3))
+    add_embedding(session, "note", 1, [1.0, 0.0, 0.0])
+    add_embedding(session, "task", 2, [0.0, 1.0, 0.0])
+    assert index.search(session, np.array([1.0, 0.1, 0.0]), 1)[0][:2] == ("note", 1)
+
+    add_embedding(session, "note", 3, [0.9, 0.0, 0.1])
+    index.remove(session, "note", 1)
+    session.query(models.Embedding).filter_by(item_type="note", item_id=1).delete()
+    session.flush()
+
+    hits = index.search(session, np.array([1.0, 0.0, 0.0]), 5)
+    assert [hit[:2] for hit in hits][0] == ("note", 3)
+    assert ("note", 1) not in {hit[:2] for hit in hits}
+    assert len(index) == 2
+    assert (
+        index.search(session, np.array([0.0, 1.0, 0.0]), 5, item_types=["task"])[0][1]
+        == 2
+    )
+
+
+def test_index_reloads_after_external_write() -> None:
+    session = setup_database()
+    index = get_vector_index(session, ("test", 2))
+    add_embedding(session, "note", 1, [1.0, 0.0])
+    index.search(session, np.array([1.0, 0.0]), 1)
+    # Simulate another process writing straight to the table.
+    session.add(make_embedding("document", 7, [0.0, 1.0]))
+    session.flush()
+    assert index.search(session, np.array([0.0, 1.0]), 1)[0][:2] == ("document", 7)
+
+
+def test_index_ignores_other_models() -> None:
+    session = setup_database()
+    session.add(make_embedding("note", 1, [1.0, 0.0]))
+    session.add(make_embedding("note", 2, [1.0, 0.0], model_name="other"))
+    session.add(make_embedding("note", 3, [1.0, 0.0, 0.0]))
+    # Legacy rows (no model tag) are served while their dimension matches.
+    session.add(make_embedding("note", 4, [0.9, 0.1], model_name=""))
+    session.flush()
+    hits = get_vector_index(session, ("test", 2)).search(
+        session, np.array([1.0, 0.0]), 10
+    )
+    assert {hit[1] for hit in hits} == {1, 4}
+
+
+def test_ivf_mode_finds_nearest_neighbour(monkeypatch) -> None:
+    monkeypatch.setattr(vector_index.settings, "vector_index_mode", "ivf")
+    monkeypatch.setattr(vector_index.settings, "vector_index_nprobe", 4)
+    session = setup_database()
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((400, 16)).astype(np.float32)
+    for idx, vector in enumerate(vectors):
+        session.add(make_embedding("document", idx, vector))
+    session.flush()
+    hits = get_vector_index(session, ("test", 16)).search(session, vectors[42], 3)
+    assert hits[0][1] == 42
@@ -14,6 +14,31 @@ PAGE_ICON = str(Path(__file__).resolve().parents[2] / "brand" / "atlas_avatar.sv
 st.set_page_config(page_title="Chat", page_icon=PAGE_ICON)
 
 
+def stream_reply(client: api_client.AtlasAPIClient, message: str, mode: str) -> str:
+    """Render tokens as they arrive and return the full reply.
+
+    Only the new message is sent; the API keeps the conversation history.
+    """
+
+    placeholder = st.empty()
+    parts = []
+    reply = ""
+    conversation_id = st.session_state.get("conversation_id")
+    for frame in client.chat_stream(message, conversation_id, mode):
+        if frame["type"] == "token":
+            parts.append(frame["content"])
+            with placeholder.container():
+                api_client.render_message(
+                    {"role": "assistant", "content": "".join(parts)}
+                )
+        else:
+            reply = frame["reply"]
+            st.session_state["conversation_id"] = frame.get("conversation_id")
+            if frame.get("ttft_ms") is not None:
+                st.session_state["chat_ttft_ms"] = frame["ttft_ms"]
+    return reply
+
+
 def main() -> None:
     """Display the chat layout with history and slash-command support."""
 
@@ -24,11 +49,17 @@ def main() -> None:
         title="Atlas Chat",
         subtitle="Converse privately with your local model or trigger commands with / syntax.",
         health_payload=health,
-        mode_label="Local-first" if not health["checks"]["openai"]["configured"] else "Auto",
+        mode_label=(
+            "Local-first" if not health["checks"]["openai"]["configured"] else "Auto"
+        ),
     )
 
     history = st.session_state.setdefault("chat_history", [])
     mode = st.radio("Model routing", ["auto", "local", "cloud"], horizontal=True)
+    if st.button("New conversation"):
+        st.session_state.chat_history = []
+        st.session_state.pop("conversation_id", None)
+        st.experimental_rerun()
 
     chat_container = st.container()
     with chat_container:
@@ -50,9 +81,13 @@ def main() -> None:
                 plan = parsed["plan"]
                 result = app_state.api_client.execute_plan(plan)
                 if result.get("status") == "pending-confirmation":
-                    result = app_state.api_client.execute_plan(plan, confirm_token="user-confirmed")
+                    result = app_state.api_client.execute_plan(
+                        plan, confirm_token="user-confirmed"
+                    )
                 history.append({"role": "user", "content": content})
-                history.append({"role": "assistant", "content": f"Command executed: {result}"})
+                history.append(
+                    {"role": "assistant", "content": f"Command executed: {result}"}
+                )
                 st.session_state.chat_history = history
                 st.experimental_rerun()
             elif parsed.get("action"):
@@ -60,9 +95,8 @@ def main() -> None:
                 if action["tool"] == "ask":
                     question = action["args"].get("question", "")
                     history.append({"role": "user", "content": question})
-                    with st.spinner("Atlas is thinking..."):
-                        reply = app_state.api_client.chat(question, history, mode)
-                    history.append({"role": "assistant", "content": reply["reply"]})
+                    reply = stream_reply(app_state.api_client, question, mode)
+                    history.append({"role": "assistant", "content": reply})
                     st.session_state.chat_history = history
                     st.experimental_rerun()
                 else:
@@ -77,12 +111,14 @@ def main() -> None:
                     st.experimental_rerun()
         else:
             history.append({"role": "user", "content": content})
-            with st.spinner("Atlas is thinking..."):
-                reply = app_state.api_client.chat(content, history, mode)
-            history.append({"role": "assistant", "content": reply["reply"]})
+            reply = stream_reply(app_state.api_client, content, mode)
+            history.append({"role": "assistant", "content": reply})
             st.session_state.chat_history = history
             st.experimental_rerun()
 
+    if st.session_state.get("chat_ttft_ms") is not None:
+        st.caption(f"First token after {st.session_state['chat_ttft_ms']:.0f} ms")
+
     parsed = st.session_state.get("chat_command_parse")
     if parsed:
         st.markdown("### Last command preview")
@@ -12,6 +12,8 @@ from apps.ui_streamlit.components import brand_header
 from apps.ui_streamlit.utils import state
 
 PAGE_ICON = str(Path(__file__).resolve().parents[2] / "brand" / "atlas_avatar.svg")
+TASKS_KEY = "tasks_list"
+STATUS_FILTERS = {"All": None, "Open": False, "Done": True}
 
 st.set_page_config(page_title="Tasks", page_icon=PAGE_ICON)
 
@@ -62,9 +64,26 @@ def _render_tasks(tasks: List[dict], app_state: state.AppState) -> None:
             with col2:
                 if st.button("Delete", key=f"delete_{task['id']}"):
                     app_state.api_client.delete_task(task["id"])
+                    state.invalidate(TASKS_KEY)
                     st.experimental_rerun()
 
 
+def _task_filters() -> dict:
+    """Render the filter row and return the matching `/tasks` query parameters."""
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        tag = st.text_input("Tag", key="tasks_tag").strip()
+    with col2:
+        status = st.selectbox("Status", list(STATUS_FILTERS), key="tasks_status")
+    with col3:
+        due_range = st.date_input("Due between", value=(), key="tasks_due")
+    filters = {"tag": tag or None, "completed": STATUS_FILTERS[status]}
+    if len(due_range) == 2:
+        filters["due_from"], filters["due_to"] = (day.isoformat() for day in due_range)
+    return filters
+
+
 def main() -> None:
     """Entrypoint for the tasks page."""
 
@@ -88,15 +107,24 @@ def main() -> None:
             st.session_state.editing_task = None
         else:
             app_state.api_client.create_task(payload)
+        state.invalidate(TASKS_KEY)
         st.experimental_rerun()
 
     st.markdown("---")
     st.subheader("Your tasks")
-    tasks = app_state.api_client.list_tasks()
-    if not tasks:
+    filters = _task_filters()
+
+    def fetch(cursor: str | None) -> dict:
+        return app_state.api_client.list_tasks(cursor=cursor, **filters)
+
+    tasks = state.paged_list(TASKS_KEY, fetch, tuple(filters.items()))
+    if not tasks.items:
         st.markdown("<div class='atlas-empty'>No tasks yet. Add one above!</div>", unsafe_allow_html=True)
     else:
-        _render_tasks(tasks, app_state)
+        _render_tasks(tasks.items, app_state)
+    if tasks.next_cursor and st.button("Load more tasks"):
+        state.load_next_page(TASKS_KEY, fetch)
+        st.experimental_rerun()
 
     st.markdown("---")
     st.caption("BEGINNER TIP: API routes in `apps/api_fastapi/routers/tasks.py`.")
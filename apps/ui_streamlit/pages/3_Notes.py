@@ -10,6 +10,9 @@ from apps.ui_streamlit.components import brand_header
 from apps.ui_streamlit.utils import state
 
 PAGE_ICON = str(Path(__file__).resolve().parents[2] / "brand" / "atlas_avatar.svg")
+NOTES_KEY = "notes_list"
+# Length of the `extract` returned by `GET /notes?view=summary`.
+EXTRACT_CHARS = 200
 
 st.set_page_config(page_title="Notes", page_icon=PAGE_ICON)
 
@@ -39,6 +42,7 @@ def main() -> None:
             "tags": [tag.strip() for tag in tags.split(",") if tag.strip()],
         }
         app_state.api_client.create_note(payload)
+        state.invalidate(NOTES_KEY)
         st.experimental_rerun()
     elif submitted:
         st.warning("Please add a title before saving.")
@@ -59,19 +63,37 @@ def main() -> None:
 
     st.markdown("---")
     st.subheader("All notes")
-    notes = app_state.api_client.list_notes()
-    if not notes:
+    tag = st.text_input("Filter by tag", key="notes_tag").strip() or None
+    tags = app_state.api_client.list_tags(limit=10)
+    popular = [f"{item['name']} ({item['notes']})" for item in tags if item["notes"]]
+    if popular:
+        st.caption("Popular tags: " + ", ".join(popular))
+
+    def fetch(cursor: str | None) -> dict:
+        return app_state.api_client.list_notes(cursor=cursor, tag=tag)
+
+    notes = state.paged_list(NOTES_KEY, fetch, (tag,))
+    if not notes.items:
         st.markdown(
             "<div class='atlas-empty'>No notes saved yet. Capture one above.</div>",
             unsafe_allow_html=True,
         )
-    for note in notes:
+    for note in notes.items:
         with st.expander(note["title"], expanded=False):
-            st.write(note["content"])
+            st.write(note["extract"])
+            # WHY: Full content is fetched on demand so long notes stay off the list.
+            if len(note["extract"]) >= EXTRACT_CHARS and st.button(
+                "Show full note", key=f"note_full_{note['id']}"
+            ):
+                st.write(app_state.api_client.get_note(note["id"])["content"])
             st.caption(f"Tags: {', '.join(note.get('tags', [])) or 'None'}")
             if st.button("Delete", key=f"note_delete_{note['id']}"):
                 app_state.api_client.delete_note(note["id"])
+                state.invalidate(NOTES_KEY)
                 st.experimental_rerun()
+    if notes.next_cursor and st.button("Load more notes"):
+        state.load_next_page(NOTES_KEY, fetch)
+        st.experimental_rerun()
 
     st.caption("BEGINNER TIP: Semantic search uses cosine similarity in SQLite.")
 
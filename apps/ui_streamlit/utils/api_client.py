@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional
 
 import requests
 
@@ -20,6 +20,14 @@ class AtlasAPIClient:
     def _url(self, path: str) -> str:
         return f"{self.base_url}{path}"
 
+    def _page(self, path: str, params: Dict) -> Dict:
+        """GET one page of a list endpoint: `{"items": [...], "next_cursor": ...}`."""
+
+        params = {key: value for key, value in params.items() if value is not None}
+        response = requests.get(self._url(path), params=params, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
     def health_check(self) -> Dict:
         try:
             response = requests.get(self._url("/health"), timeout=5)
@@ -32,18 +40,49 @@ class AtlasAPIClient:
                 "message": "API unreachable. Is `make run` active?",
             }
 
-    def chat(self, message: str, history: List[Dict], mode: str | None = None) -> Dict:
-        payload = {"message": message, "history": history[-5:]}
+    def chat(
+        self, message: str, conversation_id: str | None = None, mode: str | None = None
+    ) -> Dict:
+        """Send one turn; the API keeps the history of `conversation_id`."""
+
+        payload = {"message": message, "conversation_id": conversation_id}
         if mode:
             payload["mode"] = mode
         response = requests.post(self._url("/llm/chat"), json=payload, timeout=60)
         response.raise_for_status()
         return response.json()
 
-    def list_tasks(self) -> List[Dict]:
-        response = requests.get(self._url("/tasks"), timeout=10)
-        response.raise_for_status()
-        return response.json()
+    def chat_stream(
+        self, message: str, conversation_id: str | None = None, mode: str | None = None
+    ) -> Iterator[Dict]:
+        """Yield `token` frames from `/llm/chat/stream`, ending with the `done` frame.
+
+        The `done` frame carries the `conversation_id` to send with the next turn.
+        """
+
+        payload = {"message": message, "conversation_id": conversation_id}
+        if mode:
+            payload["mode"] = mode
+        with requests.post(
+            self._url("/llm/chat/stream"), json=payload, stream=True, timeout=60
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def list_tasks(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        view: str = "full",
+        **filters: object,
+    ) -> Dict:
+        """One page of tasks; filters: `tag`, `completed`, `due_from`, `due_to`."""
+
+        return self._page(
+            "/tasks", {"cursor": cursor, "limit": limit, "view": view, **filters}
+        )
 
     def create_task(self, payload: Dict) -> Dict:
         response = requests.post(self._url("/tasks"), json=payload, timeout=10)
@@ -51,15 +90,30 @@ class AtlasAPIClient:
         return response.json()
 
     def update_task(self, task_id: int, payload: Dict) -> Dict:
-        response = requests.put(self._url(f"/tasks/{task_id}"), json=payload, timeout=10)
+        response = requests.put(
+            self._url(f"/tasks/{task_id}"), json=payload, timeout=10
+        )
         response.raise_for_status()
         return response.json()
 
     def delete_task(self, task_id: int) -> None:
         requests.delete(self._url(f"/tasks/{task_id}"), timeout=10)
 
-    def list_notes(self) -> List[Dict]:
-        response = requests.get(self._url("/notes"), timeout=10)
+    def list_notes(
+        self,
+        cursor: Optional[str] = None,
+        limit: int = 50,
+        view: str = "summary",
+        tag: Optional[str] = None,
+    ) -> Dict:
+        """One page of notes; the summary view returns extracts, not full content."""
+
+        return self._page(
+            "/notes", {"cursor": cursor, "limit": limit, "view": view, "tag": tag}
+        )
+
+    def get_note(self, note_id: int) -> Dict:
+        response = requests.get(self._url(f"/notes/{note_id}"), timeout=10)
         response.raise_for_status()
         return response.json()
 
@@ -71,6 +125,20 @@ class AtlasAPIClient:
     def delete_note(self, note_id: int) -> None:
         requests.delete(self._url(f"/notes/{note_id}"), timeout=10)
 
+    def list_tags(self, prefix: Optional[str] = None, limit: int = 20) -> List[Dict]:
+        """Most used tags with their task and note counts."""
+
+        try:
+            response = requests.get(
+                self._url("/tags"),
+                params={"limit": limit, **({"prefix": prefix} if prefix else {})},
+                timeout=10,
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.RequestException:
+            return []
+
     def search_notes(self, query: str) -> List[Dict]:
         response = requests.post(
             self._url("/memory/semantic_search"),
@@ -115,18 +183,24 @@ class AtlasAPIClient:
             return {"error": f"Failed to run plugin: {exc}"}
 
     def plan(self, query: str) -> Dict:
-        response = requests.post(self._url("/control/plan"), json={"query": query}, timeout=20)
+        response = requests.post(
+            self._url("/control/plan"), json={"query": query}, timeout=20
+        )
         response.raise_for_status()
         return response.json()
 
     def execute_plan(self, plan: Dict, confirm_token: str | None = None) -> Dict:
         payload = {"plan": plan, "confirm_token": confirm_token}
-        response = requests.post(self._url("/control/execute"), json=payload, timeout=30)
+        response = requests.post(
+            self._url("/control/execute"), json=payload, timeout=30
+        )
         response.raise_for_status()
         return response.json()
 
     def parse_command(self, text: str) -> Dict:
-        response = requests.post(self._url("/commands/parse"), json={"text": text}, timeout=10)
+        response = requests.post(
+            self._url("/commands/parse"), json={"text": text}, timeout=10
+        )
         response.raise_for_status()
         return response.json()
 
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
 
 import streamlit as st
 
@@ -32,6 +33,47 @@ def get_app_state() -> AppState:
     return st.session_state.app_state
 
 
+@dataclass
+class PagedList:
+    """Rows of a paginated API list loaded so far, plus the cursor of the next page."""
+
+    filters: tuple
+    items: list[dict] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+
+
+PageFetcher = Callable[[Optional[str]], Dict]
+
+
+def paged_list(key: str, fetch: PageFetcher, filters: tuple = ()) -> PagedList:
+    """Return the pages cached under `key`, fetching the first one when needed.
+
+    Pages survive reruns, so clicking a button does not re-download the list; a
+    change of `filters` starts over from the first page.
+    """
+
+    current = st.session_state.get(key)
+    if current is None or current.filters != filters:
+        page = fetch(None)
+        current = PagedList(filters, page["items"], page["next_cursor"])
+        st.session_state[key] = current
+    return current
+
+
+def load_next_page(key: str, fetch: PageFetcher) -> None:
+    current: PagedList = st.session_state[key]
+    if current.next_cursor:
+        page = fetch(current.next_cursor)
+        current.items.extend(page["items"])
+        current.next_cursor = page["next_cursor"]
+
+
+def invalidate(key: str) -> None:
+    """Drop cached pages after a write so the next run reloads them."""
+
+    st.session_state.pop(key, None)
+
+
 def reset() -> None:
     """Clear all state for debugging purposes."""
 
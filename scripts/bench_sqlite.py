@@ -0,0 +1,145 @@
+"""Compare SQLite write/read throughput of the `default` and `tuned` profiles.
+
+Each profile gets a fresh temporary database with the Atlas schema, then runs:
+
+* writes  – one note per transaction, like the API's create endpoints
+* reads   – primary-key lookups plus a title scan, like list/search hydration
+* mixed   – reader threads running while writer threads commit, counting
+  "database is locked" errors
+
+Run with ``python scripts/bench_sqlite.py [--rows 2000 --threads 4]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from apps.api_fastapi import migrations
+from apps.api_fastapi.core import models
+from apps.api_fastapi.core.db import create_sqlite_engine
+
+PROFILES = ("default", "tuned")
+
+
+def bench_profile(profile: str, rows: int, reads: int, threads: int) -> Dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_sqlite_engine(f"sqlite:///{Path(tmp) / 'bench.db'}", profile)
+        migrations.upgrade(engine)
+        Session = sessionmaker(bind=engine)
+
+        started = time.perf_counter()
+        for idx in range(rows):
+            with Session.begin() as session:
+                session.add(models.Note(title=f"Note {idx}", content="x" * 400))
+        write_seconds = time.perf_counter() - started
+
+        ids = [random.randint(1, rows) for _ in range(reads)]
+        started = time.perf_counter()
+        with Session() as session:
+            for note_id in ids:
+                session.get(models.Note, note_id)
+                session.expunge_all()
+            session.execute(
+                select(models.Note.id).where(models.Note.title.like("%99%"))
+            ).all()
+        read_seconds = time.perf_counter() - started
+
+        mixed = run_mixed(Session, rows, threads)
+        engine.dispose()
+    return {
+        "profile": profile,
+        "writes_per_s": rows / write_seconds,
+        "reads_per_s": reads / read_seconds,
+        **mixed,
+    }
+
+
+def run_mixed(Session, rows: int, threads: int) -> Dict:
+    """Writers and readers in parallel; returns throughput and lock errors."""
+
+    per_writer = max(1, rows // (threads * 4))
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def writer() -> None:
+        for idx in range(per_writer):
+            try:
+                with Session.begin() as session:
+                    session.add(models.Note(title=f"Mixed {idx}", content="y" * 400))
+                with lock:
+                    counts["writes"] += 1
+            except OperationalError:
+                with lock:
+                    counts["locked"] += 1
+
+    def reader() -> None:
+        while not done.is_set():
+            try:
+                with Session() as session:
+                    session.get(models.Note, random.randint(1, rows))
+                with lock:
+                    counts["reads"] += 1
+            except OperationalError:
+                with lock:
+                    counts["locked"] += 1
+
+    writers = [threading.Thread(target=writer) for _ in range(threads)]
+    readers = [threading.Thread(target=reader) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "mixed_writes_per_s": counts["writes"] / elapsed,
+        "mixed_reads_per_s": counts["reads"] / elapsed,
+        "locked_errors": counts["locked"],
+    }
+
+
+def print_table(results: List[Dict]) -> None:
+    columns = [
+        ("profile", "{}"),
+        ("writes_per_s", "{:.0f}"),
+        ("reads_per_s", "{:.0f}"),
+        ("mixed_writes_per_s", "{:.0f}"),
+        ("mixed_reads_per_s", "{:.0f}"),
+        ("locked_errors", "{}"),
+    ]
+    print("  ".join(f"{name:>18}" for name, _ in columns))
+    for result in results:
+        print("  ".join(f"{fmt.format(result[name]):>18}" for name, fmt in columns))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2000, help="Single-row commits")
+    parser.add_argument("--reads", type=int, default=20000, help="Point lookups")
+    parser.add_argument("--threads", type=int, default=4, help="Mixed-phase writers")
+    args = parser.parse_args(argv)
+
+    random.seed(42)
+    results = [
+        bench_profile(profile, args.rows, args.reads, args.threads)
+        for profile in PROFILES
+    ]
+    print_table(results)
+
+
+if __name__ == "__main__":
+    main()
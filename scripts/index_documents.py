@@ -1,34 +1,318 @@
-"""Index text documents from the configured Documents directory."""
+"""Index text documents from the configured Documents directory.
+
+Three stages overlap: worker processes read and chunk files, an embed thread encodes
+batches of changed chunks, and the main thread writes them to SQLite. Bounded queues
+between the stages keep memory flat and let the slowest stage set the pace.
+"""
 
 from __future__ import annotations
 
+import argparse
+import hashlib
+import multiprocessing
+import os
+import queue
+import threading
+from dataclasses import dataclass, field
+from multiprocessing.queues import Queue
 from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from sqlalchemy import select
 
+from apps.api_fastapi.core import models
+from apps.api_fastapi.core.chunking import configured_chunker
 from apps.api_fastapi.core.config import get_settings
-from apps.api_fastapi.core.db import SessionLocal
+from apps.api_fastapi.core.db import SessionLocal, upgrade_schema
 from apps.api_fastapi.services.memory_service import MemoryService
 
-CHUNK_SIZE = 400
+# Embedded batches buffered between the embed thread and the SQLite writer.
+EMBED_QUEUE_BATCHES = 4
+
+
+def stream_lines(path: Path) -> Iterator[str]:
+    """Read a file line by line so memory stays flat on very large files."""
+
+    with path.open("r", encoding="utf-8", errors="ignore") as fh:
+        for line in fh:
+            yield line.rstrip("\r\n")
+
+
+def chunker_signature() -> str:
+    """Describe the active CHUNK_* settings so changing them forces a re-chunk."""
+
+    settings = get_settings()
+    return f"{settings.chunk_unit}:{settings.chunk_size}:{settings.chunk_overlap}"
+
+
+def hash_file(path: Path, block_size: int = 1 << 20) -> str:
+    """Return the sha256 of a file without loading it whole."""
+
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def process_file(
+    path: str, size: int, mtime: float, previous_hash: str | None
+) -> Iterator[tuple]:
+    """Yield pipeline messages for one candidate file.
+
+    Messages are `("chunk", path, index, content)` followed by a closing
+    `("file", path, size, mtime, content_hash, chunk_count)`; `chunk_count` is None
+    when the content hash is unchanged and no chunks were produced.
+    """
+
+    try:
+        content_hash = hash_file(Path(path))
+        if content_hash == previous_hash:
+            yield ("file", path, size, mtime, content_hash, None)
+            return
+        count = 0
+        for idx, chunk in enumerate(configured_chunker(stream_lines(Path(path)))):
+            yield ("chunk", path, idx, chunk)
+            count += 1
+        yield ("file", path, size, mtime, content_hash, count)
+    except OSError as exc:
+        yield ("error", path, str(exc))
+
+
+def reader_worker(tasks: Queue, results: Queue) -> None:
+    """Worker process: read and chunk files until a `None` sentinel arrives."""
+
+    while True:
+        task = tasks.get()
+        if task is None:
+            results.put(("done",))
+            return
+        for message in process_file(*task):
+            # WHY: `results` is bounded, so slow embedding back-pressures the readers.
+            results.put(message)
+
+
+@dataclass
+class ScanState:
+    """Book-keeping shared between the file walker and `main`."""
+
+    seen: set[str] = field(default_factory=set)
+    skipped_files: int = 0
+    changed_files: int = 0
+    failed_files: int = 0
+    pruned_chunks: int = 0
+    # (path, size, mtime, content_hash, chunk_count) written once chunks are stored.
+    manifest_updates: list[tuple[str, int, float, str, int]] = field(
+        default_factory=list
+    )
+
+
+def iter_candidates(
+    documents_root: Path, manifest: Dict[str, Any], state: ScanState
+) -> Iterator[tuple[str, int, float, str | None]]:
+    """Yield `(path, size, mtime, previous_hash)` for files that may have changed."""
+
+    chunker = chunker_signature()
+    for path in documents_root.rglob("*.txt"):
+        key = str(path)
+        state.seen.add(key)
+        try:
+            stat = path.stat()
+        except OSError as exc:
+            # WHY: Broken symlinks and files deleted mid-walk must not stop the scan.
+            state.failed_files += 1
+            print(f"\nSkipping {key}: {exc}")
+            continue
+        record = manifest.get(key)
+        if record and record.chunker != chunker:
+            # WHY: Different CHUNK_* settings invalidate the stored chunks.
+            yield key, stat.st_size, stat.st_mtime, None
+            continue
+        # WHY: Size + mtime match means the file was not touched; skip without reading.
+        if record and record.size == stat.st_size and record.mtime == stat.st_mtime:
+            state.skipped_files += 1
+            continue
+        yield key, stat.st_size, stat.st_mtime, record.content_hash if record else None
+
+
+def iter_messages(
+    documents_root: Path,
+    manifest: Dict[str, Any],
+    state: ScanState,
+    workers: int,
+    queue_size: int,
+) -> Iterator[tuple]:
+    """Run the reader/chunker stage, in worker processes when `workers > 0`."""
+
+    if workers <= 0:
+        for candidate in iter_candidates(documents_root, manifest, state):
+            yield from process_file(*candidate)
+        return
+
+    tasks: Queue = multiprocessing.Queue(maxsize=queue_size)
+    results: Queue = multiprocessing.Queue(maxsize=queue_size)
+
+    def feed() -> None:
+        try:
+            for candidate in iter_candidates(documents_root, manifest, state):
+                tasks.put(candidate)
+        finally:
+            # WHY: Without the sentinels the workers, and so the whole run, wait
+            # forever if the walk above fails.
+            for _ in range(workers):
+                tasks.put(None)
+
+    # WHY: Feeding from a thread keeps the main thread free to drain `results`,
+    # so neither bounded queue can deadlock the other.
+    feeder = threading.Thread(target=feed, name="index-feeder", daemon=True)
+    feeder.start()
+    pool = [
+        multiprocessing.Process(
+            target=reader_worker, args=(tasks, results), daemon=True
+        )
+        for _ in range(workers)
+    ]
+    for process in pool:
+        process.start()
+    finished = 0
+    try:
+        while finished < workers:
+            message = results.get()
+            if message[0] == "done":
+                finished += 1
+                continue
+            yield message
+    finally:
+        feeder.join(timeout=1)
+        for process in pool:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+
+
+def embed_batches(messages: Iterable[tuple], batch_size: int, out: queue.Queue) -> None:
+    """Embed thread: batch chunk messages, encode them and hand them to the writer.
+
+    Each queue item is `(chunks, vectors, file_messages)`; `file_messages` are the
+    `file`/`error` messages that arrived while the batch filled, so the writer books
+    a file only after its last chunks are stored. A `None` item ends the stream and
+    an exception item is re-raised by the writer.
+    """
+
+    try:
+        # WHY: A separate read-only session lets the change check run while the
+        # writer's transaction is open (SQLite WAL readers never block the writer).
+        with SessionLocal() as session:
+            embedder = MemoryService(session)
+            batch: List[Tuple[str, int, str]] = []
+            pending: List[tuple] = []
+            for message in messages:
+                if message[0] != "chunk":
+                    pending.append(message)
+                    continue
+                batch.append(message[1:])
+                if len(batch) >= batch_size:
+                    out.put((batch, embedder.embed_document_batch(batch), pending))
+                    batch, pending = [], []
+            if batch or pending:
+                vectors = embedder.embed_document_batch(batch) if batch else {}
+                out.put((batch, vectors, pending))
+    except BaseException as exc:
+        out.put(exc)
+    out.put(None)
+
+
+def iter_embedded_batches(
+    batches: queue.Queue,
+    memory: MemoryService,
+    manifest: Dict[str, Any],
+    state: ScanState,
+) -> Iterator[Tuple[List[Tuple[str, int, str]], Dict]]:
+    """Writer-side consumer: yield embedded batches and book-keep finished files."""
+
+    while True:
+        item = batches.get()
+        if item is None:
+            return
+        if isinstance(item, BaseException):
+            raise item
+        batch, vectors, file_messages = item
+        if batch:
+            yield batch, vectors
+        # Resumed only once the batch above is written.
+        for message in file_messages:
+            record_file_message(message, memory, manifest, state)
+
+
+def record_file_message(
+    message: tuple, memory: MemoryService, manifest: Dict[str, Any], state: ScanState
+) -> None:
+    """Apply one `file`/`error` pipeline message to the manifest book-keeping."""
+
+    if message[0] == "file":
+        path, size, mtime, content_hash, chunk_count = message[1:]
+        if chunk_count is None:
+            state.skipped_files += 1
+            chunk_count = manifest[path].chunk_count
+        else:
+            state.changed_files += 1
+            # Drop trailing chunks when a file got shorter.
+            state.pruned_chunks += memory.prune_document(path, chunk_count)
+        state.manifest_updates.append((path, size, mtime, content_hash, chunk_count))
+    elif message[0] == "error":
+        state.failed_files += 1
+        print(f"\nSkipping {message[1]}: {message[2]}")
+
+
+def collect_garbage(
+    documents_root: Path, memory: MemoryService, state: ScanState
+) -> int:
+    """Remove chunks for files that disappeared and embeddings without an owner."""
+
+    root_prefix = str(documents_root)
+    indexed_paths = set(memory.document_manifest())
+    stmt = select(models.DocumentChunk.source_path).distinct()
+    for source_path in memory.session.scalars(stmt):
+        # WHY: Only reap paths under the Documents root so seeded chunks survive.
+        if source_path.startswith(root_prefix):
+            indexed_paths.add(source_path)
+    removed = memory.remove_documents(sorted(indexed_paths - state.seen))
+    return removed + memory.purge_orphan_embeddings()
+
 
+def report_progress(stats) -> None:
+    """Print a single-line throughput report."""
 
-def chunk_text(text: str, size: int = CHUNK_SIZE) -> list[str]:
-    """Yield overlapping chunks to keep context manageable."""
+    print(
+        f"\rIndexed {stats.chunks} chunks in {stats.seconds:.1f}s "
+        f"({stats.chunks_per_second:.1f} chunks/s)",
+        end="",
+        flush=True,
+    )
 
-    lines = text.splitlines()
-    buffer: list[str] = []
-    chunks: list[str] = []
-    for line in lines:
-        buffer.append(line)
-        joined = "\n".join(buffer)
-        if len(joined) >= size:
-            chunks.append(joined)
-            buffer = []
-    if buffer:
-        chunks.append("\n".join(buffer))
-    return chunks
 
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=max(1, (os.cpu_count() or 2) - 1),
+        help="Reader/chunker processes (0 runs everything in-process)",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="Chunks per encode call"
+    )
+    parser.add_argument(
+        "--commit-every", type=int, default=None, help="Chunks written between commits"
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=1024,
+        help="Max messages buffered between stages",
+    )
+    args = parser.parse_args(argv)
 
-def main() -> None:
     settings = get_settings()
     if not settings.index_documents:
         print("INDEX_DOCUMENTS disabled; skipping")
@@ -37,14 +321,43 @@ def main() -> None:
     if not documents_root.exists():
         print(f"Documents path {documents_root} not found")
         return
+    upgrade_schema()
+    # WHY: Only this process opens SQLite; workers just read files and chunk text.
+    # The embed thread reads through its own session; only this thread writes.
     with SessionLocal() as session:
         memory = MemoryService(session)
-        for path in documents_root.rglob("*.txt"):
-            text = path.read_text(encoding="utf-8", errors="ignore")
-            for idx, chunk in enumerate(chunk_text(text)):
-                memory.upsert_document_chunk(str(path), idx, chunk)
+        state = ScanState()
+        manifest = memory.document_manifest()
+        messages = iter_messages(
+            documents_root, manifest, state, args.workers, args.queue_size
+        )
+        batches: queue.Queue = queue.Queue(maxsize=EMBED_QUEUE_BATCHES)
+        embedder = threading.Thread(
+            target=embed_batches,
+            args=(messages, args.batch_size or settings.embed_batch_size, batches),
+            name="index-embedder",
+            daemon=True,
+        )
+        embedder.start()
+        stats = memory.write_document_batches(
+            iter_embedded_batches(batches, memory, manifest, state),
+            commit_every=args.commit_every,
+            progress=report_progress,
+        )
+        embedder.join()
+        # WHY: The manifest is written last so an interrupted run is simply redone.
+        for entry in state.manifest_updates:
+            memory.record_document_file(*entry, chunker=chunker_signature())
+        removed = collect_garbage(documents_root, memory, state)
         session.commit()
-    print("Documents indexed")
+    print()
+    print(
+        f"Documents indexed: {state.changed_files} changed, "
+        f"{state.skipped_files} unchanged, {state.failed_files} failed, "
+        f"{stats.chunks - stats.unchanged} chunks embedded, "
+        f"{state.pruned_chunks + removed} stale rows removed "
+        f"({stats.chunks_per_second:.1f} chunks/s)"
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""Apply pending schema migrations to the Atlas database.
+
+Run ``python scripts/migrate.py`` before starting the API (``make run`` does this),
+``--status`` to list applied and pending versions, or ``--target N`` to stop at a
+version.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from apps.api_fastapi import migrations
+from apps.api_fastapi.core.db import engine
+
+
+def report_progress(migration: migrations.Migration, seconds: float) -> None:
+    """Print one line per applied migration."""
+
+    print(f"Applied {migration.version:04d}_{migration.name} in {seconds:.2f}s")
+
+
+def print_status() -> None:
+    applied = migrations.applied_versions(engine)
+    for migration in migrations.discover():
+        state = "applied" if migration.version in applied else "pending"
+        print(f"{migration.version:04d}_{migration.name:<30} {state}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--status", action="store_true", help="List versions only")
+    parser.add_argument("--target", type=int, default=None, help="Stop at version")
+    args = parser.parse_args(argv)
+
+    if args.status:
+        print_status()
+        return
+    applied = migrations.upgrade(engine, args.target, progress=report_progress)
+    if not applied:
+        print("Database schema is up to date.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Re-embed stored vectors after changing EMBED_MODEL_NAME."""
+
+from __future__ import annotations
+
+import argparse
+
+from apps.api_fastapi.core.db import upgrade_schema
+from apps.api_fastapi.services.reembed_service import run_reembed
+
+
+def report_progress(status) -> None:
+    """Print a single-line progress report."""
+
+    print(
+        f"\rMigrated {status.migrated} vectors to {status.target_model} "
+        f"({status.remaining} remaining)",
+        end="",
+        flush=True,
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size", type=int, default=None, help="Vectors per encode call"
+    )
+    args = parser.parse_args(argv)
+
+    upgrade_schema()
+    status = run_reembed(batch_size=args.batch_size, progress=report_progress)
+    print()
+    if status.error:
+        print(f"Re-embed failed: {status.error}")
+    else:
+        print(
+            f"Re-embed finished: {status.migrated} migrated, "
+            f"{status.removed} orphans removed"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -5,12 +5,11 @@ from __future__ import annotations
 import json
 from pathlib import Path
 
-from datetime import date
-
 from sqlalchemy.orm import Session
 
 from apps.api_fastapi.core import models
-from apps.api_fastapi.core.db import SessionLocal, engine
+from apps.api_fastapi.core.chunking import configured_chunker
+from apps.api_fastapi.core.db import SessionLocal, upgrade_schema
 from apps.api_fastapi.services.memory_service import MemoryService
 
 DATA_DIR = Path(__file__).resolve().parents[1] / "data" / "seeds"
@@ -26,37 +25,22 @@ def load_json(name: str) -> list[dict]:
 def seed() -> None:
     """Insert seed rows when the tables are empty."""
 
-    models.Base.metadata.create_all(bind=engine)
+    upgrade_schema()
     session: Session = SessionLocal()
     try:
         memory = MemoryService(session)
         if not session.query(models.Note).count():
-            for note in load_json("example_notes.json"):
-                session.add(
-                    models.Note(
-                        title=note["title"],
-                        content=note["content"],
-                        tags=json.dumps(note.get("tags", [])),
-                    )
-                )
+            memory.create_notes(load_json("example_notes.json"))
         if not session.query(models.Task).count():
-            for task in load_json("example_tasks.json"):
-                due_date = task.get("due_date")
-                due_date_obj = date.fromisoformat(due_date) if due_date else None
-                session.add(
-                    models.Task(
-                        title=task["title"],
-                        description=task.get("description", ""),
-                        due_date=due_date_obj,
-                        tags=json.dumps(task.get("tags", [])),
-                    )
-                )
+            memory.create_tasks(load_json("example_tasks.json"))
         knowledge_path = DATA_DIR / "knowledge.txt"
         if knowledge_path.exists():
-            chunks = knowledge_path.read_text(encoding="utf-8").split("\n\n")
-            for idx, chunk in enumerate(chunks):
-                if chunk.strip():
-                    memory.upsert_document_chunk(str(knowledge_path), idx, chunk)
+            with knowledge_path.open(encoding="utf-8") as fh:
+                lines = (line.rstrip("\n") for line in fh)
+                memory.upsert_document_chunks(
+                    (str(knowledge_path), idx, chunk)
+                    for idx, chunk in enumerate(configured_chunker(lines))
+                )
         session.commit()
         print("Seed data inserted.")
     finally: